@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+import ohlcv_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow는 선택 의존성 (없으면 SQLite만 사용)
+    pa = None
+
+
+ARROW_ROOT = 'candles'
+
+# 파일 구조: {root}/{coin}_ohlcv_{interval}/{YYYY-MM}.arrow
+# 월 단위 파티션, 파일 안은 ts 오름차순 정렬된 비압축 Arrow IPC(Feather v2)라 메모리 매핑으로 바로 읽는다.
+
+
+def available():
+    return pa is not None
+
+
+def candle_dir(table_name, root=ARROW_ROOT):
+    return os.path.join(root, table_name)
+
+
+def list_partitions(table_name, root=ARROW_ROOT):
+    """파티션 월('YYYY-MM') 목록 (정렬)"""
+    path = candle_dir(table_name, root)
+    if not os.path.isdir(path):
+        return []
+    return sorted(name[:-len('.arrow')] for name in os.listdir(path) if name.endswith('.arrow'))
+
+
+def has_candles(table_name, root=ARROW_ROOT):
+    """해당 코인/봉단위의 Arrow 파티션이 있는지 여부"""
+    return available() and bool(list_partitions(table_name, root))
+
+
+def month_key(ts_ms):
+    """epoch ms 배열을 'YYYY-MM' 파티션 키 배열로 변환"""
+    return np.datetime_as_string(np.asarray(ts_ms, dtype=np.int64).astype('datetime64[ms]').astype('datetime64[M]'))
+
+
+def read_partition(path):
+    """파티션 파일을 (ts, values) NumPy 배열로 읽기 (메모리 매핑 후 복사, 파일 핸들을 남기지 않음)"""
+    table = feather.read_table(path, memory_map=True)
+    ts = table.column('ts').to_numpy().copy()
+    values = np.column_stack([table.column(col).to_numpy() for col in ohlcv_store.OHLCV_COLUMNS])
+    return ts, values
+
+
+def write_partition(path, ts, values):
+    """임시 파일에 쓴 뒤 교체 (쓰는 도중 읽어도 깨진 파일이 보이지 않도록)"""
+    columns = {'ts': pa.array(ts, type=pa.int64())}
+    for i, col in enumerate(ohlcv_store.OHLCV_COLUMNS):
+        columns[col] = pa.array(values[:, i], type=pa.float64())
+    tmp_path = path + '.tmp'
+    feather.write_feather(pa.table(columns), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def write_candles(table_name, df, root=ARROW_ROOT):
+    """OHLCV DataFrame을 월별 파티션에 병합 저장 (같은 시각은 새 값으로 교체)
+
+    Returns:
+        저장 행 수
+    """
+    if df is None or df.empty:
+        return 0
+    directory = candle_dir(table_name, root)
+    os.makedirs(directory, exist_ok=True)
+
+    ts = ohlcv_store.to_epoch_ms(pd.DatetimeIndex(df.index))
+    values = df[ohlcv_store.OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    order = np.argsort(ts, kind='stable')
+    ts, values = ts[order], values[order]
+    months, starts = np.unique(month_key(ts), return_index=True)
+    bounds = np.append(starts, len(ts))
+    for month, lo, hi in zip(months, bounds[:-1], bounds[1:]):
+        new_ts, new_values = ts[lo:hi], values[lo:hi]
+        path = os.path.join(directory, f'{month}.arrow')
+        if os.path.exists(path):
+            old_ts, old_values = read_partition(path)
+            keep = ~np.isin(old_ts, new_ts)
+            new_ts = np.concatenate([old_ts[keep], new_ts])
+            new_values = np.concatenate([old_values[keep], new_values])
+            merged_order = np.argsort(new_ts, kind='stable')
+            new_ts, new_values = new_ts[merged_order], new_values[merged_order]
+        write_partition(path, new_ts, new_values)
+    return len(df)
+
+
+def load_candles(table_name, start, end, root=ARROW_ROOT):
+    """[start, end] 구간 OHLCV를 DataFrame으로 조회 (없으면 None)
+
+    구간 밖의 월 파일은 열지 않고, 경계 월은 정렬된 ts에서 이진 탐색으로 잘라낸다.
+    메모리 매핑한 Arrow 컬럼을 결과 배열에 한 번만 복사하므로 파이썬 튜플을 만들지 않는다.
+    """
+    if not available():
+        return None
+    start_ms, end_ms = ohlcv_store.to_epoch_ms(start), ohlcv_store.to_epoch_ms(end)
+    first_month, last_month = month_key([start_ms, end_ms])
+    directory = candle_dir(table_name, root)
+    months = [m for m in list_partitions(table_name, root) if first_month <= m <= last_month]
+
+    # 파티션별 필요한 구간만 잘라 둔 뒤 최종 배열에 복사
+    pieces = []
+    for month in months:
+        table = feather.read_table(os.path.join(directory, f'{month}.arrow'), memory_map=True)
+        ts = table.column('ts').to_numpy()
+        lo = np.searchsorted(ts, start_ms, side='left')
+        hi = np.searchsorted(ts, end_ms, side='right')
+        if hi > lo:
+            pieces.append(table.slice(lo, hi - lo))
+    if not pieces:
+        return None
+
+    total = sum(piece.num_rows for piece in pieces)
+    ts = np.empty(total, dtype=np.int64)
+    data = {col: np.empty(total, dtype=np.float64) for col in ohlcv_store.OHLCV_COLUMNS}
+    pos = 0
+    for piece in pieces:
+        n = piece.num_rows
+        ts[pos:pos + n] = piece.column('ts').to_numpy()
+        for col in ohlcv_store.OHLCV_COLUMNS:
+            data[col][pos:pos + n] = piece.column(col).to_numpy()
+        pos += n
+    return pd.DataFrame(data, index=ohlcv_store.from_epoch_ms(ts), copy=False)
+
+
+def export_from_sqlite(db_path=ohlcv_store.DB_PATH, root=ARROW_ROOT, tables=None):
+    """ohlcv.db의 OHLCV 테이블을 월별 Arrow 파티션으로 내보내기
+
+    Returns:
+        {테이블명: 내보낸 행 수}
+    """
+    conn = ohlcv_store.connect(db_path)
+    try:
+        if tables is None:
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%\\_ohlcv\\_%' ESCAPE '\\'")]
+        results = {}
+        for table_name in tables:
+            coverage = ohlcv_store.get_coverage(conn, table_name)
+            if coverage is None:
+                continue
+            _, first, last = coverage
+            exported = 0
+            # 메모리 사용을 줄이기 위해 월 단위로 읽어서 기록
+            for month_start in pd.date_range(pd.Timestamp(first).to_period('M').start_time, last, freq='MS'):
+                month_end = month_start + pd.offsets.MonthBegin(1) - pd.Timedelta(milliseconds=1)
+                df = ohlcv_store.load_ohlcv(conn, table_name, month_start, month_end)
+                exported += write_candles(table_name, df, root)
+            results[table_name] = exported
+        return results
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    # SQLite -> Arrow 내보내기: python arrow_store.py [db 경로] [출력 폴더]
+    if not available():
+        print("pyarrow가 설치되어 있지 않습니다. (pip install pyarrow)")
+        sys.exit(1)
+    db_path = sys.argv[1] if len(sys.argv) > 1 else ohlcv_store.DB_PATH
+    root = sys.argv[2] if len(sys.argv) > 2 else ARROW_ROOT
+    start = time.perf_counter()
+    results = export_from_sqlite(db_path, root)
+    for table_name, rows in results.items():
+        print(f"{table_name}: {rows}건 내보냄")
+    print(f"내보내기 완료: 테이블 {len(results)}개, {time.perf_counter() - start:.1f}초")
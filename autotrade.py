@@ -3,6 +3,8 @@ import os
 import json
 import time
 import threading
+import asyncio
+from collections import deque
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
@@ -24,7 +26,14 @@ import requests
 import itertools
 import matplotlib.gridspec as gridspec
 import optuna
-from strategies import StrategyFactory, BacktestEngine, OptunaOptimizer
+from strategies import StrategyFactory, BacktestEngine, OptunaOptimizer, OPTUNA_STORAGE, make_study_name
+import ohlcv_store
+import arrow_store
+import candle_cache
+import resampler
+import downloader
+import live_engine
+import market_feed
 import logging
 import csv
 from PyQt5.QtCore import QObject, QThread, pyqtSignal
@@ -37,9 +46,13 @@ plt.rcParams['font.family'] = 'Malgun Gothic'
 class AutoTradeWindow(QDialog):
     # 시그널 정의
     update_sim_status = pyqtSignal(str)
-    show_sim_chart_signal = pyqtSignal(list, list, list, list)
+    show_sim_chart_signal = pyqtSignal(object)
     show_trade_log_signal = pyqtSignal(list)
     update_data_result = pyqtSignal(str)  # 데이터 수집 결과 업데이트를 위한 시그널 추가
+    batch_download_finished = pyqtSignal(object)  # 일괄 수집 결과 (실패 시 None)
+    
+    SIM_CHART_FRAME_INTERVAL = 0.2  # 시뮬레이션 차트 최소 갱신 간격 (초)
+    OPTUNA_CLOSE_WAIT_MS = 3000  # 창 닫을 때 Optuna 스레드 종료를 기다리는 최대 시간
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -79,9 +92,16 @@ class AutoTradeWindow(QDialog):
         
         # 차트 관련 변수
         self.chart_window = None
+        self.sim_chart_window = None
+        self.sim_chart_pending = None  # 아직 그리지 않은 최신 스냅샷
+        self.sim_chart_scheduled = False
+        self.sim_chart_last_draw = 0
         self.chart_update_timer = None
         self.realtime_chart_window = None
         
+        # 히스토리컬 데이터 조회 캐시 (백테스트/최적화 반복 실행 시 재사용)
+        self.frame_cache = candle_cache.FrameCache()
+        
         # 데이터 수집 관련 변수
         self.data_collection_running = False
         self.data_collection_thread = None
@@ -145,14 +165,46 @@ class AutoTradeWindow(QDialog):
         self.backtestStartDate.setDate(today)  # 기본값: 30일 전
         self.backtestEndDate.setDate(today)
         
+        # 증분 동기화 옵션 (업비트 전용, 누락 구간만 수집)
+        self.dataIncrementalSync = QCheckBox("증분 동기화 (누락 구간만)")
+        self.dataIncrementalSync.setChecked(True)
+        self.dataOptionGrid.addWidget(self.dataIncrementalSync, 0, 6, 1, 2)
+        # 3분~일봉을 1분봉에서 집계 (업비트 전용)
+        self.dataDeriveFromMinute = QCheckBox("1분봉에서 상위 봉 생성")
+        self.dataDeriveFromMinute.setChecked(False)
+        self.dataOptionGrid.addWidget(self.dataDeriveFromMinute, 2, 6, 1, 2)
+        # 여러 코인/봉단위 일괄 수집 (동시 요청, 거래소 요청 한도 준수)
+        self.dataOptionGrid.addWidget(QLabel("일괄 코인:"), 2, 0)
+        self.dataBatchCoins = QLineEdit()
+        self.dataBatchCoins.setPlaceholderText("BTC,ETH (비우면 KRW 마켓 전체)")
+        self.dataOptionGrid.addWidget(self.dataBatchCoins, 2, 1, 1, 2)
+        self.dataOptionGrid.addWidget(QLabel("일괄 봉단위:"), 2, 3)
+        self.dataBatchIntervals = QLineEdit("1분봉")
+        self.dataBatchIntervals.setPlaceholderText("1분봉,일봉")
+        self.dataOptionGrid.addWidget(self.dataBatchIntervals, 2, 4)
+        self.dataBatchBtn = QPushButton("일괄 수집")
+        self.dataOptionGrid.addWidget(self.dataBatchBtn, 2, 5)
+        self.dataBatchBtn.clicked.connect(self.toggle_batch_download)
+        # 시뮬레이션/자동매매에서 함께 매매할 코인 (한 엔진에서 처리, 차트는 선택한 코인 기준)
+        self.simExtraCoins = QLineEdit()
+        self.simExtraCoins.setPlaceholderText("함께 매매: ETH,XRP (ALL: KRW 마켓 전체)")
+        self.horizontalLayout_3.insertWidget(2, self.simExtraCoins)
+        self.tradeExtraCoins = QLineEdit()
+        self.tradeExtraCoins.setPlaceholderText("함께 매매: ETH,XRP (ALL: KRW 마켓 전체)")
+        self.horizontalLayout_4.insertWidget(2, self.tradeExtraCoins)
+        
         # 초기 거래소 선택에 따라 날짜 입력란 상태 설정
         if self.exchangeCombo.currentText() == '빗썸':
             self.dataStartDate.setEnabled(False)
             self.dataEndDate.setEnabled(False)
+            self.dataIncrementalSync.setEnabled(False)
+            self.dataDeriveFromMinute.setEnabled(False)
             self.update_data_result.emit('빗썸은 날짜 범위 지정이 불가능합니다. 최신 200개만 저장됩니다.')
         else:
             self.dataStartDate.setEnabled(True)
             self.dataEndDate.setEnabled(True)
+            self.dataIncrementalSync.setEnabled(True)
+            self.dataDeriveFromMinute.setEnabled(True)
             self.update_data_result.emit('업비트는 날짜 범위 지정이 가능합니다.')
         
         # 시간 단위 콤보박스 항목 통일 및 추가
@@ -201,6 +253,7 @@ class AutoTradeWindow(QDialog):
     def setup_connections(self):
         # 데이터 수집/저장 탭
         self.dataFetchBtn.clicked.connect(self.fetch_and_store_ohlcv)
+        self.batch_download_finished.connect(self.on_batch_download_finished)
         # 거래소 콤보박스 변경 시 날짜 입력란 활성/비활성화
         self.exchangeCombo.currentTextChanged.connect(self.toggle_date_inputs_by_exchange)
         # 시간단위 콤보박스 값 변경 시 로그
@@ -227,10 +280,14 @@ class AutoTradeWindow(QDialog):
         if exchange == '빗썸':
             self.dataStartDate.setEnabled(False)
             self.dataEndDate.setEnabled(False)
+            self.dataIncrementalSync.setEnabled(False)
+            self.dataDeriveFromMinute.setEnabled(False)
             self.update_data_result.emit('빗썸은 날짜 범위 지정이 불가능합니다. 최신 200개만 저장됩니다.')
         else:
             self.dataStartDate.setEnabled(True)
             self.dataEndDate.setEnabled(True)
+            self.dataIncrementalSync.setEnabled(True)
+            self.dataDeriveFromMinute.setEnabled(True)
             self.update_data_result.emit('업비트는 날짜 범위 지정이 가능합니다.')
 
     def get_table_name(self, coin, interval):
@@ -301,37 +358,22 @@ class AutoTradeWindow(QDialog):
             # 거래소별 데이터 수집
             if exchange == "업비트":
                 upbit_interval = upbit_interval_map[interval]
-                max_retries = 3
-                retry_delay = 1  # 초
-                
-                for attempt in range(max_retries):
-                    try:
-                        self.append_data_result(f"데이터 수집 시도 {attempt + 1}/{max_retries}...")
-                        df = pyupbit.get_ohlcv_from(
-                            ticker=f"KRW-{coin}",
-                            interval=upbit_interval,
-                            fromDatetime=start_datetime,
-                            to=end_datetime,
-                            period=0.1  # API 호출 간격
-                        )
-                        
-                        if df is not None and not df.empty:
-                            break
-                        else:
-                            if attempt < max_retries - 1:
-                                self.append_data_result(f"데이터 수집 실패. {retry_delay}초 후 재시도...")
-                                time.sleep(retry_delay)
-                                retry_delay *= 2  # 지수 백오프
-                            else:
-                                self.append_data_result("[오류] 데이터 수집 실패")
-                                return
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            self.append_data_result(f"오류 발생: {str(e)}. {retry_delay}초 후 재시도...")
-                            time.sleep(retry_delay)
-                            retry_delay *= 2
-                        else:
-                            raise
+                if self.dataDeriveFromMinute.isChecked() and resampler.is_derived_table(table_name):
+                    # 상위 봉은 직접 받지 않고 1분봉을 동기화한 뒤 집계
+                    self.append_data_result(f"{interval}은 저장된 1분봉에서 생성합니다. (누락된 1분봉만 수집)")
+                    self.sync_upbit_ohlcv(coin, 'minute1', resampler.source_table_name(table_name),
+                                          start_datetime, end_datetime, chart_table=table_name)
+                    return
+                if self.dataIncrementalSync.isChecked():
+                    self.sync_upbit_ohlcv(coin, upbit_interval, table_name, start_datetime, end_datetime)
+                    return
+                df = self.download_upbit_ohlcv(coin, upbit_interval, start_datetime, end_datetime)
+                if df is None:
+                    self.append_data_result("[오류] 데이터 수집 실패")
+                    return
+                if df.empty:
+                    self.append_data_result("[완료] 해당 구간에 거래 데이터가 없습니다.")
+                    return
             else:  # 빗썸
                 bithumb_interval = bithumb_interval_map[interval]
                 # python_bithumb 라이브러리 사용
@@ -342,40 +384,16 @@ class AutoTradeWindow(QDialog):
                     return
             
             if df is not None and not df.empty:
-                # 데이터베이스 연결
-                conn = sqlite3.connect('ohlcv.db')
-                cursor = conn.cursor()
-                
-                # 테이블 생성
-                cursor.execute(f'''
-                    CREATE TABLE IF NOT EXISTS {table_name} (
-                        date TEXT PRIMARY KEY,
-                        open REAL,
-                        high REAL,
-                        low REAL,
-                        close REAL,
-                        volume REAL
-                    )
-                ''')
-                
-                # 데이터 저장
+                # 데이터 저장 (단일 트랜잭션 일괄 저장)
                 total_rows = len(df)
                 self.append_data_result(f"총 {total_rows}개의 데이터 저장 시작...")
-                
-                for i, (index, row) in enumerate(df.iterrows(), 1):
-                    timestamp = index.strftime('%Y-%m-%d %H:%M:%S')
-                    cursor.execute(f'''
-                        INSERT OR REPLACE INTO {table_name} (date, open, high, low, close, volume)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (timestamp, row['open'], row['high'], row['low'], row['close'], row['volume']))
-                    
-                    # 진행률 표시 (10% 단위)
-                    if i % max(1, total_rows // 10) == 0:
-                        progress = (i / total_rows) * 100
-                        self.append_data_result(f"저장 진행률: {progress:.1f}% ({i}/{total_rows})")
-                
-                conn.commit()
-                conn.close()
+                conn = ohlcv_store.connect()
+                try:
+                    saved_rows, elapsed = self.save_ohlcv(conn, table_name, df)
+                finally:
+                    conn.close()
+                rows_per_sec = saved_rows / elapsed if elapsed > 0 else float('inf')
+                self.append_data_result(f"저장 완료: {saved_rows}건, {elapsed:.2f}초 ({rows_per_sec:,.0f} rows/sec)")
                 
                 # 저장된 데이터 수와 기간 출력
                 start_time = df.index[0].strftime('%Y-%m-%d %H:%M:%S')
@@ -391,6 +409,175 @@ class AutoTradeWindow(QDialog):
             self.append_data_result(f"[오류] 데이터 수집 실패: {str(e)}")
             traceback.print_exc()
 
+    def save_ohlcv(self, conn, table_name, df, derive=None):
+        """OHLCV 저장 (SQLite 일괄 저장, 캔들/조회 캐시 무효화, Arrow 캔들 저장소가 있으면 함께 갱신)
+
+        1분봉 저장 시 derive(기본값: '1분봉에서 상위 봉 생성' 옵션)가 켜져 있으면 상위 봉 테이블도 갱신한다.
+        일괄 수집 스레드에서도 호출되므로 derive를 넘겨받아 위젯을 읽지 않는다.
+        """
+        if derive is None:
+            derive = self.dataDeriveFromMinute.isChecked()
+        result = ohlcv_store.bulk_insert_ohlcv(conn, table_name, df)
+        candle_cache.invalidate(table_name)
+        self.frame_cache.invalidate(table_name)
+        if arrow_store.has_candles(table_name):
+            arrow_store.write_candles(table_name, df)
+        if derive and resampler.is_source_table(table_name):
+            self.update_derived_tables(conn, table_name, since=df.index.min())
+        return result
+
+    def update_derived_tables(self, conn, source_table, since=None):
+        """1분봉 테이블로 상위 봉(3분~일봉) 테이블 갱신 (마지막 봉/새로 저장된 구간부터만 다시 집계)"""
+        derived = resampler.resample_incremental(conn, source_table, since=since)
+        for derived_table, derived_df in derived.items():
+            self.save_ohlcv(conn, derived_table, derived_df, derive=False)
+        if derived:
+            self.update_data_result.emit("상위 봉 갱신: " + ", ".join(f"{name.rsplit('_', 1)[1]} {len(d)}건" for name, d in derived.items()))
+        return derived
+
+    def toggle_batch_download(self):
+        """여러 코인/봉단위 일괄 수집 시작 (실행 중이면 중지 요청)"""
+        if self.data_collection_running:
+            self.data_collection_stop_event.set()
+            self.dataBatchBtn.setEnabled(False)
+            self.append_data_result("[일괄 수집] 중지 요청됨: 진행 중인 요청이 끝나면 멈춥니다...")
+            return
+        
+        exchange = self.exchangeCombo.currentText()
+        coins = [coin.strip().upper() for coin in self.dataBatchCoins.text().split(',') if coin.strip()]
+        intervals = [interval.strip() for interval in self.dataBatchIntervals.text().split(',') if interval.strip()]
+        unknown = [interval for interval in intervals if interval not in downloader.UPBIT_INTERVALS]
+        if not intervals or unknown:
+            QMessageBox.warning(self, "경고", f"봉단위를 확인해주세요: {', '.join(unknown) or '(없음)'}")
+            return
+        start_datetime, end_datetime = None, None
+        if exchange == "업비트":
+            start_datetime = datetime.combine(self.dataStartDate.date().toPyDate(), datetime.min.time())
+            end_datetime = datetime.combine(self.dataEndDate.date().toPyDate(), datetime.max.time())
+        derive = self.dataDeriveFromMinute.isChecked()
+        
+        def run():
+            result = None
+            conn = None
+            try:
+                if coins:
+                    batch_coins = coins
+                elif exchange == "빗썸":
+                    batch_coins = downloader.bithumb_krw_markets()
+                else:
+                    batch_coins = downloader.krw_markets()
+                batch = downloader.BatchDownloader(
+                    exchange, batch_coins, intervals, self.get_table_name, start_datetime, end_datetime,
+                    log=self.update_data_result.emit, stop_event=self.data_collection_stop_event)
+                conn = ohlcv_store.connect()
+                result = batch.run(conn, lambda conn, table_name, df: self.save_ohlcv(conn, table_name, df, derive=derive))
+            except Exception as e:
+                self.update_data_result.emit(f"[오류] 일괄 수집 실패: {str(e)}")
+                traceback.print_exc()
+            finally:
+                if conn is not None:
+                    conn.close()
+                self.batch_download_finished.emit(result)
+        
+        self.data_collection_stop_event.clear()
+        self.data_collection_running = True
+        self.dataBatchBtn.setText("일괄 수집 중지")
+        self.data_collection_thread = threading.Thread(target=run, daemon=True)
+        self.data_collection_thread.start()
+
+    def on_batch_download_finished(self, result):
+        """일괄 수집 종료 처리 (GUI 스레드)"""
+        self.data_collection_running = False
+        self.data_collection_thread = None
+        self.dataBatchBtn.setText("일괄 수집")
+        self.dataBatchBtn.setEnabled(True)
+        if result is None:
+            return
+        total_rows = sum(result['tables'].values())
+        elapsed = result['elapsed']
+        self.append_data_result(
+            f"[완료] 일괄 수집: 테이블 {len(result['tables'])}개, {total_rows}건, 요청 {result['requests']}회 "
+            f"(실패 {result['failed']}회), {elapsed:.1f}초 ({result['requests'] / max(elapsed, 1e-9):.1f} req/s)")
+
+    def download_upbit_ohlcv(self, coin, upbit_interval, start_datetime, end_datetime):
+        """업비트에서 구간 데이터 수집 (지수 백오프 재시도, 실패 시 None)
+
+        거래가 없는 구간은 빈 DataFrame으로 돌려준다 (정상 응답이므로 재시도하지 않음).
+        """
+        max_retries = 3
+        retry_delay = 1  # 초
+        
+        for attempt in range(max_retries):
+            try:
+                self.append_data_result(f"데이터 수집 시도 {attempt + 1}/{max_retries}...")
+                df = pyupbit.get_ohlcv_from(
+                    ticker=f"KRW-{coin}",
+                    interval=upbit_interval,
+                    fromDatetime=start_datetime,
+                    to=end_datetime,
+                    period=0.1  # API 호출 간격
+                )
+                
+                if df is not None:
+                    return df
+                if attempt < max_retries - 1:
+                    self.append_data_result(f"데이터 수집 실패. {retry_delay}초 후 재시도...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # 지수 백오프
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    self.append_data_result(f"오류 발생: {str(e)}. {retry_delay}초 후 재시도...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    raise
+        return None
+
+    def sync_upbit_ohlcv(self, coin, upbit_interval, table_name, start_datetime, end_datetime, chart_table=None):
+        """증분 동기화: DB에 없는 구간(앞/뒤 빈 구간, 중간 구멍)만 업비트에서 받아 저장
+
+        chart_table이 있으면(1분봉에서 상위 봉 생성) 상위 봉 테이블을 갱신하고 그 테이블을 차트로 표시한다.
+        """
+        conn = ohlcv_store.connect()
+        try:
+            coverage = ohlcv_store.get_coverage(conn, table_name)
+            if coverage:
+                count, first, last = coverage
+                self.append_data_result(f"기존 데이터: {count}건, {first} ~ {last}")
+            missing = ohlcv_store.find_missing_ranges(conn, table_name, start_datetime, end_datetime)
+            if not missing:
+                self.append_data_result("[완료] 누락 구간 없음, 네트워크 요청 생략")
+            else:
+                self.append_data_result(f"누락 구간 {len(missing)}개 수집 시작...")
+                network_time = 0.0
+                total_saved = 0
+                for i, (range_start, range_end) in enumerate(missing, 1):
+                    self.append_data_result(f"[{i}/{len(missing)}] {range_start} ~ {range_end}")
+                    fetch_start = time.perf_counter()
+                    # to 시각의 봉은 포함되지 않으므로 한 봉 뒤까지 요청
+                    range_to = range_end + ohlcv_store.interval_step(table_name)
+                    df = self.download_upbit_ohlcv(coin, upbit_interval, range_start, range_to)
+                    network_time += time.perf_counter() - fetch_start
+                    if df is None:
+                        self.append_data_result("  - 수집 실패")
+                        continue
+                    if df.empty:
+                        self.append_data_result("  - 데이터 없음 (거래 없는 구간)")
+                    else:
+                        saved_rows, _ = self.save_ohlcv(conn, table_name, df)
+                        total_saved += saved_rows
+                    ohlcv_store.mark_fetched(conn, table_name, range_start, range_to)
+                self.append_data_result(f"[완료] 증분 동기화: {total_saved}건 저장, 네트워크 {network_time:.1f}초")
+            
+            if chart_table is not None:
+                self.update_derived_tables(conn, table_name)
+            df = ohlcv_store.load_ohlcv(conn, chart_table or table_name, start_datetime, end_datetime)
+        finally:
+            conn.close()
+        
+        if df is not None:
+            self.show_data_chart(df, coin)
+
     def show_data_chart(self, df, coin):
         try:
             print("차트 생성 시작...")
@@ -673,6 +860,17 @@ class AutoTradeWindow(QDialog):
         self.backtestParamLayout.addWidget(self.macdEmaGroup, 10, 0, 1, 2)
         self.param_groups['MACD+EMA'] = self.macdEmaGroup
 
+        # Optuna 최적화 설정 그룹
+        self.optunaGroup = self.create_param_group("Optuna 설정")
+        self.optunaWorkers = QSpinBox(); self.optunaWorkers.setRange(1, os.cpu_count() or 1); self.optunaWorkers.setValue(1)
+        self.optunaGroup.layout().addRow("병렬 워커 수:", self.optunaWorkers)
+        self.optunaPersist = QCheckBox("스터디 저장 (이어하기/웜스타트)"); self.optunaPersist.setChecked(True)
+        self.optunaGroup.layout().addRow(self.optunaPersist)
+        self.optunaPruner = QComboBox(); self.optunaPruner.addItems(["중앙값(Median)", "연속 반감(Successive Halving)", "사용 안 함"])
+        self.optunaGroup.layout().addRow("조기 중단:", self.optunaPruner)
+        self.backtestParamLayout.addWidget(self.optunaGroup, 11, 0, 1, 2)
+        self.param_groups['Optuna 설정'] = self.optunaGroup
+
     def setup_sim_param_groups(self):
         # 시뮬레이션 탭 전용 그룹만 생성 및 addWidget
         self.simFeeGroup = QGroupBox("수수료 설정")
@@ -983,6 +1181,13 @@ class AutoTradeWindow(QDialog):
                 self.sim_chart_window.close()
                 self.sim_chart_window = None
 
+    def parse_live_coins(self, text):
+        """함께 매매할 코인 입력 해석 ('ETH,XRP' 또는 'ALL')"""
+        coins = [coin.strip().upper() for coin in text.split(',') if coin.strip()]
+        if coins == ['ALL']:
+            return downloader.bithumb_krw_markets()
+        return coins
+
     def start_simulation(self):
         print(f"[DEBUG] AutoTradeWindow start_simulation parent.is_connected: {getattr(self.parent, 'is_connected', None)}")
         """시뮬레이션 시작"""
@@ -1071,10 +1276,11 @@ class AutoTradeWindow(QDialog):
             self.simulation_worker.show_data_chart_signal.connect(self.show_simulation_chart)
             
             # 빈 차트 생성을 위해 시그널 발생
-            self.simulation_worker.show_data_chart_signal.emit([], [], [], [])
+            self.simulation_worker.show_data_chart_signal.emit(self.simulation_worker.chart_view())
             
             # 시뮬레이션 시작
-            self.simulation_worker.run_simulation(strategy, coin, params, initial_capital, fee_rate)
+            self.simulation_worker.run_simulation(strategy, coin, params, initial_capital, fee_rate,
+                                                  coins=self.parse_live_coins(self.simExtraCoins.text()))
             
             # UI 업데이트
             self.simStatus.append("시뮬레이션이 시작되었습니다.")
@@ -1083,84 +1289,151 @@ class AutoTradeWindow(QDialog):
             self.simStatus.append(f"시뮬레이션 시작 실패: {str(e)}")
             traceback.print_exc()
 
-    def show_simulation_chart(self, price_history, trade_history, balance_history, volume_history=None):
-        """시뮬레이션 차트 표시"""
+    def create_simulation_chart(self):
+        """시뮬레이션 차트 창 생성 (축/선/마커 아티스트는 한 번만 만들고 이후에는 데이터만 바꿈)
+
+        데이터 아티스트는 animated로 두어 전체 그리기에서 빠지고, 축이 바뀌지 않으면
+        저장해 둔 배경 위에 아티스트만 다시 그려 블리팅한다.
+        """
+        self.sim_chart_window = QDialog(self)
+        self.sim_chart_window.setWindowTitle('시뮬레이션 결과 차트')
+        self.sim_chart_window.setGeometry(100, 100, 1200, 800)
+        
+        # 차트 생성
+        self.fig = Figure(figsize=(12, 8))
+        self.gs = gridspec.GridSpec(3, 1, height_ratios=[2, 1, 1], hspace=0.4)
+        
+        # 차트를 UI에 추가
+        self.canvas = FigureCanvas(self.fig)
+        layout = QVBoxLayout()
+        layout.addWidget(self.canvas)
+        self.sim_chart_window.setLayout(layout)
+        
+        # 가격 차트
+        ax1 = self.fig.add_subplot(self.gs[0])
+        ax1.set_title('가격 및 거래', pad=0)
+        ax1.set_xlabel('시간')
+        ax1.set_ylabel('가격')
+        ax1.grid(True)
+        ax1.legend(handles=[
+            Line2D([0], [0], color='b', label='가격'),
+            Line2D([0], [0], color='r', marker='^', linestyle='None', label='매수'),
+            Line2D([0], [0], color='g', marker='v', linestyle='None', label='매도'),
+        ])
+        
+        # 거래량 차트 (점)
+        ax2 = self.fig.add_subplot(self.gs[1], sharex=ax1)
+        ax2.set_title('거래량', pad=0)
+        ax2.set_ylabel('거래량')
+        ax2.grid(True, alpha=0.3)
+        
+        # 자본금 차트
+        ax3 = self.fig.add_subplot(self.gs[2], sharex=ax1)
+        ax3.set_title('자본금 변화', pad=0)
+        ax3.set_xlabel('시간')
+        ax3.set_ylabel('자본금')
+        ax3.grid(True)
+        
+        ax1.xaxis_date()
+        for ax in (ax1, ax2, ax3):
+            ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+        
+        self.sim_artists = {
+            'price': ax1.plot([], [], 'b-', animated=True)[0],
+            'buy': ax1.plot([], [], color='r', marker='^', markersize=10, linestyle='None', animated=True)[0],
+            'sell': ax1.plot([], [], color='g', marker='v', markersize=10, linestyle='None', animated=True)[0],
+            'volume': ax2.plot([], [], color='limegreen', marker='o', markersize=4, alpha=0.5, linestyle='None',
+                               label='거래량', animated=True)[0],
+            'balance': ax3.plot([], [], 'g-', label='자본금', animated=True)[0],
+        }
+        ax2.legend(loc='upper left')
+        ax3.legend(loc='upper left')
+        # 축별 (기준 시계열, 데이터 없을 때 안내 문구)
+        self.sim_axes = [
+            (ax1, 'price', ax1.text(0.5, 0.5, '가격 데이터 없음', ha='center', va='center', transform=ax1.transAxes)),
+            (ax2, 'volume', ax2.text(0.5, 0.5, '거래량 데이터 없음', ha='center', va='center', transform=ax2.transAxes)),
+            (ax3, 'balance', ax3.text(0.5, 0.5, '자본금 데이터 없음', ha='center', va='center', transform=ax3.transAxes)),
+        ]
+        self.sim_chart_background = None
+        self.canvas.mpl_connect('draw_event', self.on_simulation_chart_draw)
+        self.sim_chart_window.show()
+
+    def on_simulation_chart_draw(self, event):
+        """전체 그리기(축 변경, 창 크기 변경) 후 배경 저장 및 데이터 아티스트 그리기"""
+        self.sim_chart_background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.sim_artists.values():
+            artist.axes.draw_artist(artist)
+
+    def show_simulation_chart(self, view):
+        """시뮬레이션 차트 갱신 요청 (view: AutoTradeWorker.chart_view() 스냅샷)
+
+        프레임 예산(SIM_CHART_FRAME_INTERVAL)보다 자주 오면 마지막 스냅샷만 남겨 두었다가 한 번에 그린다.
+        """
+        self.sim_chart_pending = view
+        wait = self.SIM_CHART_FRAME_INTERVAL - (time.monotonic() - self.sim_chart_last_draw)
+        if wait > 0:
+            if not self.sim_chart_scheduled:
+                self.sim_chart_scheduled = True
+                QTimer.singleShot(int(wait * 1000), self.draw_simulation_chart)
+            return
+        self.draw_simulation_chart()
+
+    def sim_chart_needs_rescale(self, ax, x, y):
+        """데이터가 현재 축 범위를 벗어났거나 범위에 비해 너무 작아졌는지 여부"""
+        if len(x) == 0:
+            return False
+        x_lo, x_hi = ax.get_xlim()
+        y_lo, y_hi = ax.get_ylim()
+        x_span = x_hi - x_lo
+        y_min, y_max = np.nanmin(y), np.nanmax(y)
+        return (x[0] < x_lo or x[-1] > x_hi or x[0] - x_lo > x_span * 0.2
+                or y_min < y_lo or y_max > y_hi or 0 < y_max - y_min < (y_hi - y_lo) * 0.25)
+
+    def draw_simulation_chart(self):
+        """대기 중인 스냅샷으로 차트 갱신 (축 범위가 그대로면 블리팅, 벗어나면 여유를 두고 전체 다시 그리기)"""
+        self.sim_chart_scheduled = False
+        view, self.sim_chart_pending = self.sim_chart_pending, None
+        if view is None:
+            return
         try:
             # 차트 창이 없을 때만 새로 생성
             if not hasattr(self, 'sim_chart_window') or self.sim_chart_window is None:
-                self.sim_chart_window = QDialog(self)
-                self.sim_chart_window.setWindowTitle('시뮬레이션 결과 차트')
-                self.sim_chart_window.setGeometry(100, 100, 1200, 800)
-                
-                # 차트 생성
-                self.fig = Figure(figsize=(12, 8))
-                self.gs = gridspec.GridSpec(3, 1, height_ratios=[2, 1, 1], hspace=0.4)
-                
-                # 차트를 UI에 추가
-                self.canvas = FigureCanvas(self.fig)
-                layout = QVBoxLayout()
-                layout.addWidget(self.canvas)
-                self.sim_chart_window.setLayout(layout)
-                self.sim_chart_window.show()
-            
-            # 기존 서브플롯 제거
-            self.fig.clear()
-            
-            # 가격 차트
-            ax1 = self.fig.add_subplot(self.gs[0])
-            if price_history and len(price_history) > 0:
-                ax1.plot([t[0] for t in price_history], [t[1] for t in price_history], 'b-', label='가격')
-                buy_scatter = None
-                sell_scatter = None
-                if trade_history:
-                    for t in trade_history:
-                        if t['type'] == 'buy':
-                            buy_scatter = ax1.scatter(t['time'], t['price'], color='r', marker='^', s=100)
-                        elif t['type'] == 'sell':
-                            sell_scatter = ax1.scatter(t['time'], t['price'], color='g', marker='v', s=100)
-                legend_elements = [Line2D([0], [0], color='b', label='가격')]
-                if buy_scatter:
-                    legend_elements.append(Line2D([0], [0], color='r', marker='^', linestyle='None', label='매수'))
-                if sell_scatter:
-                    legend_elements.append(Line2D([0], [0], color='g', marker='v', linestyle='None', label='매도'))
-                ax1.legend(handles=legend_elements)
+                self.create_simulation_chart()
+            
+            for key, artist in self.sim_artists.items():
+                artist.set_data(*view[key])
+            
+            rescale = self.sim_chart_background is None
+            for ax, key, empty_text in self.sim_axes:
+                x, y = view[key]
+                if empty_text.get_visible() == (len(x) > 0):
+                    empty_text.set_visible(len(x) == 0)
+                    rescale = True
+                rescale = rescale or self.sim_chart_needs_rescale(ax, x, y)
+            
+            if rescale:
+                for ax, key, _ in self.sim_axes:
+                    x, y = view[key]
+                    if len(x) == 0:
+                        continue
+                    if ax is self.sim_axes[0][0]:  # 공유 x축: 오른쪽에 여유를 둬서 자주 다시 그리지 않게 함
+                        x_span = max(x[-1] - x[0], 60 / 86400)
+                        ax.set_xlim(x[0], x[-1] + x_span * 0.1)
+                    y_lo, y_hi = np.nanmin(y), np.nanmax(y)
+                    if ax is self.sim_axes[0][0]:
+                        for marker in ('buy', 'sell'):
+                            if len(view[marker][1]):
+                                y_lo = min(y_lo, np.nanmin(view[marker][1]))
+                                y_hi = max(y_hi, np.nanmax(view[marker][1]))
+                    y_pad = (y_hi - y_lo) * 0.1 or abs(y_hi) * 0.01 or 1
+                    ax.set_ylim(y_lo - y_pad, y_hi + y_pad)
+                self.canvas.draw()  # draw_event에서 배경 저장 후 아티스트 그리기
             else:
-                ax1.text(0.5, 0.5, '가격 데이터 없음', ha='center', va='center', transform=ax1.transAxes)
-            ax1.set_title('가격 및 거래', pad=0)
-            ax1.set_xlabel('시간')
-            ax1.set_ylabel('가격')
-            ax1.grid(True)
-            ax1.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
-            
-            # 거래량 차트 (scatter)
-            ax2 = self.fig.add_subplot(self.gs[1], sharex=ax1)
-            if volume_history and len(volume_history) > 0:
-                times = [t[0] for t in volume_history]
-                volumes = [float(t[1]) for t in volume_history]
-                ax2.scatter(times, volumes, color='limegreen', s=15, alpha=0.5, label='거래량')
-                ax2.legend()
-            else:
-                ax2.text(0.5, 0.5, '거래량 데이터 없음', ha='center', va='center', transform=ax2.transAxes)
-            ax2.set_title('거래량', pad=0)
-            ax2.set_ylabel('거래량')
-            ax2.grid(True, alpha=0.3)
-            ax2.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
-            
-            # 자본금 차트
-            ax3 = self.fig.add_subplot(self.gs[2], sharex=ax1)
-            if balance_history and len(balance_history) > 0:
-                ax3.plot([t[0] for t in balance_history], [t[1] for t in balance_history], 'g-', label='자본금')
-                ax3.legend()
-            else:
-                ax3.text(0.5, 0.5, '자본금 데이터 없음', ha='center', va='center', transform=ax3.transAxes)
-            ax3.set_title('자본금 변화', pad=0)
-            ax3.set_xlabel('시간')
-            ax3.set_ylabel('자본금')
-            ax3.grid(True)
-            ax3.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
-            
-            # 차트 업데이트
-            self.canvas.draw()
+                self.canvas.restore_region(self.sim_chart_background)
+                for artist in self.sim_artists.values():
+                    artist.axes.draw_artist(artist)
+                self.canvas.blit(self.fig.bbox)
+            self.sim_chart_last_draw = time.monotonic()
             
         except Exception as e:
             print(f"차트 생성 중 오류 발생: {str(e)}")
@@ -1254,10 +1527,11 @@ class AutoTradeWindow(QDialog):
             self.trading_worker.show_data_chart_signal.connect(self.show_simulation_chart)
             
             # 빈 차트 생성을 위해 시그널 발생
-            self.trading_worker.show_data_chart_signal.emit([], [], [], [])
+            self.trading_worker.show_data_chart_signal.emit(self.trading_worker.chart_view())
             
             # 자동매매 시작
-            self.trading_worker.run_auto_trading(strategy, coin, params, initial_capital, fee_rate)
+            self.trading_worker.run_auto_trading(strategy, coin, params, initial_capital, fee_rate,
+                                                 coins=self.parse_live_coins(self.tradeExtraCoins.text()))
             
             # UI 업데이트
             self.tradeStatus.append("자동매매가 시작되었습니다.")
@@ -1603,9 +1877,14 @@ class AutoTradeWindow(QDialog):
             traceback.print_exc()
 
     def run_optuna_optimization(self):
-        """Optuna를 사용한 전략 최적화 실행"""
+        """Optuna를 사용한 전략 최적화 실행 (워커 스레드에서 실행, 실행 중 누르면 취소)"""
         try:
-            import time
+            if getattr(self, 'optuna_thread', None) is not None:
+                self.optuna_worker.cancel()
+                self.optunaOptimizeBtn.setEnabled(False)
+                self.backtestStatus.append("\n취소 요청됨: 진행 중인 시도가 끝나면 중단합니다...")
+                return
+            
             strategy_name = self.backtestStrategyCombo.currentText()
             strategy = StrategyFactory.create_strategy(strategy_name)
             
@@ -1613,11 +1892,10 @@ class AutoTradeWindow(QDialog):
                 QMessageBox.warning(self, "경고", "전략을 선택해주세요.")
                 return
                 
-            df = self.fetch_historical_data(
-                self.backtestStartDate.date().toPyDate(),
-                self.backtestEndDate.date().toPyDate(),
-                self.backtestIntervalCombo.currentText()
-            )
+            start_date = self.backtestStartDate.date().toPyDate()
+            end_date = self.backtestEndDate.date().toPyDate()
+            interval = self.backtestIntervalCombo.currentText()
+            df = self.fetch_historical_data(start_date, end_date, interval)
             
             if df is None or len(df) < 30:
                 QMessageBox.warning(self, "경고", "충분한 데이터가 없습니다.")
@@ -1630,13 +1908,69 @@ class AutoTradeWindow(QDialog):
             self.backtestStatus.append(f"테스트 기간: {df.index[0].strftime('%Y-%m-%d')} ~ {df.index[-1].strftime('%Y-%m-%d')}")
             self.backtestStatus.append(f"데이터 포인트 수: {len(df)}개")
             self.backtestStatus.append(f"최적화 시도 횟수: 100회")
+            n_jobs = self.optunaWorkers.value()
+            self.backtestStatus.append(f"병렬 워커 수: {n_jobs}개")
             self.backtestStatus.append("\n최적화 진행 중...")
             
-            start_time = time.time()
             fee_rate = float(self.feeRateSpinBox.value()) / 100
-            optimizer = OptunaOptimizer(strategy, strategy_name, df, 100, fee_rate=fee_rate)
-            result = optimizer.optimize()
-            elapsed = time.time() - start_time
+            storage, study_name = None, None
+            if self.optunaPersist.isChecked():
+                storage = OPTUNA_STORAGE
+                study_name = make_study_name(strategy_name, self.backtestCoinCombo.currentText(), interval, start_date, end_date)
+            pruner = {0: 'median', 1: 'halving'}.get(self.optunaPruner.currentIndex())
+            table_name = self.get_table_name(self.backtestCoinCombo.currentText(), interval)
+            cache_key = (table_name,
+                         datetime.combine(start_date, datetime.min.time()),
+                         datetime.combine(end_date, datetime.max.time()))
+            optimizer = OptunaOptimizer(strategy, strategy_name, df, 100, fee_rate=fee_rate, n_jobs=n_jobs,
+                                        storage=storage, study_name=study_name, pruner=pruner,
+                                        cache_key=cache_key)
+            self.optuna_context = {
+                'strategy_name': strategy_name,
+                'df': df,
+                'interval': interval,
+                'fee_rate': fee_rate,
+                'optimizer': optimizer,
+                'start_time': time.time()
+            }
+            
+            # 워커 스레드 생성 및 시작
+            self.optuna_thread = QThread(self)
+            self.optuna_worker = OptunaWorker(optimizer)
+            self.optuna_worker.moveToThread(self.optuna_thread)
+            self.optuna_thread.started.connect(self.optuna_worker.run)
+            self.optuna_worker.trial_finished_signal.connect(self.on_optuna_trial_finished)
+            self.optuna_worker.finished_signal.connect(self.on_optuna_finished)
+            self.optuna_worker.finished_signal.connect(self.optuna_thread.quit)
+            self.optuna_thread.finished.connect(self.optuna_worker.deleteLater)
+            self.optuna_thread.finished.connect(self.optuna_thread.deleteLater)
+            self.optunaOptimizeBtn.setText("최적화 취소")
+            self.optuna_thread.start()
+        except Exception as e:
+            QMessageBox.critical(self, "오류", f"최적화 실행 중 오류가 발생했습니다: {str(e)}")
+            self.backtestStatus.append(f"\n오류 발생: {str(e)}")
+            traceback.print_exc()
+
+    def on_optuna_trial_finished(self, number, total, state, value, best_value, duration):
+        """시도 하나가 끝날 때마다 진행률/최고값/소요 시간 표시"""
+        value_text = f"{value:.4f}" if state == 'COMPLETE' else state
+        best_text = f"{best_value:.4f}" if best_value == best_value else '-'  # NaN이면 아직 없음
+        self.backtestStatus.append(
+            f"[{number}/{total}] 값: {value_text} | 최고: {best_text} | 소요: {duration:.2f}초")
+
+    def on_optuna_finished(self, result):
+        """최적화 종료 처리 (결과 표시 및 최적 파라미터 백테스트)"""
+        context = self.optuna_context
+        self.optuna_thread = None
+        self.optuna_worker = None
+        self.optunaOptimizeBtn.setText("Optuna 파라미터 최적화")
+        self.optunaOptimizeBtn.setEnabled(True)
+        try:
+            elapsed = time.time() - context['start_time']
+            optimizer = context['optimizer']
+            strategy_name = context['strategy_name']
+            df = context['df']
+            fee_rate = context['fee_rate']
             
             if result is None:
                 QMessageBox.warning(self, "경고", "최적화 실행 중 오류가 발생했습니다.")
@@ -1646,12 +1980,21 @@ class AutoTradeWindow(QDialog):
             best_value = result['best_value']
             study = result['study']
             n_trials = len([t for t in study.trials if t.state.name == 'COMPLETE'])
+            n_pruned = len([t for t in study.trials if t.state.name == 'PRUNED'])
             
             # 최적화 결과 상세 표시 (로그창)
             self.backtestStatus.append("\n=== Optuna 최적화 결과 ===")
+            if result.get('cancelled'):
+                self.backtestStatus.append("(사용자 취소로 중단됨, 완료된 시도 기준 결과)")
             self.backtestStatus.append(f"최적 파라미터: {best_params}")
             self.backtestStatus.append(f"최적 목적함수 값: {best_value:.4f}")
             self.backtestStatus.append(f"최적화 시도 횟수: {n_trials}회")
+            if n_pruned:
+                self.backtestStatus.append(f"조기 중단된 시도: {n_pruned}회")
+            if optimizer.prior_trials:
+                self.backtestStatus.append(f"저장된 스터디 이어하기: 이전 시도 {optimizer.prior_trials}회 포함")
+            elif optimizer.warm_started:
+                self.backtestStatus.append(f"웜스타트: 이전 기간 상위 파라미터 {optimizer.warm_started}개로 시작")
             self.backtestStatus.append(f"최적화 소요 시간: {int(elapsed//60):02d}:{int(elapsed%60):02d}")
             
             # 중요 참고 정보
@@ -1660,7 +2003,7 @@ class AutoTradeWindow(QDialog):
             try:
                 engine = BacktestEngine(fee_rate=fee_rate)
                 backtest_result = engine.backtest_strategy(
-                    strategy_name, best_params, df, self.backtestIntervalCombo.currentText(), 1000000)
+                    strategy_name, best_params, df, context['interval'], 1000000)
             except Exception as e:
                 backtest_result = None
             if backtest_result:
@@ -1681,33 +2024,44 @@ class AutoTradeWindow(QDialog):
             traceback.print_exc()
 
     def fetch_historical_data(self, start_date, end_date, interval):
-        """히스토리컬 데이터 가져오기"""
+        """히스토리컬 데이터 가져오기 (같은 테이블/기간은 조회 캐시에서 바로 반환)"""
         try:
-            conn = sqlite3.connect('ohlcv.db')
-            cursor = conn.cursor()
             coin = self.backtestCoinCombo.currentText()
             table_name = self.get_table_name(coin, interval)
-            # 날짜 포맷 맞추기
-            start_date_str = datetime.combine(start_date, datetime.min.time()).strftime('%Y-%m-%d %H:%M:%S')
-            end_date_str = datetime.combine(end_date, datetime.max.time()).strftime('%Y-%m-%d %H:%M:%S')
-            query = f"""
-                SELECT date, open, high, low, close, volume
-                FROM {table_name}
-                WHERE date BETWEEN ? AND ?
-                ORDER BY date
-            """
-            print(f"쿼리 테이블: {table_name}, 기간: {start_date_str} ~ {end_date_str}")
-            cursor.execute(query, (start_date_str, end_date_str))
-            rows = cursor.fetchall()
-            if not rows:
-                return None
-            df = pd.DataFrame(rows, columns=['date', 'open', 'high', 'low', 'close', 'volume'])
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
+            start_datetime = datetime.combine(start_date, datetime.min.time())
+            end_datetime = datetime.combine(end_date, datetime.max.time())
+            cache_key = (table_name, start_datetime, end_datetime)
+            df = self.frame_cache.get(cache_key)
+            if df is not None:
+                print(f"조회 캐시 사용: {table_name}, 기간: {start_datetime} ~ {end_datetime}")
+                return df
+            # 읽는 사이 일괄 수집 스레드가 저장(무효화)하면 put이 이전 데이터를 넣지 않는다
+            generation = self.frame_cache.generation(table_name)
+            df = self.load_historical_data(table_name, start_datetime, end_datetime)
+            if df is not None:
+                self.frame_cache.put(cache_key, df, generation)
             return df
         except Exception as e:
             QMessageBox.critical(self, "오류", f"데이터 조회 중 오류가 발생했습니다: {str(e)}")
             return None
+
+    def load_historical_data(self, table_name, start_datetime, end_datetime):
+        """저장소에서 히스토리컬 데이터 읽기 (캔들 캐시 -> Arrow -> SQLite 순)"""
+        try:
+            # 메모리 맵 캔들 캐시 (없으면 Arrow 캔들 저장소, 그것도 없으면 DB 테이블 전체로 한 번 생성)
+            if not candle_cache.has_cache(table_name):
+                candle_cache.build_cache(table_name)
+            df = candle_cache.load_frame(table_name, start_datetime, end_datetime)
+            if df is not None:
+                return df
+            # 캐시를 만들지 못했으면 Arrow 캔들 저장소, SQLite 순으로 직접 조회
+            if arrow_store.has_candles(table_name):
+                df = arrow_store.load_candles(table_name, start_datetime, end_datetime)
+                if df is not None:
+                    return df
+            conn = ohlcv_store.connect()
+            print(f"쿼리 테이블: {table_name}, 기간: {start_datetime} ~ {end_datetime}")
+            return ohlcv_store.load_ohlcv(conn, table_name, start_datetime, end_datetime)
         finally:
             if 'conn' in locals():
                 conn.close()
@@ -1732,14 +2086,27 @@ class AutoTradeWindow(QDialog):
         """창이 닫힐 때 호출되는 이벤트 핸들러"""
         try:
             print("[DEBUG] 창 닫기 시작")
-            
+
+            # 진행 중인 일괄 수집 중지 요청
+            self.data_collection_stop_event.set()
+
+            # 진행 중인 Optuna 최적화 중지
+            if getattr(self, 'optuna_thread', None) is not None:
+                # 닫히는 창으로 진행/결과 시그널이 오지 않도록 먼저 끊고, 실행 중인 시도는 기다리지 않는다
+                self.optuna_worker.trial_finished_signal.disconnect(self.on_optuna_trial_finished)
+                self.optuna_worker.finished_signal.disconnect(self.on_optuna_finished)
+                self.optuna_worker.abort()
+                self.optuna_thread.quit()
+                if not self.optuna_thread.wait(self.OPTUNA_CLOSE_WAIT_MS):
+                    print("[DEBUG] Optuna 스레드 종료 대기 시간 초과 (진행 중인 시도가 끝나면 종료)")
+                self.optuna_thread = None
+                self.optuna_worker = None
+
             # 자동매매 중지
             if hasattr(self, 'trading_worker') and self.trading_worker:
                 print("[DEBUG] 자동매매 워커 정리 시작")
                 self.trading_worker.trading_enabled = False
-                if hasattr(self.trading_worker, 'trading_timer'):
-                    self.trading_worker.trading_timer.stop()
-                    self.trading_worker.trading_timer.deleteLater()
+                self.trading_worker.stop_engine()
                 self.trading_worker.deleteLater()
                 self.trading_worker = None
                 self.tradeStartBtn.setText("자동매매 시작")
@@ -1750,9 +2117,7 @@ class AutoTradeWindow(QDialog):
             if hasattr(self, 'simulation_worker') and self.simulation_worker:
                 print("[DEBUG] 시뮬레이션 워커 정리 시작")
                 self.simulation_worker.simulation_enabled = False
-                if hasattr(self.simulation_worker, 'simulation_timer'):
-                    self.simulation_worker.simulation_timer.stop()
-                    self.simulation_worker.simulation_timer.deleteLater()
+                self.simulation_worker.stop_engine()
                 self.simulation_worker.deleteLater()
                 self.simulation_worker = None
                 self.simStartBtn.setText("시뮬레이션 시작")
@@ -1787,10 +2152,81 @@ class AutoTradeWindow(QDialog):
             traceback.print_exc()
             event.accept()
 
+class OptunaWorker(QObject):
+    """Optuna 최적화를 GUI 스레드 밖에서 실행하는 워커 (QThread로 이동해 사용)"""
+    # 시도 번호, 전체 시도 수, 상태, 값, 현재 최고값, 소요 시간(초)
+    trial_finished_signal = pyqtSignal(int, int, str, float, float, float)
+    finished_signal = pyqtSignal(object)  # optimize() 결과 (실패 시 None)
+    
+    def __init__(self, optimizer):
+        super().__init__()
+        self.optimizer = optimizer
+        self.stop_event = threading.Event()
+        self.abort_event = threading.Event()
+        self.optimizer.stop_event = self.stop_event
+        self.optimizer.abort_event = self.abort_event
+        self.optimizer.trial_callback = self.on_trial_finished
+        self.finished_trials = 0
+        
+    def run(self):
+        result = None
+        try:
+            result = self.optimizer.optimize()
+        except Exception as e:
+            print(f"최적화 워커 오류: {str(e)}")
+            traceback.print_exc()
+        self.finished_signal.emit(result)
+        
+    def cancel(self):
+        """진행 중인 시도가 끝나면 최적화 중단"""
+        self.stop_event.set()
+
+    def abort(self):
+        """진행 중인 시도를 기다리지 않고 최적화 중단 (병렬 모드, 창 닫기용)"""
+        self.abort_event.set()
+        self.stop_event.set()
+        
+    def on_trial_finished(self, study, trial):
+        self.finished_trials += 1
+        try:
+            best_value = study.best_value
+        except ValueError:  # 완료된 시도가 아직 없음
+            best_value = float('nan')
+        value = trial.value if trial.value is not None else float('nan')
+        duration = trial.duration.total_seconds() if trial.duration is not None else 0.0
+        self.trial_finished_signal.emit(self.finished_trials, self.optimizer.n_trials, trial.state.name,
+                                        value, best_value, duration)
+
+class CoinState:
+    """포트폴리오 엔진의 코인별 매매 상태 (잔고/포지션/마지막 신호/전략 객체와 증분 지표 상태)"""
+    def __init__(self, coin, capital, strategy, params=None):
+        self.coin = coin
+        self.capital = capital  # 코인별 배정 금액
+        self.balance = capital
+        self.position = 0
+        self.last_signal = None
+        self.last_price = None
+        self.params = params or {}
+        self.strategy_obj = StrategyFactory.create_strategy(strategy)
+        # 봉 단위 증분 신호 계산 (틱마다 새 봉/진행 중인 봉만 반영). 지원하지 않는 전략은 None
+        self.signal_stream = self.strategy_obj.create_signal_stream(**self.params) if self.strategy_obj else None
+        self.trades = deque(maxlen=1000)  # 최근 거래 기록
+
+    def value(self):
+        return self.balance + self.position * (self.last_price or 0)
+
+    def signal(self, df):
+        """현재 캔들 프레임 기준 신호 (증분 상태가 없으면 프레임 전체로 generate_signal 계산)"""
+        if self.signal_stream is not None:
+            return self.signal_stream.feed(df)
+        return self.strategy_obj.generate_signal(df, **self.params)
+
+
 class AutoTradeWorker(QObject):
     # 시그널 정의
-    show_data_chart_signal = pyqtSignal(list, list, list, list)  # price_history, trade_history, balance_history, volume_history
+    show_data_chart_signal = pyqtSignal(object)  # chart_view() 스냅샷 (고정 크기 배열)
     update_status_signal = pyqtSignal(str)  # 상태 메시지 업데이트용 시그널
+    updates_ready = pyqtSignal()  # 엔진 스레드 -> GUI 스레드: 업데이트 큐에 새 항목이 들어옴
     
     def __init__(self, parent=None):
         super().__init__()
@@ -1800,51 +2236,241 @@ class AutoTradeWorker(QObject):
         # self.is_connected = False  # 테스트를 위해 True로 설정
         self.trading_enabled = False        
         
-        # 트레이딩 상태 변수들
-        self.balance = 0
-        self.position = 0
-        self.last_signal = None
-        self.price_history = []
-        self.trade_history = []
-        self.balance_history = []
-        self.volume_history = []
+        # 트레이딩 상태 변수들 (코인별 상태는 states, 차트는 첫 번째 코인 기준)
+        # 차트 기록은 고정 크기 다중 해상도 버퍼: 최근 1시간은 1초 단위, 이후 60시간은 1분, 150일은 1시간 단위
+        self.states = {}
+        self.price_history = live_engine.HistoryBuffer(how='last')
+        self.balance_history = live_engine.HistoryBuffer(how='last')
+        self.volume_history = live_engine.HistoryBuffer(how='mean')
+        self.buy_markers = live_engine.HistoryBuffer(capacity=1000, levels=1)  # 최근 매수 (시각, 가격)
+        self.sell_markers = live_engine.HistoryBuffer(capacity=1000, levels=1)  # 최근 매도 (시각, 가격)
         self.strategy = None
         self.coin = None
+        self.coins = []
         self.params = None
         self.initial_capital = 0
         self.fee_rate = 0
-        self.min_candle = 30        
+        self.min_candle = 30
+
+        # 시세 조회/전략 계산은 live_engine 스레드에서 하고, UI 업데이트는 고정 크기 큐로 넘긴다
+        self.engine = None
+        self.feed = None
+        self.buffers = {}  # REST 모드 코인별 1분봉 링 버퍼
+        self.seeded = set()  # 분봉 초기화(seed)에 성공한 코인
+        self.updates = live_engine.UpdateQueue()
+        self.updates_ready.connect(self.flush_updates)
+
+    def setup_portfolio(self, strategy, coin, params, initial_capital, fee_rate, coins=None):
+        """매매 상태 초기화 (투자금액은 코인 수로 나눠 배정)"""
+        self.strategy = strategy
+        self.coin = coin
+        self.coins = [coin] + [c for c in dict.fromkeys(coins or []) if c != coin]
+        self.params = params
+        self.initial_capital = initial_capital
+        self.fee_rate = fee_rate
+        capital = initial_capital / len(self.coins)
+        self.states = {c: CoinState(c, capital, strategy, params) for c in self.coins}
+        self.clear_history()
+
+    def clear_history(self):
+        for history in (self.price_history, self.balance_history, self.volume_history,
+                        self.buy_markers, self.sell_markers):
+            history.clear()
+
+    def reset_portfolio(self):
+        self.strategy = None
+        self.coin = None
+        self.coins = []
+        self.params = None
+        self.states = {}
+        self.clear_history()
+
+    def start_engine(self, on_tick):
+        """1초 간격 비동기 매매 엔진 시작 (GUI 스레드를 막지 않음)
+
+        모든 코인을 하나의 엔진에서 처리한다. websockets가 설치되어 있으면 웹소켓 하나로 전체 코인 시세를
+        구독해 1분봉을 직접 만들고 REST는 백필에만 쓴다. 없으면 틱마다 전체 코인 현재가를 한 번에 조회해
+        코인별 1분봉 링 버퍼의 진행 중인 봉을 갱신한다 (분봉 REST 조회는 처음 한 번만).
+        """
+        self.stop_engine()
+        self.updates.drain()
+        capacity = max(self.min_candle, 200)
+        fetch, tasks = self.fetch_market_data, []
+        if market_feed.available():
+            # MARKET_FEED_URL로 로컬 리플레이 서버(python market_feed.py)에 연결할 수 있다
+            self.feed = market_feed.MarketFeed(
+                [f"KRW-{coin}" for coin in self.coins], self.fetch_seed_candles,
+                url=os.getenv('MARKET_FEED_URL', market_feed.WS_URLS['빗썸']),
+                max_candles=capacity, log=self.post_status)
+            fetch, tasks = self.read_market_feed, [self.feed.run]
+        else:
+            self.buffers = {coin: market_feed.CandleBuffer(capacity) for coin in self.coins}
+            self.seeded = set()
+        self.engine = live_engine.LiveEngine(fetch, on_tick, interval=1.0, tasks=tasks,
+                                             on_error=lambda e: self.post_status(f"시세 조회 오류: {str(e)}"))
+        self.engine.start()
+
+    def stop_engine(self):
+        if self.engine is not None:
+            self.engine.stop()
+            stats = self.engine.stats
+            print(f"[DEBUG] 엔진 중지: 처리 틱 {stats['ticks']}, 병합 틱 {stats['coalesced']}, "
+                  f"최대 지연 {stats['max_latency']:.2f}초, 버린 업데이트 {self.updates.dropped}")
+            self.engine = None
+        self.feed = None
+        self.buffers = {}
+        self.seeded = set()
+        self.updates.drain()
+
+    def fetch_seed_candles(self, code):
+        """링 버퍼 초기화용 분봉 조회 (REST)"""
+        return python_bithumb.get_ohlcv(code, interval="minute1", count=max(self.min_candle, 200))
+
+    async def fetch_market_data(self):
+        """전체 코인 현재가를 한 번에 조회해 코인별 1분봉 버퍼 갱신 (블로킹 HTTP 호출은 스레드 풀에서 겹쳐 실행)
+
+        분봉은 아직 초기화되지 않은 코인만 REST로 받아 채우고, 이후에는 현재가로 진행 중인 봉만 갱신한다.
+        초기화에 실패한 코인은 현재가로 봉을 만들지 않고 다음 틱에 다시 받는다 (봉 몇 개로 시작하지 않도록).
+
+        Returns:
+            {코인: (현재가, 분봉 DataFrame 뷰)}
+        """
+        loop = asyncio.get_running_loop()
+        codes = [f"KRW-{coin}" for coin in self.coins]
+        unseeded = [coin for coin in self.coins if coin not in self.seeded]
+        tickers, *seeds = await asyncio.gather(
+            loop.run_in_executor(None, market_feed.fetch_tickers, codes),
+            *[loop.run_in_executor(None, self.fetch_seed_candles, f"KRW-{coin}") for coin in unseeded],
+            return_exceptions=True)
+        if isinstance(tickers, Exception):
+            raise tickers
+        for coin, df in zip(unseeded, seeds):
+            if isinstance(df, Exception):
+                self.post_status(f"[{coin}] 분봉 조회 오류: {str(df)}")
+            elif df is not None and not df.empty:
+                self.buffers[coin].seed(df)
+                self.seeded.add(coin)
+
+        market_data = {}
+        for coin, code in zip(self.coins, codes):
+            if code not in tickers:
+                market_data[coin] = (None, None)
+                continue
+            current_price, acc_volume, ts_ms = tickers[code]
+            if coin not in self.seeded:
+                market_data[coin] = (current_price, None)
+                continue
+            buffer = self.buffers[coin]
+            buffer.update_ticker(current_price, acc_volume, ts_ms)
+            market_data[coin] = (current_price, buffer.frame(self.min_candle))
+        return market_data
+
+    async def read_market_feed(self):
+        """웹소켓으로 유지 중인 시세 상태에서 현재가와 분봉 조회 (네트워크 요청 없음)"""
+        return {coin: (self.feed.price(f"KRW-{coin}"), self.feed.frame(f"KRW-{coin}", self.min_candle))
+                for coin in self.coins}
+
+    def post_status(self, message):
+        """엔진 스레드에서 상태 메시지 전달"""
+        if self.updates.put(('status', message)):
+            self.updates_ready.emit()
+
+    def post_chart(self):
+        """엔진 스레드에서 차트 갱신 요청 (GUI가 밀려 있으면 한 번으로 합쳐짐)"""
+        if self.updates.put(('chart', None)):
+            self.updates_ready.emit()
+
+    def flush_updates(self):
+        """GUI 스레드에서 쌓인 업데이트 처리 (차트는 최신 상태로 한 번만 그림)"""
+        redraw = False
+        for kind, message in self.updates.drain():
+            if kind == 'status':
+                self.update_status_signal.emit(message)
+            else:
+                redraw = True
+        if redraw:
+            self.show_data_chart_signal.emit(self.chart_view())
+
+    def chart_view(self):
+        """차트용 스냅샷 {'price'/'balance'/'volume'/'buy'/'sell': (시각 배열, 값 배열)}
+
+        시각은 matplotlib 날짜 숫자다. 버퍼 크기가 고정이라 실행 시간과 무관하게 크기가 일정하다.
+        """
+        return {
+            'price': self.price_history.snapshot(),
+            'balance': self.balance_history.snapshot(),
+            'volume': self.volume_history.snapshot(),
+            'buy': self.buy_markers.snapshot(),
+            'sell': self.sell_markers.snapshot(),
+        }
+
+    def process_tick(self, market_data, handle_coin):
+        """틱 1회 처리: 코인별로 신호를 계산해 handle_coin(state, 현재가, df, now)에 나눠 주고 차트 기록
 
-    def run_simulation(self, strategy, coin, params, initial_capital, fee_rate):
-        """시뮬레이션 실행"""
+        첫 번째 코인의 가격/거래량과 포트폴리오 전체 평가금액을 기록한다.
+        """
+        now = datetime.now()
+        for coin in self.coins:
+            state = self.states[coin]
+            current_price, df = market_data.get(coin, (None, None))
+            if current_price is None:
+                if coin == self.coin:
+                    self.post_status("현재가 조회 실패")
+                continue
+            if df is None or df.empty or len(df) < self.min_candle:
+                if coin == self.coin:
+                    self.post_status(f"캔들 데이터 부족: {0 if df is None else len(df)}개")
+                continue
+            state.last_price = current_price
+            if state.strategy_obj is None:
+                continue
+            try:
+                signal = state.signal(df)
+                handle_coin(state, current_price, df, now, signal)
+            except Exception as e:
+                self.post_status(f"[{coin}] 신호 처리 오류: {str(e)}")
+                traceback.print_exc()
+
+        primary = self.states[self.coin]
+        if primary.last_price is None:
+            return
+        total_value = sum(state.value() for state in self.states.values())
+        self.balance_history.append(mdates.date2num(now), total_value)
+        self.post_chart()
+        if len(self.coins) > 1:
+            holding = sum(1 for state in self.states.values() if state.position > 0)
+            self.post_status(f"[{now.strftime('%H:%M:%S')}] 포트폴리오 {len(self.coins)}개 코인, 보유 {holding}개, 평가금액: {total_value:,.0f}원")
+
+    def record_primary(self, state, current_price, volume, now, signal):
+        """차트 대상 코인(첫 번째 코인)의 가격/거래량 기록 및 상태 표시"""
+        if state.coin != self.coin:
+            return
+        self.post_status(f"[{now.strftime('%H:%M:%S')}] 현재가: {current_price:,.0f}원, 신호: {signal if signal else '없음'}, 잔고: {state.balance:,.0f}원, 포지션: {state.position:.6f}")
+        t = mdates.date2num(now)
+        self.price_history.append(t, current_price)
+        self.volume_history.append(t, volume)
+
+    def record_trade(self, state, trade):
+        trade['coin'] = state.coin
+        state.trades.append(trade)
+        if state.coin == self.coin:
+            markers = self.buy_markers if trade['type'] == 'buy' else self.sell_markers
+            markers.append(mdates.date2num(trade['time']), trade['price'])
+
+    def run_simulation(self, strategy, coin, params, initial_capital, fee_rate, coins=None):
+        """시뮬레이션 실행 (coins: 함께 매매할 코인 목록, 차트는 coin 기준)"""
         try:
-            self.strategy = strategy
-            self.coin = coin
-            self.params = params
-            self.initial_capital = initial_capital
-            self.fee_rate = fee_rate
-            self.balance = initial_capital
-            self.position = 0
-            self.last_signal = None
-            self.price_history = []
-            self.trade_history = []
-            self.balance_history = []
-            self.volume_history = []
+            self.setup_portfolio(strategy, coin, params, initial_capital, fee_rate, coins)
             
             # 전략별로 필요한 최소 캔들 개수 계산
             self.min_candle = self.calculate_min_candles()
-            print(f"[DEBUG-SIM-8] 전략: {strategy}, 코인: {coin}, 필요 캔들 수: {self.min_candle}")
-            print(f"[DEBUG-SIM-9] 타이머 시작 시도")
+            print(f"[DEBUG-SIM-8] 전략: {strategy}, 코인: {', '.join(self.coins)}, 필요 캔들 수: {self.min_candle}")
+            print(f"[DEBUG-SIM-9] 엔진 시작 시도")
             
-            # 타이머 시작 (1초 간격)
+            # 엔진 시작 (1초 간격)
             self.simulation_enabled = True
-            if hasattr(self, 'simulation_timer'):
-                self.simulation_timer.stop()
-                self.simulation_timer.deleteLater()
-            self.simulation_timer = QTimer(self)  # self를 부모로 설정
-            self.simulation_timer.timeout.connect(self.simulation_loop)
-            self.simulation_timer.start(1000)  # 1000ms = 1초
-            print("[DEBUG-SIM-10] 타이머 시작 완료")
+            self.start_engine(self.simulation_loop)
+            print("[DEBUG-SIM-10] 엔진 시작 완료")
             
         except Exception as e:
             print(f"[DEBUG-SIM-ERR] 오류 발생: {str(e)}")
@@ -1855,150 +2481,98 @@ class AutoTradeWorker(QObject):
         """시뮬레이션 중지"""
         print("[DEBUG] 시뮬레이션 중지 시도")
         self.simulation_enabled = False
-        if hasattr(self, 'simulation_timer'):
-            self.simulation_timer.stop()
-            self.simulation_timer.deleteLater()
-            self.simulation_timer = None
+        self.stop_engine()
         
         # 모든 변수 초기화
-        self.strategy = None
-        self.coin = None
-        self.params = None
-        self.balance = 0
-        self.position = 0
-        self.last_signal = None
-        self.price_history.clear()
-        self.trade_history.clear()
-        self.balance_history.clear()
-        self.volume_history.clear()
+        self.reset_portfolio()
         
         print("[DEBUG] 시뮬레이션 중지 완료")
         self.update_status_signal.emit("시뮬레이션이 중지되었습니다.")
 
-    def simulation_loop(self):
-        """시뮬레이션 루프"""
+    def simulation_loop(self, market_data):
+        """시뮬레이션 틱 처리 (엔진 스레드에서 호출, market_data = {코인: (현재가, 분봉 DataFrame)})"""
         try:
-            # 실시간 현재가 조회
-            current_price = python_bithumb.get_current_price(f"KRW-{self.coin}")
-            if current_price is None:
-                self.update_status_signal.emit("현재가 조회 실패")
-                return
-
-            # OHLCV 데이터는 전략 계산용으로만 사용
-            df = python_bithumb.get_ohlcv(f"KRW-{self.coin}", interval="minute1", count=self.min_candle)
-            if df.empty or len(df) < self.min_candle:
-                self.update_status_signal.emit(f"캔들 데이터 부족: {len(df)}개")
-                return
-
-            now = datetime.now()
-            volume = df.iloc[-1]['volume']  # 거래량은 캔들 데이터에서 가져옴
-
-            # 전략 객체 생성 및 신호 생성
-            strategy_obj = StrategyFactory.create_strategy(self.strategy)
-            if strategy_obj is None:
-                return
-
-            signal = strategy_obj.generate_signal(df, **self.params)
-
-            # 상태 업데이트
-            self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 현재가: {current_price:,.0f}원, 신호: {signal if signal else '없음'}, 잔고: {self.balance:,.0f}원, 포지션: {self.position:.6f}")
-            self.price_history.append((now, current_price))
-            self.balance_history.append((now, self.balance + self.position * current_price))
-            self.volume_history.append((now, volume))
-
-            # 매매 신호에 따른 거래 실행
-            if signal == 'buy' and self.last_signal != 'buy':
-                amount = self.initial_capital / current_price
-                fee = amount * current_price * self.fee_rate
-                self.position += amount
-                self.balance -= (self.initial_capital + fee)
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매수 신호! {self.initial_capital:,.0f}원 매수, 보유: {self.position:.6f} (수수료: {fee:,.0f}원)")
-                self.trade_history.append({
-                    'time': now,
-                    'type': 'buy',
-                    'price': current_price,
-                    'amount': amount,
-                    'balance': self.balance,
-                    'position': self.position,
-                    'fee': fee
-                })
-                self.last_signal = 'buy'
-            elif signal == 'sell' and self.position > 0 and self.last_signal != 'sell':
-                sell_value = self.position * current_price
-                fee = sell_value * self.fee_rate
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매도 신호! {sell_value:,.0f}원 매도, 보유: 0 (수수료: {fee:,.0f}원)")
-                self.trade_history.append({
-                    'time': now,
-                    'type': 'sell',
-                    'price': current_price,
-                    'amount': self.position,
-                    'balance': self.balance + sell_value - fee,
-                    'position': 0,
-                    'fee': fee
-                })
-                self.balance += (sell_value - fee)
-                self.position = 0
-                self.last_signal = 'sell'
-            else:
-                self.last_signal = None
-
-            # 차트 업데이트
-            self.show_data_chart_signal.emit(self.price_history, self.trade_history, self.balance_history, self.volume_history)
-
+            self.process_tick(market_data, self.simulate_coin)
         except Exception as e:
-            self.update_status_signal.emit(f"시뮬레이션 오류: {str(e)}")
+            self.post_status(f"시뮬레이션 오류: {str(e)}")
             traceback.print_exc()
 
+    def simulate_coin(self, state, current_price, df, now, signal):
+        """코인 1개 시뮬레이션 매매"""
+        volume = df.iloc[-1]['volume']  # 거래량은 캔들 데이터에서 가져옴
+        self.record_primary(state, current_price, volume, now, signal)
+        prefix = f"[{now.strftime('%H:%M:%S')}]" if state.coin == self.coin else f"[{now.strftime('%H:%M:%S')}] [{state.coin}]"
+
+        # 매매 신호에 따른 거래 실행
+        if signal == 'buy' and state.last_signal != 'buy':
+            amount = state.capital / current_price
+            fee = amount * current_price * self.fee_rate
+            state.position += amount
+            state.balance -= (state.capital + fee)
+            self.post_status(f"{prefix} 매수 신호! {state.capital:,.0f}원 매수, 보유: {state.position:.6f} (수수료: {fee:,.0f}원)")
+            self.record_trade(state, {
+                'time': now,
+                'type': 'buy',
+                'price': current_price,
+                'amount': amount,
+                'balance': state.balance,
+                'position': state.position,
+                'fee': fee
+            })
+            state.last_signal = 'buy'
+        elif signal == 'sell' and state.position > 0 and state.last_signal != 'sell':
+            sell_value = state.position * current_price
+            fee = sell_value * self.fee_rate
+            self.post_status(f"{prefix} 매도 신호! {sell_value:,.0f}원 매도, 보유: 0 (수수료: {fee:,.0f}원)")
+            self.record_trade(state, {
+                'time': now,
+                'type': 'sell',
+                'price': current_price,
+                'amount': state.position,
+                'balance': state.balance + sell_value - fee,
+                'position': 0,
+                'fee': fee
+            })
+            state.balance += (sell_value - fee)
+            state.position = 0
+            state.last_signal = 'sell'
+        else:
+            state.last_signal = None
+
     def check_api_connection(self):
         """API 연결 상태 확인"""
         try:
             
             if not self.parent or not self.parent.bithumb:                
-                self.update_status_signal.emit("메인 윈도우의 API 연결이 필요합니다.")
+                self.post_status("메인 윈도우의 API 연결이 필요합니다.")
                 return False            
             
             self.bithumb = self.parent.bithumb
             self.is_connected = self.parent.is_connected  # 이 줄 제거            
             
             if not self.is_connected:
-                self.update_status_signal.emit("API가 연결되지 않았습니다.")
+                self.post_status("API가 연결되지 않았습니다.")
                 return False                
             
             return True
             
         except Exception as e:
             print(f"[DEBUG-CHECK-ERR] API 연결 확인 실패: {str(e)}")
-            self.update_status_signal.emit(f"API 연결 확인 실패: {str(e)}")
+            self.post_status(f"API 연결 확인 실패: {str(e)}")
             return False
 
-    def run_auto_trading(self, strategy, coin, params, initial_capital, fee_rate):
-        """자동매매 실행"""
+    def run_auto_trading(self, strategy, coin, params, initial_capital, fee_rate, coins=None):
+        """자동매매 실행 (coins: 함께 매매할 코인 목록, 차트는 coin 기준)"""
         try:
             # 초기 설정
-            self.strategy = strategy
-            self.coin = coin
-            self.params = params
-            self.initial_capital = initial_capital
-            self.fee_rate = fee_rate
-            self.balance = initial_capital
-            self.position = 0
-            self.last_signal = None
-            self.price_history = []
-            self.trade_history = []
-            self.balance_history = []
-            self.volume_history = []
+            self.setup_portfolio(strategy, coin, params, initial_capital, fee_rate, coins)
             
             # 전략별로 필요한 최소 캔들 개수 계산
             self.min_candle = self.calculate_min_candles()
             
-            # 타이머 시작 (1초 간격)
+            # 엔진 시작 (1초 간격)
             self.trading_enabled = True
-            if hasattr(self, 'trading_timer'):
-                self.trading_timer.stop()
-                self.trading_timer.deleteLater()
-            self.trading_timer = QTimer(self)  # self를 부모로 설정
-            self.trading_timer.timeout.connect(self.trading_loop)
-            self.trading_timer.start(1000)  # 1000ms = 1초
+            self.start_engine(self.trading_loop)
             
         except Exception as e:
             self.update_status_signal.emit(f"자동매매 실행 중 오류 발생: {str(e)}")
@@ -2007,22 +2581,10 @@ class AutoTradeWorker(QObject):
     def stop_auto_trading(self):
         """자동매매 중지"""
         self.trading_enabled = False
-        if hasattr(self, 'trading_timer'):
-            self.trading_timer.stop()
-            self.trading_timer.deleteLater()
-            self.trading_timer = None
+        self.stop_engine()
         
         # 모든 변수 초기화
-        self.strategy = None
-        self.coin = None
-        self.params = None
-        self.balance = 0
-        self.position = 0
-        self.last_signal = None
-        self.price_history.clear()
-        self.trade_history.clear()
-        self.balance_history.clear()
-        self.volume_history.clear()
+        self.reset_portfolio()
         
         self.update_status_signal.emit("자동매매가 중지되었습니다.")
 
@@ -2049,69 +2611,44 @@ class AutoTradeWorker(QObject):
             min_candle = max(30, self.params.get('macd_slow', 26) + self.params.get('macd_signal', 9), self.params.get('ema_period', 20))
         return min_candle
 
-    def trading_loop(self):
-        """트레이딩 루프 - QTimer에 의해 1분마다 호출됨"""
+    def trading_loop(self, market_data):
+        """트레이딩 틱 처리 (엔진 스레드에서 1초마다 호출, market_data = {코인: (현재가, 분봉 DataFrame)})"""
         if not self.trading_enabled:
             return
             
         try:
             if not self.check_api_connection():
-                self.update_status_signal.emit("API 연결이 끊어졌습니다. 재연결을 시도합니다.")
+                self.post_status("API 연결이 끊어졌습니다. 재연결을 시도합니다.")
                 return
 
-            # 실시간 현재가 조회
-            current_price = python_bithumb.get_current_price(f"KRW-{self.coin}")
-            if current_price is None:
-                self.update_status_signal.emit("현재가 조회 실패")
-                return
-                
-            # OHLCV 데이터 조회
-            df = python_bithumb.get_ohlcv(f"KRW-{self.coin}", interval="minute1", count=self.min_candle)
-            if df.empty or len(df) < self.min_candle:
-                self.update_status_signal.emit(f"캔들 데이터 부족: {len(df)}개")
-                return
-                
-            now = datetime.now()
-            volume_btc = df.iloc[-1]['volume']
-            # 거래량을 원화로 변환 (현재가 기준)
-            volume_krw = volume_btc * current_price
-            
-            # 전략 객체 생성 및 신호 생성
-            strategy_obj = StrategyFactory.create_strategy(self.strategy)
-            if strategy_obj is None:
-                return
-                
-            signal = strategy_obj.generate_signal(df, **self.params)
-            
-            # 상태 업데이트
-            status_msg = f"[{now.strftime('%H:%M:%S')}] 현재가: {current_price:,.0f}원, 신호: {signal if signal else '없음'}, 잔고: {self.balance:,.0f}원, 포지션: {self.position:.6f}"
-            self.update_status_signal.emit(status_msg)
-            self.price_history.append((now, current_price))
-            self.balance_history.append((now, self.balance + self.position * current_price))
-            self.volume_history.append((now, volume_krw))  # 원화 거래량 저장
-            
-            # 매매 신호에 따른 거래 실행
-            if signal == 'buy' and self.last_signal != 'buy':
-                self.execute_buy_order(current_price, now)
-            elif signal == 'sell' and self.position > 0 and self.last_signal != 'sell':
-                self.execute_sell_order(current_price, now)
-            else:
-                self.last_signal = None
-
-            # 차트 업데이트
-            self.show_data_chart_signal.emit(self.price_history, self.trade_history, self.balance_history, self.volume_history)
+            self.process_tick(market_data, self.trade_coin)
 
         except Exception as e:
-            self.update_status_signal.emit(f"자동매매 오류: {str(e)}")
+            self.post_status(f"자동매매 오류: {str(e)}")
             traceback.print_exc()
 
-    def execute_buy_order(self, current_price, now):
+    def trade_coin(self, state, current_price, df, now, signal):
+        """코인 1개 자동매매"""
+        volume_btc = df.iloc[-1]['volume']
+        # 거래량을 원화로 변환 (현재가 기준)
+        volume_krw = volume_btc * current_price
+        self.record_primary(state, current_price, volume_krw, now, signal)  # 원화 거래량 저장
+        
+        # 매매 신호에 따른 거래 실행
+        if signal == 'buy' and state.last_signal != 'buy':
+            self.execute_buy_order(state, current_price, now)
+        elif signal == 'sell' and state.position > 0 and state.last_signal != 'sell':
+            self.execute_sell_order(state, current_price, now)
+        else:
+            state.last_signal = None
+
+    def execute_buy_order(self, state, current_price, now):
         """매수 주문 실행 (원화 금액으로 주문)"""
         try:
             # 매수 가능한 금액 계산 (잔고의 100%)
-            available_amount = self.balance
+            available_amount = state.balance
             if available_amount < 5000:  # 최소 주문 금액
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 잔고 부족으로 매수 불가 (최소 주문금액: 5,000원)")
+                self.post_status(f"[{now.strftime('%H:%M:%S')}] [{state.coin}] 잔고 부족으로 매수 불가 (최소 주문금액: 5,000원)")
                 return
                 
             # 수수료를 고려한 실제 매수 가능 금액
@@ -2122,64 +2659,64 @@ class AutoTradeWorker(QObject):
             coin_amount = actual_amount / current_price
             
             # 실제 매수 주문 실행 (주석 처리) - 원화 금액으로 주문
-            # order = self.bithumb.buy_market_order(f"KRW-{self.coin}", actual_amount)  # 원화 금액으로 주문
+            # order = self.bithumb.buy_market_order(f"KRW-{state.coin}", actual_amount)  # 원화 금액으로 주문
             
             # 가상 주문 (테스트용)
             order = {'price': current_price, 'status': 'success'}  # 가상의 성공한 주문
             
             if order and order.get('status') == 'success':
-                self.position += coin_amount
-                self.balance -= (actual_amount + fee)
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매수 주문 성공! {actual_amount:,.0f}원 매수, 보유: {self.position:.6f} (수수료: {fee:,.0f}원)")
-                self.trade_history.append({
+                state.position += coin_amount
+                state.balance -= (actual_amount + fee)
+                self.post_status(f"[{now.strftime('%H:%M:%S')}] [{state.coin}] 매수 주문 성공! {actual_amount:,.0f}원 매수, 보유: {state.position:.6f} (수수료: {fee:,.0f}원)")
+                self.record_trade(state, {
                     'time': now,
                     'type': 'buy',
                     'price': current_price,
                     'amount': coin_amount,
-                    'balance': self.balance,
-                    'position': self.position,
+                    'balance': state.balance,
+                    'position': state.position,
                     'fee': fee
                 })
-                self.last_signal = 'buy'
+                state.last_signal = 'buy'
             else:
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매수 주문 실패: {order.get('error', '알 수 없는 오류')}")
+                self.post_status(f"[{now.strftime('%H:%M:%S')}] [{state.coin}] 매수 주문 실패: {order.get('error', '알 수 없는 오류')}")
         except Exception as e:
-            self.update_status_signal.emit(f"매수 주문 중 오류 발생: {str(e)}")
+            self.post_status(f"매수 주문 중 오류 발생: {str(e)}")
 
-    def execute_sell_order(self, current_price, now):
+    def execute_sell_order(self, state, current_price, now):
         """매도 주문 실행 (코인 수량으로 주문)"""
         try:
             # 매도할 수량 계산 (포지션의 100%)
-            coin_amount = self.position
+            coin_amount = state.position
             sell_value = coin_amount * current_price
             
             if sell_value < 5000:  # 최소 주문 금액
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매도 금액이 너무 작습니다 (최소 주문금액: 5,000원)")
+                self.post_status(f"[{now.strftime('%H:%M:%S')}] [{state.coin}] 매도 금액이 너무 작습니다 (최소 주문금액: 5,000원)")
                 return
                 
             fee = sell_value * self.fee_rate
             
             # 실제 매도 주문 실행 (주석 처리) - 코인 수량으로 주문
-            # order = self.bithumb.sell_market_order(f"KRW-{self.coin}", coin_amount)  # 코인 수량으로 주문
+            # order = self.bithumb.sell_market_order(f"KRW-{state.coin}", coin_amount)  # 코인 수량으로 주문
             
             # 가상 주문 (테스트용)
             order = {'price': current_price, 'status': 'success'}  # 가상의 성공한 주문
             
             if order and order.get('status') == 'success':
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매도 주문 성공! {sell_value:,.0f}원 매도, 보유: 0 (수수료: {fee:,.0f}원)")
-                self.trade_history.append({
+                self.post_status(f"[{now.strftime('%H:%M:%S')}] [{state.coin}] 매도 주문 성공! {sell_value:,.0f}원 매도, 보유: 0 (수수료: {fee:,.0f}원)")
+                self.record_trade(state, {
                     'time': now,
                     'type': 'sell',
                     'price': current_price,
                     'amount': coin_amount,
-                    'balance': self.balance + sell_value - fee,
+                    'balance': state.balance + sell_value - fee,
                     'position': 0,
                     'fee': fee
                 })
-                self.balance += (sell_value - fee)
-                self.position = 0
-                self.last_signal = 'sell'
+                state.balance += (sell_value - fee)
+                state.position = 0
+                state.last_signal = 'sell'
             else:
-                self.update_status_signal.emit(f"[{now.strftime('%H:%M:%S')}] 매도 주문 실패: {order.get('error', '알 수 없는 오류')}")
+                self.post_status(f"[{now.strftime('%H:%M:%S')}] [{state.coin}] 매도 주문 실패: {order.get('error', '알 수 없는 오류')}")
         except Exception as e:
-            self.update_status_signal.emit(f"매도 주문 중 오류 발생: {str(e)}")
\ No newline at end of file
+            self.post_status(f"매도 주문 중 오류 발생: {str(e)}")
\ No newline at end of file
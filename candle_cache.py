@@ -0,0 +1,238 @@
+import os
+import time
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+import ohlcv_store
+import arrow_store
+
+
+CACHE_ROOT = 'candle_cache'
+POINTER_FILE = 'current'
+
+# 파일 구조: {root}/{coin}_ohlcv_{interval}/current            (현재 버전 디렉터리 이름)
+#                                        /{버전}/index.npy  (datetime64[ns], 시각 오름차순)
+#                                        /{버전}/values.npy (float64, shape=(5, n), OHLCV 컬럼별 연속 배열)
+# 메모리 맵으로 열어 DataFrame을 복사 없이 만들고, 여러 프로세스가 같은 파일을 열면 페이지 캐시를 공유한다.
+# 캐시를 다시 쓸 때는 새 버전 디렉터리에 쓰고 current만 교체한다. 살아 있는 DataFrame은 이전 버전 파일을
+# 계속 매핑하고 있으므로, 매핑된 파일을 지우거나 덮어쓸 수 없는 Windows에서도 교체가 실패하지 않는다.
+# 이전 버전은 교체/무효화 때 지우고, 아직 매핑 중이라 지울 수 없으면 남겨 두었다가 다음에 다시 지운다.
+# 무효화는 current를 '-'로 시작하는 표식으로 바꾸며, 그 전에 읽기 시작한 캐시 생성은 결과를 버린다.
+
+_pointer_lock = threading.Lock()  # 같은 프로세스의 스레드끼리 current 확인/교체를 원자적으로
+
+
+def cache_dir(table_name, root=CACHE_ROOT):
+    return os.path.join(root, table_name)
+
+
+def current_version(table_name, root=CACHE_ROOT):
+    """current에 기록된 버전 (없으면 None, 무효화된 상태면 '-'로 시작하는 표식)"""
+    try:
+        with open(os.path.join(cache_dir(table_name, root), POINTER_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_dir(table_name, root=CACHE_ROOT):
+    """현재 버전 디렉터리 경로 (캐시가 없거나 무효화됐으면 None)"""
+    version = current_version(table_name, root)
+    if version is None or version.startswith('-'):
+        return None
+    return os.path.join(cache_dir(table_name, root), version)
+
+
+def has_cache(table_name, root=CACHE_ROOT):
+    directory = version_dir(table_name, root)
+    return (directory is not None and os.path.exists(os.path.join(directory, 'index.npy'))
+            and os.path.exists(os.path.join(directory, 'values.npy')))
+
+
+def new_version():
+    """시간순으로 정렬되는 고유 버전 이름"""
+    return f'{time.time_ns():016x}-{os.getpid()}-{threading.get_ident():x}'
+
+
+def set_pointer(table_name, version, root=CACHE_ROOT):
+    directory = cache_dir(table_name, root)
+    tmp_path = os.path.join(directory, f'{POINTER_FILE}.{new_version()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(directory, POINTER_FILE))
+
+
+def write_cache(table_name, df, root=CACHE_ROOT, expected=False):
+    """OHLCV DataFrame을 새 버전 캐시 파일로 저장하고 current를 교체
+
+    expected를 주면 (데이터를 읽기 전의 current_version() 값) 그 사이 무효화/교체된 경우 저장하지 않고 None을 반환한다.
+
+    Returns:
+        저장 행 수 (저장하지 않았으면 None)
+    """
+    directory = cache_dir(table_name, root)
+    version = new_version()
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    df = df.sort_index()
+    index = pd.DatetimeIndex(df.index).values.astype('datetime64[ns]')
+    values = np.ascontiguousarray(df[ohlcv_store.OHLCV_COLUMNS].to_numpy(dtype=np.float64).T)
+    try:
+        np.save(os.path.join(path, 'values.npy'), values)
+        np.save(os.path.join(path, 'index.npy'), index)
+    except FileNotFoundError:  # 쓰는 사이 무효화되어 이 버전 디렉터리가 삭제됨
+        return None
+    with _pointer_lock:
+        published = expected is False or current_version(table_name, root) == expected
+        if published:
+            set_pointer(table_name, version, root)
+    remove_stale_versions(table_name, root)
+    return len(df) if published else None
+
+
+def invalidate(table_name, root=CACHE_ROOT):
+    """DB에 새 데이터가 저장되면 캐시 무효화 (다음 조회 때 다시 생성)"""
+    if not os.path.isdir(cache_dir(table_name, root)):
+        return
+    with _pointer_lock:
+        set_pointer(table_name, '-' + new_version(), root)
+    remove_stale_versions(table_name, root)
+
+
+def remove_stale_versions(table_name, root=CACHE_ROOT):
+    """현재 버전이 아닌 이전 버전 디렉터리 삭제
+
+    current보다 나중에 만들기 시작한 버전(다른 스레드/프로세스가 쓰는 중)은 건드리지 않는다.
+    Windows에서 아직 메모리 맵으로 열려 있는 버전은 지울 수 없으므로 남겨 두고 다음에 다시 시도한다.
+    """
+    directory = cache_dir(table_name, root)
+    current = current_version(table_name, root)
+    if current is None:
+        return
+    current_name = current.lstrip('-')
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not os.path.isdir(path) or name >= current_name:
+            continue
+        try:
+            shutil.rmtree(path)
+        except PermissionError as e:
+            print(f"캔들 캐시 이전 버전 삭제 보류 (사용 중): {path}, {str(e)}")
+
+
+def open_cache(table_name, root=CACHE_ROOT):
+    """캐시를 메모리 맵으로 열기 (index, values), 없거나 깨졌으면 None"""
+    directory = version_dir(table_name, root)
+    if directory is None:
+        return None
+    try:
+        index = np.load(os.path.join(directory, 'index.npy'), mmap_mode='r')
+        values = np.load(os.path.join(directory, 'values.npy'), mmap_mode='r')
+    except (OSError, ValueError):  # 읽는 사이 이전 버전이 삭제된 경우
+        return None
+    if values.shape != (len(ohlcv_store.OHLCV_COLUMNS), len(index)):
+        return None
+    return index, values
+
+
+def load_frame(table_name, start=None, end=None, root=CACHE_ROOT):
+    """캐시에서 [start, end] 구간 DataFrame 생성 (복사 없음, 읽기 전용 메모리 맵 뷰)
+
+    없으면 None.
+    """
+    cache = open_cache(table_name, root)
+    if cache is None:
+        return None
+    index, values = cache
+    lo = 0 if start is None else np.searchsorted(index, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+    hi = len(index) if end is None else np.searchsorted(index, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+    if hi <= lo:
+        return None
+    return pd.DataFrame(values[:, lo:hi].T, index=pd.DatetimeIndex(index[lo:hi], name='date', copy=False),
+                        columns=ohlcv_store.OHLCV_COLUMNS, copy=False)
+
+
+def build_cache(table_name, db_path=ohlcv_store.DB_PATH, root=CACHE_ROOT, arrow_root=arrow_store.ARROW_ROOT):
+    """테이블 전체로 캐시 생성 (데이터가 없으면 0, 읽는 사이 무효화됐으면 None)
+
+    Arrow 캔들 저장소가 있으면 월별 파티션을 메모리 매핑으로 읽고, 없을 때만 ohlcv.db 테이블 전체를 읽는다.
+    """
+    expected = current_version(table_name, root)
+    if arrow_store.has_candles(table_name, arrow_root):
+        months = arrow_store.list_partitions(table_name, arrow_root)
+        df = arrow_store.load_candles(table_name, pd.Timestamp(months[0]),
+                                      pd.Timestamp(months[-1]) + pd.DateOffset(months=1), arrow_root)
+        if df is not None:
+            return write_cache(table_name, df, root, expected)
+    conn = ohlcv_store.connect(db_path)
+    try:
+        coverage = ohlcv_store.get_coverage(conn, table_name)
+        if coverage is None:
+            return 0
+        _, first, last = coverage
+        df = ohlcv_store.load_ohlcv(conn, table_name, first, last)
+    finally:
+        conn.close()
+    return write_cache(table_name, df, root, expected)
+
+
+class FrameCache:
+    """조회한 DataFrame의 프로세스 내 LRU 캐시
+
+    (테이블명, 시작, 종료) 키로 저장하고, 전체 크기가 max_bytes를 넘으면 오래 안 쓴 것부터 버린다.
+    같은 DataFrame 객체를 돌려주므로 호출 쪽에서 값을 직접 수정하면 안 된다 (읽기 전용으로 사용).
+    테이블별 세대 번호는 invalidate()마다 올라간다. 읽기 전에 generation()을 받아 put()에 넘기면,
+    읽는 도중 다른 스레드가 무효화한 경우 이전 데이터를 다시 넣지 않는다.
+    """
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()  # key -> (df, nbytes)
+        self.generations = {}  # 테이블명 -> 무효화 횟수
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # 일괄 수집 스레드에서도 무효화한다
+
+    def get(self, key):
+        with self.lock:
+            entry = self.frames.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self, table_name):
+        with self.lock:
+            return self.generations.get(table_name, 0)
+
+    def put(self, key, df, generation=None):
+        nbytes = int(df.memory_usage(index=True).sum())
+        with self.lock:
+            if generation is not None and self.generations.get(key[0], 0) != generation:
+                return  # 읽는 사이 무효화됨
+            if key in self.frames:
+                self.nbytes -= self.frames.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            while self.frames and self.nbytes + nbytes > self.max_bytes:
+                _, (_, evicted) = self.frames.popitem(last=False)
+                self.nbytes -= evicted
+            self.frames[key] = (df, nbytes)
+            self.nbytes += nbytes
+
+    def invalidate(self, table_name):
+        """테이블에 새 데이터가 저장되면 해당 테이블의 모든 구간 삭제"""
+        with self.lock:
+            self.generations[table_name] = self.generations.get(table_name, 0) + 1
+            for key in [key for key in self.frames if key[0] == table_name]:
+                self.nbytes -= self.frames.pop(key)[1]
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.nbytes = 0
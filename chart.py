@@ -6,11 +6,13 @@ import pyupbit
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from collections import deque
 import sqlite3
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import mplfinance as mpf
 import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
 import python_bithumb
 import matplotlib.pyplot as plt
 
@@ -18,6 +20,9 @@ import matplotlib.pyplot as plt
 plt.rcParams['font.family'] = 'Malgun Gothic'
 plt.rcParams['axes.unicode_minus'] = False
 
+REALTIME_POINTS = 100  # 실시간 차트에 유지할 최대 데이터 개수 (1초 간격)
+REALTIME_BAR_WIDTH = 0.8 / 86400  # 거래량 막대 폭 (matplotlib 날짜 단위, 0.8초)
+
 class ChartWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -84,9 +89,9 @@ class ChartWindow(QMainWindow):
         self.realtime_running = False
         self.realtime_timer = QTimer()
         self.realtime_timer.timeout.connect(self.fetch_realtime_data)
-        self.realtime_price_data = []
-        self.realtime_time_data = []
-        self.realtime_volume_data = []
+        self.realtime_price_data = deque(maxlen=REALTIME_POINTS)
+        self.realtime_time_data = deque(maxlen=REALTIME_POINTS)
+        self.realtime_volume_data = deque(maxlen=REALTIME_POINTS)
         self.realtime_ycenter = None
         
     def get_candle_data(self):
@@ -147,14 +152,49 @@ class ChartWindow(QMainWindow):
         
         self.realtime_chart_window.setLayout(layout)
         self.realtime_running = True
-        self.realtime_price_data = []
-        self.realtime_time_data = []
-        self.realtime_volume_data = []
+        self.realtime_price_data = deque(maxlen=REALTIME_POINTS)
+        self.realtime_time_data = deque(maxlen=REALTIME_POINTS)
+        self.realtime_volume_data = deque(maxlen=REALTIME_POINTS)
         self.realtime_ycenter = None
+        self.create_realtime_chart()
         self.realtime_timer.start(1000)
         self.realtime_chart_window.finished.connect(self.close_realtime_chart_window)
         self.realtime_chart_window.show()
         
+    def create_realtime_chart(self):
+        """실시간 차트 축과 아티스트를 한 번만 생성 (이후에는 데이터만 바꿔 블리팅)"""
+        coin = self.coin_combo.currentText()
+        # 가격 차트
+        ax1 = self.realtime_figure.add_subplot(211)
+        self.realtime_line, = ax1.plot([], [], 'b-', label='현재가', animated=True)
+        ax1.set_title(f'{coin} 실시간 차트')
+        ax1.set_ylabel('가격')
+        ax1.grid(True, alpha=0.3)
+        # 거래량 차트 (막대 전체를 PolyCollection 하나로 그리고 꼭짓점만 바꿈)
+        ax2 = self.realtime_figure.add_subplot(212, sharex=ax1)
+        self.realtime_bars = PolyCollection([], facecolor='g', alpha=0.5, label='거래량', animated=True)
+        ax2.add_collection(self.realtime_bars)
+        ax2.set_xlabel('시간')
+        ax2.set_ylabel('거래량')
+        ax2.grid(True, alpha=0.3)
+        for ax in (ax1, ax2):
+            ax.xaxis_date()
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
+        self.realtime_axes = (ax1, ax2)
+        self.realtime_background = None
+        self.realtime_canvas.mpl_connect('draw_event', self.on_realtime_chart_draw)
+        
+    def on_realtime_chart_draw(self, event):
+        """전체 그리기 후 배경 저장 및 데이터 아티스트 그리기"""
+        self.realtime_background = self.realtime_canvas.copy_from_bbox(self.realtime_figure.bbox)
+        self.draw_realtime_artists()
+        
+    def draw_realtime_artists(self):
+        ax1, ax2 = self.realtime_axes
+        ax1.draw_artist(self.realtime_line)
+        ax2.draw_artist(self.realtime_bars)
+        
     def close_realtime_chart_window(self):
         self.realtime_running = False
         self.realtime_timer.stop()
@@ -170,17 +210,11 @@ class ChartWindow(QMainWindow):
             price = python_bithumb.get_current_price(f"KRW-{coin}")
             now = datetime.now()
             
+            # 가격 변동폭 (첫 값은 0), 최대 개수를 넘으면 deque가 오래된 값을 버림
+            volume = abs(price - self.realtime_price_data[-1]) if self.realtime_price_data else 0
             self.realtime_price_data.append(price)
-            self.realtime_time_data.append(now)
-            
-            if len(self.realtime_price_data) > 1:
-                volume = abs(price - self.realtime_price_data[-2])
-                self.realtime_volume_data.append(volume)
-                
-            if len(self.realtime_price_data) > 100:
-                self.realtime_price_data.pop(0)
-                self.realtime_time_data.pop(0)
-                self.realtime_volume_data.pop(0)
+            self.realtime_time_data.append(mdates.date2num(now))
+            self.realtime_volume_data.append(volume)
                 
             self.update_realtime_chart()
             
@@ -188,38 +222,45 @@ class ChartWindow(QMainWindow):
             print(f"실시간 차트 오류: {str(e)}")
             
     def update_realtime_chart(self):
+        """실시간 차트 갱신
+
+        선/막대 데이터만 바꾸고, 축 범위 안이면 저장한 배경 위에 아티스트만 다시 그린다(블리팅).
+        데이터가 축 범위를 벗어날 때만 여유를 두고 범위를 옮겨 전체를 다시 그린다.
+        """
         if not self.realtime_running or self.realtime_figure is None:
             return
         try:
-            self.realtime_figure.clear()
-            # 가격 차트
-            ax1 = self.realtime_figure.add_subplot(211)
-            ax1.plot(self.realtime_time_data, self.realtime_price_data, 'b-', label='현재가')
-            ax1.set_title(f'{self.coin_combo.currentText()} 실시간 차트')
-            ax1.set_ylabel('가격')
-            ax1.grid(True, alpha=0.3)
-            # x축 포맷: 날짜/시간 자동
-            if len(self.realtime_time_data) > 0:
-                if (self.realtime_time_data[-1] - self.realtime_time_data[0]).days >= 1:
-                    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-                else:
-                    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-            plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
-            # 거래량 차트
-            ax2 = self.realtime_figure.add_subplot(212)
-            if len(self.realtime_volume_data) > 0:
-                ax2.bar(self.realtime_time_data[1:], self.realtime_volume_data, color='g', alpha=0.5, label='거래량')
-            ax2.set_xlabel('시간')
-            ax2.set_ylabel('거래량')
-            ax2.grid(True, alpha=0.3)
-            if len(self.realtime_time_data) > 0:
-                if (self.realtime_time_data[-1] - self.realtime_time_data[0]).days >= 1:
-                    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-                else:
-                    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-            plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
-            self.realtime_figure.tight_layout()
-            self.realtime_canvas.draw()
+            times = np.fromiter(self.realtime_time_data, dtype=float)
+            prices = np.fromiter(self.realtime_price_data, dtype=float)
+            volumes = np.fromiter(self.realtime_volume_data, dtype=float)
+            if len(times) == 0:
+                return
+            self.realtime_line.set_data(times, prices)
+            # 막대 꼭짓점 (n, 4, 2): 왼쪽 아래 -> 왼쪽 위 -> 오른쪽 위 -> 오른쪽 아래
+            left, right = times - REALTIME_BAR_WIDTH / 2, times + REALTIME_BAR_WIDTH / 2
+            zeros = np.zeros_like(volumes)
+            verts = np.stack([np.column_stack([left, zeros]), np.column_stack([left, volumes]),
+                              np.column_stack([right, volumes]), np.column_stack([right, zeros])], axis=1)
+            self.realtime_bars.set_verts(verts)
+            
+            ax1, ax2 = self.realtime_axes
+            x_lo, x_hi = ax1.get_xlim()
+            y_lo, y_hi = ax1.get_ylim()
+            rescale = (self.realtime_background is None or times[0] < x_lo or times[-1] > x_hi
+                       or prices.min() < y_lo or prices.max() > y_hi or volumes.max() > ax2.get_ylim()[1])
+            if rescale:
+                # x축은 최대 개수 구간의 1.2배 창으로 잡아 오른쪽 여유가 찰 때까지 다시 그리지 않음
+                span = REALTIME_POINTS / 86400  # 1초 간격
+                ax1.set_xlim(times[0] - REALTIME_BAR_WIDTH, times[0] + span * 1.2)
+                pad = (prices.max() - prices.min()) * 0.5 or prices.max() * 0.001 or 1
+                ax1.set_ylim(prices.min() - pad, prices.max() + pad)
+                ax2.set_ylim(0, (volumes.max() or 1) * 2)
+                self.realtime_figure.tight_layout()
+                self.realtime_canvas.draw()  # draw_event에서 배경 저장 후 아티스트 그리기
+            else:
+                self.realtime_canvas.restore_region(self.realtime_background)
+                self.draw_realtime_artists()
+                self.realtime_canvas.blit(self.realtime_figure.bbox)
         except Exception as e:
             print(f'실시간 차트 업데이트 실패: {str(e)}')
             
@@ -0,0 +1,250 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import pyupbit
+import requests
+
+import ohlcv_store
+
+
+# 거래소별 요청 한도 (초당 토큰 수, 버킷 크기)
+# 업비트 시세 조회 API는 IP당 초당 10회, 빗썸 Public API는 초당 135회까지 허용된다.
+# 어느 1초 구간에서도 '초당 토큰 수 + 버킷 크기'를 넘지 않으므로 합이 한도 이하가 되도록 잡는다.
+RATE_LIMITS = {
+    '업비트': (9, 1),
+    '빗썸': (125, 10),
+}
+
+UPBIT_PAGE_SIZE = 200  # 업비트 캔들 API 한 번에 받을 수 있는 최대 개수
+KST_OFFSET = timedelta(hours=9)
+
+UPBIT_INTERVALS = {
+    '1분봉': 'minute1', '3분봉': 'minute3', '5분봉': 'minute5', '15분봉': 'minute15', '30분봉': 'minute30',
+    '1시간봉': 'minute60', '4시간봉': 'minute240', '일봉': 'day', '주봉': 'week', '월봉': 'month'
+}
+
+UPBIT_CANDLE_COLUMNS = {
+    'opening_price': 'open', 'high_price': 'high', 'low_price': 'low', 'trade_price': 'close',
+    'candle_acc_trade_volume': 'volume'
+}
+
+
+class TokenBucket:
+    """토큰 버킷 요청 제한기 (여러 스레드에서 공유)
+
+    초당 rate개씩 토큰이 차고 최대 capacity개까지 쌓인다. acquire()는 토큰이 생길 때까지 기다린다.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def krw_markets():
+    """업비트 KRW 마켓 코인 목록 (예: ['BTC', 'ETH', ...])"""
+    tickers = pyupbit.get_tickers(fiat='KRW') or []
+    return [ticker.split('-', 1)[1] for ticker in tickers]
+
+
+def bithumb_krw_markets():
+    """빗썸 KRW 마켓 코인 목록 (예: ['BTC', 'ETH', ...])"""
+    import python_bithumb
+    markets = python_bithumb.get_market_all() or []
+    return [item['market'].split('-', 1)[1] for item in markets if item['market'].startswith('KRW-')]
+
+
+def get_upbit_ohlcv(ticker, interval, count, to):
+    """업비트 캔들 한 페이지 조회 (pyupbit.get_ohlcv와 같은 형식, 시각 KST)
+
+    pyupbit.get_ohlcv는 요청 오류와 '구간에 캔들 없음'(상장 전, 거래 없음)을 모두 None으로 돌려주므로 직접 요청한다.
+    요청이 실패하면 예외를 던지고, 캔들이 없으면 빈 DataFrame을 반환한다.
+    """
+    response = requests.get(pyupbit.get_url_ohlcv(interval), params={'market': ticker, 'count': count, 'to': to},
+                            timeout=10)
+    response.raise_for_status()
+    contents = response.json()
+    index = pd.to_datetime([item['candle_date_time_kst'] for item in contents], format='%Y-%m-%dT%H:%M:%S')
+    df = pd.DataFrame(contents, columns=list(UPBIT_CANDLE_COLUMNS), index=index)
+    return df.rename(columns=UPBIT_CANDLE_COLUMNS).sort_index()
+
+
+class BatchDownloader:
+    """여러 코인/봉단위 과거 데이터를 동시에 받아 저장하는 일괄 수집기
+
+    업비트는 DB에 없는 구간만 찾아 200개 단위 페이지로 나누고, 페이지들을 스레드 풀에서 동시에 요청한다.
+    모든 요청은 거래소별 토큰 버킷을 거치므로 동시 요청 수와 무관하게 요청 한도를 넘지 않는다.
+    받은 데이터는 run()을 호출한 스레드에서 store(conn, table_name, df)로 바로 저장한다 (SQLite 쓰기는 한 스레드).
+    """
+    FLUSH_ROWS = 20000  # 테이블별로 이만큼 모이면 저장
+
+    def __init__(self, exchange, coins, intervals, table_name_func, start_datetime=None, end_datetime=None,
+                 max_workers=8, max_retries=3, log=print, stop_event=None):
+        self.exchange = exchange
+        self.coins = list(coins)
+        self.intervals = list(intervals)
+        self.start_datetime = start_datetime
+        self.end_datetime = end_datetime
+        self.table_name_func = table_name_func  # (코인, 봉단위) -> 테이블명
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.log = log
+        self.stop_event = stop_event or threading.Event()
+        self.bucket = TokenBucket(*RATE_LIMITS[exchange])
+        self.requests = 0
+        self.requests_lock = threading.Lock()  # 풀 스레드들이 함께 센다
+        self.failed = 0
+
+    def plan_upbit_pages(self, conn, coin, interval, table_name):
+        """누락 구간을 페이지(요청 1회 = 최대 200봉) 작업 목록으로 분할
+
+        페이지는 [window_start, to) 시간 창이며 서로 독립이라 동시에 요청할 수 있다.
+        거래가 없던 봉 때문에 생긴 작은 구멍들은 한 페이지 안에 들어가면 하나로 합쳐 요청 수를 줄인다.
+        """
+        step = ohlcv_store.interval_step(table_name)
+        page_span = step * UPBIT_PAGE_SIZE
+        ranges = []
+        for range_start, range_end in ohlcv_store.find_missing_ranges(conn, table_name, self.start_datetime,
+                                                                      self.end_datetime, step):
+            if ranges and range_end - ranges[-1][0] <= page_span:
+                ranges[-1] = (ranges[-1][0], range_end)
+            else:
+                ranges.append((range_start, range_end))
+        pages = []
+        for range_start, range_end in ranges:
+            to = range_end + step  # to 시각의 봉은 포함되지 않으므로 한 봉 뒤부터 요청
+            while to > range_start:
+                window_start = max(range_start, to - page_span)
+                pages.append((coin, interval, table_name, window_start, to))
+                to = window_start
+        return pages
+
+    def request(self, func, *args, **kwargs):
+        """토큰을 받은 뒤 요청, 실패 시 지수 백오프 재시도 (모두 실패하면 None)
+
+        빈 DataFrame은 '데이터 없음'이라는 정상 응답이므로 재시도하지 않는다.
+        """
+        delay = 1
+        for attempt in range(self.max_retries):
+            if self.stop_event.is_set():
+                return None
+            self.bucket.acquire()
+            with self.requests_lock:
+                self.requests += 1
+            try:
+                df = func(*args, **kwargs)
+                if df is not None:
+                    return df
+            except Exception as e:
+                self.log(f"요청 오류: {str(e)}")
+            if attempt < self.max_retries - 1:
+                time.sleep(delay)
+                delay *= 2
+        return None
+
+    def fetch_upbit_page(self, coin, interval, table_name, window_start, to):
+        # 업비트 to 파라미터는 UTC 기준, 저장 시각은 KST
+        df = self.request(get_upbit_ohlcv, f"KRW-{coin}", UPBIT_INTERVALS[interval], UPBIT_PAGE_SIZE,
+                          (to - KST_OFFSET).strftime('%Y-%m-%d %H:%M:%S'))
+        if df is None:
+            return table_name, None, None
+        df = df[(df.index >= window_start) & (df.index < to)]
+        return table_name, df[ohlcv_store.OHLCV_COLUMNS], (window_start, to)
+
+    def fetch_bithumb(self, coin, interval, table_name):
+        import python_bithumb
+        # 빗썸은 날짜 지정이 불가능해 최신 200개만 받는다
+        df = self.request(python_bithumb.get_ohlcv, f"KRW-{coin}", interval=UPBIT_INTERVALS[interval], count=200)
+        if df is None:
+            return table_name, None, None
+        return table_name, df[ohlcv_store.OHLCV_COLUMNS], None
+
+    def run(self, conn, store):
+        """일괄 수집 실행
+
+        Returns:
+            {'tables': {테이블명: 저장 행 수}, 'requests': 요청 수, 'failed': 실패 페이지 수, 'elapsed': 초}
+        """
+        started = time.perf_counter()
+        if self.exchange == '업비트':
+            if self.end_datetime is None:
+                self.end_datetime = datetime.now()
+            if self.start_datetime is None:
+                self.start_datetime = self.end_datetime - timedelta(days=1)
+            jobs = []
+            for coin in self.coins:
+                for interval in self.intervals:
+                    jobs.extend(self.plan_upbit_pages(conn, coin, interval, self.table_name_func(coin, interval)))
+            task = self.fetch_upbit_page
+        else:
+            jobs = [(coin, interval, self.table_name_func(coin, interval))
+                    for coin in self.coins for interval in self.intervals]
+            task = self.fetch_bithumb
+        self.log(f"[일괄 수집] 코인 {len(self.coins)}개 x 봉단위 {len(self.intervals)}개, 요청 예정 {len(jobs)}회")
+
+        saved = {}
+        buffers = {}
+        windows = {}  # 테이블별 응답받은 시간 창 (저장 후 수집 이력에 기록)
+
+        def flush(table_name):
+            frames = buffers.pop(table_name, [])
+            if frames:
+                df = pd.concat(frames)
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+                store(conn, table_name, df)
+                saved[table_name] = saved.get(table_name, 0) + len(df)
+            # 이어지는 페이지 창은 하나로 합쳐 기록
+            merged = []
+            for window_start, to in sorted(windows.pop(table_name, [])):
+                if merged and window_start <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], to))
+                else:
+                    merged.append((window_start, to))
+            for window_start, to in merged:
+                ohlcv_store.mark_fetched(conn, table_name, window_start, to)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(task, *job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                table_name, df, window = future.result()
+                if df is None:
+                    self.failed += 1
+                elif window is not None:
+                    windows.setdefault(table_name, []).append(window)
+                if df is not None and not df.empty:
+                    buffers.setdefault(table_name, []).append(df)
+                    if sum(len(frame) for frame in buffers[table_name]) >= self.FLUSH_ROWS:
+                        flush(table_name)
+                if done % max(1, len(futures) // 20) == 0:
+                    elapsed = time.perf_counter() - started
+                    self.log(f"[일괄 수집] {done}/{len(futures)} ({done / len(futures) * 100:.0f}%), "
+                             f"{self.requests / elapsed:.1f} req/s")
+                if self.stop_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        for table_name in set(buffers) | set(windows):
+            flush(table_name)
+
+        return {
+            'tables': saved,
+            'requests': self.requests,
+            'failed': self.failed,
+            'elapsed': time.perf_counter() - started
+        }
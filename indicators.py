@@ -0,0 +1,417 @@
+import math
+from collections import deque
+import numpy as np
+
+
+class RollingWindow:
+    """고정 길이 링버퍼 기반 이동 합계/제곱합 (O(1) 갱신)
+
+    가격 크기(수천만 원)에서 제곱합의 자릿수 손실을 막기 위해 첫 값을 기준값으로 빼서 누적하고,
+    누적 오차가 쌓이지 않도록 일정 횟수마다 버퍼에서 합계를 다시 계산한다.
+    """
+    RESYNC_INTERVAL = 1000
+
+    def __init__(self, period):
+        self.period = period
+        self.buffer = np.zeros(period)
+        self.count = 0
+        self.pos = 0
+        self.ref = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.nan_count = 0  # 윈도우 안의 NaN 개수 (pandas min_periods=window와 동일하게 처리)
+        self.updates = 0
+
+    def __len__(self):
+        return min(self.count, self.period)
+
+    @property
+    def full(self):
+        return self.count >= self.period
+
+    @property
+    def last(self):
+        return self.buffer[(self.pos - 1) % self.period] + self.ref if self.count else math.nan
+
+    def _shift(self, value):
+        if self.ref is None and not math.isnan(value):
+            self.ref = value
+        return value - self.ref if self.ref is not None else math.nan
+
+    def _remove(self, x):
+        if math.isnan(x):
+            self.nan_count -= 1
+        else:
+            self.sum -= x
+            self.sumsq -= x * x
+
+    def _add(self, x):
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self.sum += x
+            self.sumsq += x * x
+
+    def append(self, value):
+        """새 값 추가 (가장 오래된 값 제거)"""
+        x = self._shift(value)
+        if self.count >= self.period:
+            self._remove(self.buffer[self.pos])
+        self.buffer[self.pos] = x
+        self._add(x)
+        self.pos = (self.pos + 1) % self.period
+        self.count += 1
+        self._tick()
+
+    def replace_last(self, value):
+        """마지막 값을 교체 (진행 중인 봉 갱신용)"""
+        if self.count == 0:
+            self.append(value)
+            return
+        last = (self.pos - 1) % self.period
+        x = self._shift(value)
+        self._remove(self.buffer[last])
+        self.buffer[last] = x
+        self._add(x)
+        self._tick()
+
+    def _tick(self):
+        self.updates += 1
+        if self.updates % self.RESYNC_INTERVAL == 0:
+            values = self.buffer[:len(self)]
+            self.sum = float(np.nansum(values))
+            self.sumsq = float(np.nansum(values * values))
+
+    def mean(self):
+        if not self.full or self.nan_count:
+            return math.nan
+        return self.sum / self.period + self.ref
+
+    def std(self, ddof=1):
+        """표본 표준편차 (pandas rolling().std()와 같은 ddof=1)"""
+        if not self.full or self.nan_count or self.period - ddof <= 0:
+            return math.nan
+        mean = self.sum / self.period
+        var = (self.sumsq - self.period * mean * mean) / (self.period - ddof)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+def _rolling_extreme(values, window, func, fill):
+    """van Herk/Gil-Werman 블록 누적으로 이동 최소/최대 계산 (O(n), 봉당 비교 3회)
+
+    블록 안의 앞쪽 누적값과 뒤쪽 누적값을 합쳐 윈도우 극값을 구한다.
+    결과는 윈도우 끝 인덱스에 정렬되며 pandas rolling(window).min()/max()와 같다.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window <= 0 or n < window:
+        return out
+    pad = (-n) % window
+    blocks = np.concatenate([values, np.full(pad, fill)]).reshape(-1, window)
+    prefix = func.accumulate(blocks, axis=1).ravel()
+    suffix = func.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    start = np.arange(n - window + 1)
+    out[window - 1:] = func(suffix[start], prefix[start + window - 1])
+    # NaN이 포함된 윈도우는 pandas(min_periods=window)처럼 NaN 처리
+    nan_mask = np.isnan(values)
+    if nan_mask.any():
+        nan_count = np.concatenate([[0], np.cumsum(nan_mask)])
+        out[window - 1:][(nan_count[window:] - nan_count[:-window]) > 0] = np.nan
+    return out
+
+
+def rolling_min(values, window):
+    """이동 최소값 배열"""
+    return _rolling_extreme(values, window, np.fmin, np.inf)
+
+
+def rolling_max(values, window):
+    """이동 최대값 배열"""
+    return _rolling_extreme(values, window, np.fmax, -np.inf)
+
+
+class StreamingMinMax:
+    """단조 덱(monotonic deque) 기반 이동 최소/최대 (봉당 분할상환 O(1))
+
+    확정된 이전 period-1개 봉은 덱에, 진행 중인 마지막 봉은 별도로 보관하여
+    replace_last로 마지막 봉을 바꿔도 덱을 다시 만들 필요가 없다.
+    """
+    def __init__(self, period):
+        self.period = period
+        self.min_deque = deque()  # (index, value), 값 오름차순
+        self.max_deque = deque()  # (index, value), 값 내림차순
+        self.index = -1
+        self.current_low = None
+        self.current_high = None
+        self.min = math.nan
+        self.max = math.nan
+
+    def update(self, low, high=None, replace_last=False):
+        """새 봉 추가. high를 생략하면 같은 값으로 최소/최대를 함께 추적한다."""
+        if high is None:
+            high = low
+        if not replace_last or self.index < 0:
+            if self.index >= 0:
+                self._commit(self.index, self.current_low, self.current_high)
+            self.index += 1
+        self.current_low = low
+        self.current_high = high
+
+        # 윈도우 밖으로 나간 봉 제거
+        oldest = self.index - self.period + 1
+        while self.min_deque and self.min_deque[0][0] < oldest:
+            self.min_deque.popleft()
+        while self.max_deque and self.max_deque[0][0] < oldest:
+            self.max_deque.popleft()
+
+        if self.index + 1 < self.period:
+            self.min = self.max = math.nan
+        else:
+            self.min = min(self.min_deque[0][1], low) if self.min_deque else low
+            self.max = max(self.max_deque[0][1], high) if self.max_deque else high
+        return self.min, self.max
+
+    def _commit(self, index, low, high):
+        while self.min_deque and self.min_deque[-1][1] >= low:
+            self.min_deque.pop()
+        self.min_deque.append((index, low))
+        while self.max_deque and self.max_deque[-1][1] <= high:
+            self.max_deque.pop()
+        self.max_deque.append((index, high))
+
+
+class StreamingStochastic:
+    """스토캐스틱 %K/%D (StochasticStrategy의 증분 버전)"""
+    def __init__(self, period=14, d_period=3):
+        self.channel = StreamingMinMax(period)
+        self.d_window = RollingWindow(d_period)
+        self.k = math.nan
+        self.d = math.nan
+
+    def update(self, high, low, close, replace_last=False):
+        low_min, high_max = self.channel.update(low, high, replace_last)
+        span = high_max - low_min
+        if math.isnan(span):
+            self.k = math.nan
+        elif span == 0:
+            self.k = math.nan if close == low_min else math.copysign(math.inf, close - low_min)
+        else:
+            self.k = 100 * ((close - low_min) / span)
+        if replace_last and self.d_window.count:
+            self.d_window.replace_last(self.k)
+        else:
+            self.d_window.append(self.k)
+        self.d = self.d_window.mean()
+        return self.k, self.d
+
+
+class StreamingEMA:
+    """지수이동평균 (ewm(span, adjust=False)와 같은 재귀식)"""
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = math.nan
+        self.prev_value = math.nan
+
+    def update(self, price, replace_last=False):
+        """새 봉 가격으로 갱신. replace_last=True 이면 직전 갱신을 다시 계산한다."""
+        if not replace_last:
+            self.prev_value = self.value
+        if math.isnan(self.prev_value):
+            self.value = price
+        else:
+            self.value = (1 - self.alpha) * self.prev_value + self.alpha * price
+        return self.value
+
+
+class StreamingMACD:
+    """MACD/시그널선 (calculate_macd의 증분 버전)"""
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self.fast = StreamingEMA(fast_period)
+        self.slow = StreamingEMA(slow_period)
+        self.signal_ema = StreamingEMA(signal_period)
+        self.macd = math.nan
+        self.signal = math.nan
+
+    def update(self, price, replace_last=False):
+        self.macd = self.fast.update(price, replace_last) - self.slow.update(price, replace_last)
+        self.signal = self.signal_ema.update(self.macd, replace_last)
+        return self.macd, self.signal
+
+
+class StreamingRSI:
+    """RSI (calculate_rsi와 같은 단순 이동평균 방식, 상승/하락폭 이동합 유지)"""
+    def __init__(self, period=14):
+        self.period = period
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.prev_close = None
+        self.last_close = None
+        self.value = math.nan
+
+    def update(self, price, replace_last=False):
+        if replace_last and self.last_close is not None:
+            base = self.prev_close
+        else:
+            base = self.last_close
+            self.prev_close = self.last_close
+        # 첫 봉은 변화량 0으로 취급 (diff().where(...)의 결과와 동일)
+        delta = 0.0 if base is None else price - base
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if replace_last and self.last_close is not None:
+            self.gains.replace_last(gain)
+            self.losses.replace_last(loss)
+        else:
+            self.gains.append(gain)
+            self.losses.append(loss)
+        self.last_close = price
+
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(avg_gain):
+            self.value = math.nan
+        elif avg_loss <= 0:
+            self.value = 100.0 if avg_gain > 0 else math.nan
+        else:
+            self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+        return self.value
+
+
+class StreamingBollingerBands:
+    """볼린저 밴드 (링버퍼 이동합/제곱합)"""
+    def __init__(self, period=20, std=2):
+        self.window = RollingWindow(period)
+        self.num_std = std
+        self.upper = self.middle = self.lower = math.nan
+
+    def update(self, price, replace_last=False):
+        if replace_last:
+            self.window.replace_last(price)
+        else:
+            self.window.append(price)
+        self.middle = self.window.mean()
+        std_dev = self.window.std()
+        self.upper = self.middle + std_dev * self.num_std
+        self.lower = self.middle - std_dev * self.num_std
+        return self.upper, self.middle, self.lower
+
+
+class StreamingATR:
+    """ATR (True Range 이동평균)"""
+    def __init__(self, period=14):
+        self.window = RollingWindow(period)
+        self.prev_close = None
+        self.last_close = None
+        self.value = math.nan
+
+    def update(self, high, low, close, replace_last=False):
+        if replace_last and self.last_close is not None:
+            base = self.prev_close
+        else:
+            base = self.last_close
+            self.prev_close = self.last_close
+        tr = high - low
+        if base is not None:
+            tr = max(tr, abs(high - base), abs(low - base))
+        if replace_last and self.last_close is not None:
+            self.window.replace_last(tr)
+        else:
+            self.window.append(tr)
+        self.last_close = close
+        self.value = self.window.mean()
+        return self.value
+
+
+class StreamingVolumeProfile:
+    """최근 window_size 봉의 가격대별 거래량 분포 (새 봉 추가/가장 오래된 봉 제거)
+
+    구간 경계(윈도우 저가 최소~고가 최대)가 그대로면 추가/제거되는 봉의 거래량만 반영하고,
+    경계가 바뀐 경우에만 bincount로 윈도우 전체를 다시 집계한다.
+    """
+    RESYNC_INTERVAL = 1000
+
+    def __init__(self, num_bins=10, window_size=20):
+        self.num_bins = num_bins
+        self.window_size = window_size
+        self.closes = np.zeros(window_size)
+        self.volumes = np.zeros(window_size)
+        self.channel = StreamingMinMax(window_size)
+        self.count = 0
+        self.pos = 0
+        self.volume_profile = np.zeros(num_bins)
+        self.low_min = math.nan
+        self.high_max = math.nan
+        self.bin_size = math.nan
+        self.updates = 0
+
+    @property
+    def ready(self):
+        return self.count >= self.window_size and self.bin_size > 0
+
+    @property
+    def bins(self):
+        if not self.ready:
+            return None
+        return np.arange(self.low_min, self.high_max + self.bin_size, self.bin_size)
+
+    def bin_index(self, price):
+        """가격이 속한 구간 번호 (범위 밖이면 -1)"""
+        if not self.ready:
+            return -1
+        idx = math.trunc((price - self.low_min) / self.bin_size)
+        return idx if 0 <= idx < self.num_bins else -1
+
+    def update(self, high, low, close, volume, replace_last=False):
+        """봉 추가 후 (bins, volume_profile) 반환. 프로파일 계산 불가 시 (None, None)
+
+        volume_profile은 내부 배열이라 다음 update에서 제자리 갱신된다 (보관하려면 복사).
+        """
+        if replace_last and self.count:
+            slot = (self.pos - 1) % self.window_size
+            removed = (self.closes[slot], self.volumes[slot])
+            added_to_window = True
+        else:
+            slot = self.pos
+            removed = (self.closes[slot], self.volumes[slot]) if self.count >= self.window_size else None
+            added_to_window = False
+            self.pos = (self.pos + 1) % self.window_size
+            self.count += 1
+        self.closes[slot] = close
+        self.volumes[slot] = volume
+        low_min, high_max = self.channel.update(low, high, replace_last and added_to_window)
+
+        if self.count < self.window_size:
+            return None, None
+
+        self.updates += 1
+        same_channel = (low_min == self.low_min and high_max == self.high_max
+                        and self.updates % self.RESYNC_INTERVAL != 0)
+        if same_channel and self.bin_size > 0:
+            # 경계가 같으면 빠지는 봉/들어오는 봉만 반영
+            if removed is not None:
+                old_idx = self.bin_index(removed[0])
+                if old_idx >= 0:
+                    self.volume_profile[old_idx] -= removed[1]
+            new_idx = self.bin_index(close)
+            if new_idx >= 0:
+                self.volume_profile[new_idx] += volume
+        else:
+            self._rebuild(low_min, high_max)
+
+        if not self.ready:
+            return None, None
+        return self.bins, self.volume_profile
+
+    def _rebuild(self, low_min, high_max):
+        self.low_min = low_min
+        self.high_max = high_max
+        price_range = high_max - low_min
+        self.bin_size = price_range / self.num_bins if price_range > 0 else math.nan
+        self.volume_profile = np.zeros(self.num_bins)
+        if not self.bin_size > 0:
+            return
+        bin_idx = np.trunc((self.closes - low_min) / self.bin_size)
+        in_range = (bin_idx >= 0) & (bin_idx < self.num_bins)
+        self.volume_profile = np.bincount(bin_idx[in_range].astype(np.int64),
+                                          weights=self.volumes[in_range],
+                                          minlength=self.num_bins)
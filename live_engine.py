@@ -0,0 +1,195 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class UpdateQueue:
+    """엔진 스레드 -> GUI 스레드 업데이트 전달용 고정 크기 큐
+
+    가득 차면 가장 오래된 항목을 버린다 (GUI가 느려도 메모리와 지연이 쌓이지 않음).
+    put()은 큐가 비어 있다가 처음 채워질 때만 True를 돌려주므로, 그때만 GUI를 깨우면 된다.
+    """
+    def __init__(self, maxlen=200):
+        self.items = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item):
+        with self.lock:
+            was_empty = not self.items
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            return was_empty
+
+    def drain(self):
+        with self.lock:
+            items = list(self.items)
+            self.items.clear()
+            return items
+
+
+class HistoryBuffer:
+    """고정 크기 다중 해상도 시계열 버퍼 (시각, 값)
+
+    단계(level) 0은 최근 capacity개를 원래 해상도로 보관한다. 가득 차서 밀려난 값은 factor개씩 묶어
+    다음 단계에 한 점으로 넣는다 (how: 'last'=마지막 값, 'mean'=평균, 'sum'=합계).
+    마지막 단계에서 밀려난 값은 버린다. 실행 시간과 무관하게 메모리와 snapshot() 비용이 일정하다.
+    append()는 엔진 스레드, snapshot()은 GUI 스레드에서 호출하므로 잠금으로 보호한다.
+    """
+    def __init__(self, capacity=3600, levels=3, factor=60, how='last'):
+        self.capacity = capacity
+        self.levels = levels
+        self.factor = factor
+        self.how = how
+        self.times = np.zeros((levels, capacity))
+        self.values = np.zeros((levels, capacity))
+        self.heads = [0] * levels
+        self.counts = [0] * levels
+        self.pending = [None] * levels  # 단계별로 묶는 중인 값 [마지막 시각, 누적 값, 개수]
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def clear(self):
+        with self.lock:
+            self.heads = [0] * self.levels
+            self.counts = [0] * self.levels
+            self.pending = [None] * self.levels
+
+    def append(self, t, value):
+        with self.lock:
+            self.push(0, t, value)
+
+    def push(self, level, t, value):
+        head = self.heads[level]
+        if self.counts[level] == self.capacity:  # 가장 오래된 값을 다음 단계로 넘김
+            self.carry(level + 1, self.times[level, head], self.values[level, head])
+        else:
+            self.counts[level] += 1
+        self.times[level, head] = t
+        self.values[level, head] = value
+        self.heads[level] = (head + 1) % self.capacity
+
+    def carry(self, level, t, value):
+        if level >= self.levels:
+            return
+        bucket = self.pending[level]
+        if bucket is None:
+            bucket = self.pending[level] = [t, value, 1]
+        else:
+            bucket[0] = t
+            bucket[1] = value if self.how == 'last' else bucket[1] + value
+            bucket[2] += 1
+        if bucket[2] == self.factor:
+            self.pending[level] = None
+            self.push(level, bucket[0], bucket[1] / bucket[2] if self.how == 'mean' else bucket[1])
+
+    def snapshot(self):
+        """전체 구간 (시각, 값) 배열 복사본 (오래된 순, 길이 최대 levels * (capacity + 1))"""
+        with self.lock:
+            times, values = [], []
+            for level in range(self.levels - 1, -1, -1):
+                count = self.counts[level]
+                order = (self.heads[level] - count + np.arange(count)) % self.capacity
+                times.append(self.times[level, order])
+                values.append(self.values[level, order])
+                # 아직 다 묶이지 않은 값은 이 단계보다 새롭고 아래 단계보다 오래됨
+                bucket = self.pending[level]
+                if bucket is not None:
+                    times.append(np.array([bucket[0]]))
+                    values.append(np.array([bucket[1] / bucket[2] if self.how == 'mean' else bucket[1]]))
+            return np.concatenate(times), np.concatenate(values)
+
+
+class LiveEngine:
+    """asyncio 기반 실시간 매매 엔진 (GUI 스레드 밖의 전용 이벤트 루프 스레드에서 실행)
+
+    interval초마다 틱을 만들고, 틱마다 fetch()(블로킹 HTTP 호출)를 스레드 풀에서 실행한 뒤
+    결과를 on_tick(data)에 넘긴다. 이전 틱의 조회가 아직 끝나지 않았으면 새 조회를 띄우지 않고
+    건너뛴다(틱 병합). 네트워크가 느려져도 밀린 틱이 쌓이지 않고 항상 최신 데이터로 처리한다.
+
+    fetch는 코루틴 함수여도 되고, 일반 함수면 run_in_executor로 감싼다.
+    tasks는 같은 이벤트 루프에서 함께 돌릴 코루틴 함수 목록이다 (stop_event를 인자로 받음, 예: 웹소켓 시세 수신).
+    """
+    def __init__(self, fetch, on_tick, interval=1.0, on_error=None, max_io_workers=4, tasks=()):
+        self.fetch = fetch
+        self.tasks = list(tasks)
+        self.on_tick = on_tick
+        self.interval = interval
+        self.on_error = on_error
+        self.max_io_workers = max_io_workers
+        self.loop = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.stats = {'ticks': 0, 'coalesced': 0, 'errors': 0, 'last_latency': 0.0, 'max_latency': 0.0}
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name='LiveEngine', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """엔진 중지 (진행 중인 틱 처리가 끝날 때까지 최대 timeout초 대기)"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_io_workers,
+                                                          thread_name_prefix='LiveEngineIO'))
+        try:
+            self.loop.run_until_complete(self.main())
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+            self.loop = None
+
+    async def main(self):
+        background = [asyncio.ensure_future(task(self.stop_event)) for task in self.tasks]
+        in_flight = None
+        next_tick = time.monotonic()
+        while not self.stop_event.is_set():
+            if in_flight is not None and not in_flight.done():
+                self.stats['coalesced'] += 1  # 이전 틱 조회가 아직 진행 중: 이번 틱은 병합
+            else:
+                in_flight = asyncio.ensure_future(self.tick(time.monotonic()))
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:  # 처리 지연으로 밀린 틱은 건너뛰고 현재 시각 기준으로 맞춤
+                next_tick = time.monotonic()
+                delay = 0
+            await asyncio.sleep(delay)
+        if in_flight is not None:
+            await asyncio.gather(in_flight, return_exceptions=True)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
+    async def tick(self, started):
+        try:
+            if asyncio.iscoroutinefunction(self.fetch):
+                data = await self.fetch()
+            else:
+                data = await self.loop.run_in_executor(None, self.fetch)
+            if self.stop_event.is_set():
+                return
+            self.on_tick(data)
+            latency = time.monotonic() - started
+            self.stats['ticks'] += 1
+            self.stats['last_latency'] = latency
+            self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+        except Exception as e:
+            self.stats['errors'] += 1
+            if self.on_error is not None:
+                self.on_error(e)
@@ -0,0 +1,310 @@
+import sys
+import json
+import uuid
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+import requests
+
+import ohlcv_store
+
+try:
+    import websockets
+except ImportError:  # websockets는 선택 의존성 (없으면 REST 폴링 사용)
+    websockets = None
+
+
+# 빗썸(API 2.0)과 업비트는 같은 형식의 웹소켓 시세 API를 제공한다
+WS_URLS = {
+    '빗썸': 'wss://ws-api.bithumb.com/websocket/v1',
+    '업비트': 'wss://api.upbit.com/websocket/v1',
+}
+
+REST_URLS = {
+    '빗썸': 'https://api.bithumb.com/v1',
+    '업비트': 'https://api.upbit.com/v1',
+}
+
+MINUTE_MS = 60 * 1000
+KST_OFFSET_MS = 9 * 60 * MINUTE_MS  # 체결 시각(UTC epoch ms) -> 저장 시각(KST naive epoch ms)
+
+
+def available():
+    return websockets is not None
+
+
+class CandleBuffer:
+    """코인별 1분봉 링 버퍼 (NumPy 배열)
+
+    REST로 받은 과거 봉으로 한 번 seed()한 뒤에는 체결/현재가로 진행 중인 봉만 갱신하고,
+    분이 바뀌면 새 봉을 추가한다. 최근 capacity개만 보관한다.
+    모든 값을 i와 i + capacity 두 위치에 써 두므로 최근 n개 봉이 항상 연속 구간이 되어,
+    frame()은 배열을 복사하지 않는 읽기 전용 뷰 DataFrame을 돌려준다.
+    """
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.ts = np.zeros(2 * capacity, dtype=np.int64)  # 봉 시작 시각 (KST naive epoch ns)
+        self.values = np.zeros((len(ohlcv_store.OHLCV_COLUMNS), 2 * capacity))  # OHLCV 컬럼별 연속 배열
+        self.head = 0  # 다음에 쓸 위치 (0 ~ capacity-1)
+        self.count = 0
+        self.acc_volume = None  # 직전 현재가 조회의 누적 거래량
+        self.frames = {}  # (끝 위치, 개수) -> 뷰 DataFrame (새 봉이 추가될 때만 새로 만듦)
+
+    def __len__(self):
+        return self.count
+
+    def last(self):
+        """마지막(진행 중인) 봉의 위치 (없으면 None)"""
+        return None if self.count == 0 else (self.head - 1) % self.capacity
+
+    @property
+    def last_close(self):
+        pos = self.last()
+        return None if pos is None else float(self.values[3, pos])
+
+    def write(self, pos, ts_ns, row):
+        self.ts[pos] = self.ts[pos + self.capacity] = ts_ns
+        self.values[:, pos] = self.values[:, pos + self.capacity] = row
+
+    def append(self, ts_ns, row):
+        self.write(self.head, ts_ns, row)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.frames.clear()
+
+    def seed(self, df):
+        """REST 백필 데이터로 초기화 (기존 봉은 버림)"""
+        self.head = 0
+        self.count = 0
+        self.acc_volume = None
+        self.frames.clear()
+        if df is None or df.empty:
+            return
+        df = df.sort_index().iloc[-self.capacity:]
+        ts = pd.DatetimeIndex(df.index).values.astype('datetime64[ns]').view(np.int64)
+        values = df[ohlcv_store.OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        for ts_ns, row in zip(ts, values):
+            self.append(ts_ns, row)
+
+    def update(self, price, volume, ts_ms):
+        """가격/거래량 1건 반영 (ts_ms는 KST naive epoch ms)
+
+        같은 분이면 진행 중인 봉의 고가/저가/종가/거래량만 갱신하고, 분이 바뀌면 새 봉을 추가한다.
+        """
+        minute_ns = ts_ms // MINUTE_MS * MINUTE_MS * 1000000
+        pos = self.last()
+        if pos is not None:
+            if minute_ns < self.ts[pos]:  # 이미 지난 봉의 늦은 체결은 무시
+                return
+            if minute_ns == self.ts[pos]:
+                for p in (pos, pos + self.capacity):
+                    self.values[1, p] = max(self.values[1, p], price)
+                    self.values[2, p] = min(self.values[2, p], price)
+                    self.values[3, p] = price
+                    self.values[4, p] += volume
+                return
+        self.append(minute_ns, (price, price, price, price, volume))
+
+    def update_ticker(self, price, acc_volume, ts_ms):
+        """현재가 조회 결과 반영 (누적 거래량의 증가분을 진행 중인 봉 거래량에 더함)
+
+        누적 거래량이 줄었으면 거래소 일일 초기화로 보고 현재 누적값을 그대로 증가분으로 쓴다.
+        조회 사이의 거래량은 조회 시각이 속한 봉에 모두 들어간다.
+        """
+        volume = 0.0
+        if self.acc_volume is not None:
+            volume = acc_volume - self.acc_volume if acc_volume >= self.acc_volume else acc_volume
+        self.acc_volume = acc_volume
+        self.update(price, volume, ts_ms)
+
+    def frame(self, count):
+        """최근 count개 봉(진행 중인 봉 포함) DataFrame (복사 없는 읽기 전용 뷰, 없으면 None)
+
+        같은 봉 구간이면 같은 DataFrame 객체를 돌려주고, 진행 중인 봉 갱신은 뷰에 바로 반영된다.
+        """
+        count = min(count, self.count)
+        if count == 0:
+            return None
+        end = self.head if self.head >= count else self.head + self.capacity
+        key = (end, count)
+        df = self.frames.get(key)
+        if df is None:
+            ts = self.ts[end - count:end].view('datetime64[ns]')
+            values = self.values[:, end - count:end]
+            ts.flags.writeable = False
+            values.flags.writeable = False
+            df = pd.DataFrame(values.T, index=pd.DatetimeIndex(ts, name='date', copy=False),
+                              columns=ohlcv_store.OHLCV_COLUMNS, copy=False)
+            self.frames[key] = df
+        return df
+
+
+def fetch_tickers(codes, exchange='빗썸'):
+    """여러 마켓 현재가를 REST 한 번으로 조회
+
+    Returns:
+        {마켓코드: (현재가, 누적 거래량, 체결 시각(KST naive epoch ms))}
+    """
+    response = requests.get(f"{REST_URLS[exchange]}/ticker", params={'markets': ','.join(codes)}, timeout=5)
+    response.raise_for_status()
+    data = response.json()
+    if isinstance(data, dict):
+        data = data.get('data', [])
+    return {item['market']: (float(item['trade_price']), float(item['acc_trade_volume']),
+                             int(item['trade_timestamp']) + KST_OFFSET_MS) for item in data}
+
+
+class MarketFeed:
+    """웹소켓 ticker/trade 채널 구독으로 유지하는 실시간 시세 상태
+
+    run()은 엔진 이벤트 루프에서 도는 코루틴으로, 연결이 끊기면 지수 백오프로 다시 연결한다.
+    연결(재연결)할 때마다 backfill(code)(블로킹 REST 호출, 분봉 DataFrame 반환)로 봉을 다시 채워
+    끊긴 동안의 공백을 메운다. REST는 이때만 사용한다.
+    """
+    def __init__(self, codes, backfill, url=WS_URLS['빗썸'], max_candles=500, log=print):
+        self.codes = list(codes)  # 예: ['KRW-BTC']
+        self.backfill = backfill
+        self.url = url
+        self.log = log
+        self.prices = {}
+        self.candles = {code: CandleBuffer(max_candles) for code in self.codes}
+        self.connected = False
+        self.messages = 0
+
+    def price(self, code):
+        """최신 체결가 (아직 받은 체결이 없으면 마지막 봉 종가, 그것도 없으면 None)"""
+        price = self.prices.get(code)
+        return self.candles[code].last_close if price is None else price
+
+    def frame(self, code, count):
+        return self.candles[code].frame(count)
+
+    def subscribe_message(self):
+        return json.dumps([
+            {'ticket': uuid.uuid4().hex[:8]},
+            {'type': 'ticker', 'codes': self.codes, 'isOnlyRealtime': True},
+            {'type': 'trade', 'codes': self.codes, 'isOnlyRealtime': True},
+            {'format': 'DEFAULT'},
+        ])
+
+    def handle(self, message):
+        """수신 메시지 1건 반영"""
+        code = message.get('code')
+        if code not in self.candles:
+            return
+        self.messages += 1
+        price = float(message['trade_price'])
+        self.prices[code] = price
+        if message.get('type') == 'trade':
+            self.candles[code].update(price, float(message['trade_volume']),
+                                      int(message['trade_timestamp']) + KST_OFFSET_MS)
+
+    async def refill(self):
+        loop = asyncio.get_running_loop()
+        for code in self.codes:
+            try:
+                df = await loop.run_in_executor(None, self.backfill, code)
+                self.candles[code].seed(df)
+            except Exception as e:
+                self.log(f"[{code}] 백필 오류: {str(e)}")
+
+    async def run(self, stop_event):
+        delay = 1
+        while not stop_event.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=60) as ws:
+                    await ws.send(self.subscribe_message())
+                    await self.refill()
+                    self.connected = True
+                    delay = 1
+                    self.log(f"시세 웹소켓 연결됨: {', '.join(self.codes)}")
+                    while not stop_event.is_set():
+                        try:
+                            raw = await asyncio.wait_for(ws.recv(), timeout=1)
+                        except asyncio.TimeoutError:
+                            continue
+                        self.handle(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.log(f"시세 웹소켓 오류: {str(e)} ({delay}초 후 재연결)")
+            finally:
+                self.connected = False
+            if not stop_event.is_set():
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+def messages_from_ohlcv(df, code):
+    """1분봉 DataFrame을 거래소 형식의 체결 메시지 목록으로 변환 (리플레이용)
+
+    봉마다 시가 -> 고가 -> 저가 -> 종가 순으로 4건의 체결을 만들고 거래량은 나눠 배분한다.
+    """
+    messages = []
+    ts = ohlcv_store.to_epoch_ms(pd.DatetimeIndex(df.index)) - KST_OFFSET_MS
+    values = df[ohlcv_store.OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    for t, (open_, high, low, close, volume) in zip(ts.tolist(), values.tolist()):
+        for i, price in enumerate((open_, high, low, close)):
+            messages.append({'type': 'trade', 'code': code, 'trade_price': price, 'trade_volume': volume / 4,
+                             'trade_timestamp': t + i * 15000, 'stream_type': 'REALTIME'})
+    return messages
+
+
+class ReplayServer:
+    """녹화/생성한 시세 메시지를 거래소 웹소켓처럼 보내주는 로컬 서버
+
+    클라이언트가 구독한 코드의 메시지만 speed배속(메시지 시각 기준)으로 보낸다. speed=None이면 지연 없이 보낸다.
+    MarketFeed의 url을 ws://host:port 로 바꾸면 실제 거래소 대신 이 서버에 붙는다.
+    """
+    def __init__(self, messages, host='127.0.0.1', port=8765, speed=None):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.speed = speed
+
+    async def handler(self, ws):
+        request = json.loads(await ws.recv())
+        codes = set()
+        for item in request:
+            if item.get('type') in ('ticker', 'trade'):
+                codes.update(item.get('codes', []))
+        previous = None
+        try:
+            for message in self.messages:
+                if message['code'] not in codes:
+                    continue
+                if self.speed and previous is not None:
+                    await asyncio.sleep(max(0, message['trade_timestamp'] - previous) / 1000 / self.speed)
+                previous = message['trade_timestamp']
+                await ws.send(json.dumps(message).encode('utf-8'))  # 거래소와 같이 바이너리 프레임
+        except websockets.ConnectionClosed:  # 클라이언트가 리플레이 도중 연결을 끊음
+            return
+        await ws.wait_closed()
+
+    async def serve(self):
+        async with websockets.serve(self.handler, self.host, self.port):
+            await asyncio.Future()
+
+
+if __name__ == '__main__':
+    # ohlcv.db의 1분봉을 리플레이: python market_feed.py 코인 [배속] [포트]
+    if not available():
+        print("websockets가 설치되어 있지 않습니다. (pip install websockets)")
+        sys.exit(1)
+    coin = sys.argv[1] if len(sys.argv) > 1 else 'BTC'
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    port = int(sys.argv[3]) if len(sys.argv) > 3 else 8765
+    conn = ohlcv_store.connect()
+    try:
+        table_name = f"{coin}_ohlcv_minute1"
+        coverage = ohlcv_store.get_coverage(conn, table_name)
+        if coverage is None:
+            print(f"{table_name} 데이터가 없습니다.")
+            sys.exit(1)
+        df = ohlcv_store.load_ohlcv(conn, table_name, coverage[1], coverage[2])
+    finally:
+        conn.close()
+    messages = messages_from_ohlcv(df, f"KRW-{coin}")
+    print(f"리플레이 서버 시작: ws://127.0.0.1:{port} ({len(messages)}건, {speed}배속, {time.strftime('%H:%M:%S')})")
+    asyncio.run(ReplayServer(messages, port=port, speed=speed).serve())
@@ -0,0 +1,321 @@
+import sys
+import time
+import sqlite3
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+
+DB_PATH = 'ohlcv.db'
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+ROW_DTYPE = np.dtype([('ts', np.int64)] + [(col, np.float64) for col in OHLCV_COLUMNS])  # 조회 행 (ts, OHLCV)
+
+
+def connect(db_path=DB_PATH):
+    """OHLCV DB 연결 (WAL 모드 및 대량 적재용 pragma 설정)"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')  # WAL에서는 NORMAL로도 커밋 단위 내구성 보장
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')  # 64MB
+    return conn
+
+
+# --- 타임스탬프 변환 ---
+# 시각은 거래소가 주는 naive 시각(KST)을 그대로 epoch 밀리초 정수로 저장한다 (시간대 변환 없음).
+
+def to_epoch_ms(value):
+    """datetime/Timestamp 또는 DatetimeIndex를 epoch 밀리초(int64)로 변환"""
+    if isinstance(value, pd.DatetimeIndex):
+        return value.values.astype('datetime64[ms]').astype(np.int64)
+    return pd.Timestamp(value).value // 1_000_000
+
+
+def from_epoch_ms(values):
+    """epoch 밀리초 int64 배열을 DatetimeIndex로 변환 (행 단위 파싱 없음)"""
+    values = np.asarray(values, dtype=np.int64)
+    return pd.DatetimeIndex(values.astype('datetime64[ms]').astype('datetime64[ns]'), name='date')
+
+
+def to_datetime(ms):
+    return pd.Timestamp(int(ms), unit='ms').to_pydatetime()
+
+
+# --- 스키마 ---
+
+def create_table(conn, table_name):
+    """OHLCV 테이블 생성 (epoch ms 정수 키, 키 순서로 저장되는 WITHOUT ROWID 레이아웃)
+
+    기존 TEXT 날짜 스키마 테이블이 있으면 먼저 변환한다.
+    """
+    if is_legacy_table(conn, table_name):
+        migrate_table(conn, table_name)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            ts INTEGER PRIMARY KEY,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL
+        ) WITHOUT ROWID
+    ''')
+
+
+def table_exists(conn, table_name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+    return row is not None
+
+
+def is_legacy_table(conn, table_name):
+    """date TEXT PRIMARY KEY 스키마(이전 버전) 테이블 여부"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table_name})')]
+    return 'date' in columns and 'ts' not in columns
+
+
+def migrate_table(conn, table_name):
+    """TEXT 날짜 테이블을 epoch ms WITHOUT ROWID 테이블로 변환 (하나의 트랜잭션)
+
+    Returns:
+        변환된 행 수
+    """
+    tmp_name = f'{table_name}__migrate'
+    conn.commit()
+    try:
+        conn.execute('BEGIN')
+        conn.execute(f'DROP TABLE IF EXISTS {tmp_name}')
+        conn.execute(f'''
+            CREATE TABLE {tmp_name} (
+                ts INTEGER PRIMARY KEY,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume REAL
+            ) WITHOUT ROWID
+        ''')
+        # strftime('%s')는 입력을 UTC로 해석하므로 naive 시각이 그대로 epoch 값이 된다
+        cursor = conn.execute(f'''
+            INSERT OR REPLACE INTO {tmp_name} (ts, open, high, low, close, volume)
+            SELECT CAST(strftime('%s', date) AS INTEGER) * 1000, open, high, low, close, volume
+            FROM {table_name}
+            WHERE date IS NOT NULL
+        ''')
+        migrated = cursor.rowcount
+        conn.execute(f'DROP TABLE {table_name}')
+        conn.execute(f'ALTER TABLE {tmp_name} RENAME TO {table_name}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return migrated
+
+
+def migrate_database(db_path=DB_PATH):
+    """DB 안의 모든 이전 스키마 OHLCV 테이블을 변환
+
+    Returns:
+        {테이블명: 변환 행 수}
+    """
+    conn = connect(db_path)
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%\\_ohlcv\\_%' ESCAPE '\\'")]
+        results = {}
+        for table_name in tables:
+            if is_legacy_table(conn, table_name):
+                results[table_name] = migrate_table(conn, table_name)
+        if results:
+            conn.execute('VACUUM')
+        return results
+    finally:
+        conn.close()
+
+
+# --- 쓰기 ---
+
+def iter_rows(df):
+    """DataFrame을 (ts, open, high, low, close, volume) 튜플로 변환 (행 단위 strftime/iterrows 없이)
+
+    ts int64 / OHLCV float64 구조화 배열에 컬럼을 한 번에 복사한 뒤 tolist()로 튜플을 만든다.
+    NumPy 배열을 executemany에 그대로 넘기면 값마다 NumPy 스칼라를 거쳐 약 3배 느리다.
+    """
+    rows = np.empty(len(df), dtype=ROW_DTYPE)
+    rows['ts'] = to_epoch_ms(pd.DatetimeIndex(df.index))
+    for col in OHLCV_COLUMNS:
+        rows[col] = df[col].to_numpy(dtype=np.float64)
+    return rows.tolist()
+
+
+def bulk_insert_ohlcv(conn, table_name, df):
+    """OHLCV 데이터를 하나의 트랜잭션에서 executemany로 일괄 저장
+
+    Returns:
+        (저장 행 수, 소요 시간(초))
+    """
+    start = time.perf_counter()
+    create_table(conn, table_name)
+    with conn:  # 성공 시 커밋, 실패 시 롤백
+        conn.executemany(f'''
+            INSERT OR REPLACE INTO {table_name} (ts, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', iter_rows(df))
+    return len(df), time.perf_counter() - start
+
+
+# --- 조회 ---
+
+# 테이블 접미사별 봉 간격 (월봉은 간격이 일정하지 않아 최대 간격 사용)
+INTERVAL_STEPS = {
+    'minute1': timedelta(minutes=1),
+    'minute3': timedelta(minutes=3),
+    'minute5': timedelta(minutes=5),
+    'minute15': timedelta(minutes=15),
+    'minute30': timedelta(minutes=30),
+    'hour1': timedelta(hours=1),
+    'hour4': timedelta(hours=4),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=31),
+}
+
+
+def interval_step(table_name):
+    """테이블명({coin}_ohlcv_{interval})에서 봉 간격 추출"""
+    return INTERVAL_STEPS[table_name.rsplit('_', 1)[1]]
+
+
+def ensure_current_schema(conn, table_name):
+    """테이블이 있으면 현재 스키마인지 확인(필요 시 변환)하고 존재 여부 반환"""
+    if not table_exists(conn, table_name):
+        return False
+    if is_legacy_table(conn, table_name):
+        migrate_table(conn, table_name)
+    return True
+
+
+def get_coverage(conn, table_name):
+    """저장된 데이터 범위 (행 수, 첫 시각, 마지막 시각), 없으면 None"""
+    if not ensure_current_schema(conn, table_name):
+        return None
+    count, first, last = conn.execute(f'SELECT COUNT(*), MIN(ts), MAX(ts) FROM {table_name}').fetchone()
+    if count == 0:
+        return None
+    return count, to_datetime(first), to_datetime(last)
+
+
+def find_missing_ranges(conn, table_name, start, end, step=None):
+    """요청 구간 [start, end]에서 DB에 없는 구간 목록 [(from, to), ...] 반환
+
+    저장된 봉([ts, ts+step))과 이미 받아 본 구간(mark_fetched)을 모두 채워진 것으로 보고,
+    그 사이에 봉 하나 이상 들어갈 빈 곳(앞/뒤 빈 구간, 중간 구멍)만 돌려준다.
+    거래소가 이미 응답한 구간 안의 구멍은 거래가 없던 봉이므로 다시 요청하지 않는다.
+    구간 끝점은 이미 저장된 봉과 겹칠 수 있으나 INSERT OR REPLACE로 저장하므로 문제없다.
+    """
+    if step is None:
+        step = interval_step(table_name)
+    end = min(end, pd.Timestamp.now().to_pydatetime())
+    if start > end:
+        return []
+    if not ensure_current_schema(conn, table_name):
+        return [(start, end)]
+
+    start_ms, end_ms = to_epoch_ms(start), to_epoch_ms(end)
+    step_ms = int(step.total_seconds() * 1000)
+    stop_ms = end_ms + step_ms  # end 시각의 봉까지 포함
+    rows = conn.execute(f'SELECT ts FROM {table_name} WHERE ts BETWEEN ? AND ? ORDER BY ts',
+                        (start_ms, end_ms)).fetchall()
+    ts = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    spans = fetched_spans(conn, table_name, start_ms, stop_ms)
+
+    # 채워진 구간들을 시작 시각 순으로 훑으며, 앞 구간들이 닿은 끝(reach)과 다음 시작 사이가 빈 곳
+    # 맨 앞/뒤에 [.., start), [stop, stop) 경계 구간을 넣어 앞/뒤 빈 구간도 같은 방식으로 찾는다
+    starts = np.concatenate([[np.iinfo(np.int64).min], ts, spans[:, 0], [stop_ms]])
+    ends = np.concatenate([[start_ms], ts + step_ms, spans[:, 1], [stop_ms]])
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)[:-1]
+    gap_ends = np.minimum(starts[1:], stop_ms)
+    gaps = np.flatnonzero((gap_ends - reach >= step_ms) & (reach < stop_ms))
+
+    missing = []
+    for i in gaps:
+        range_start = start if reach[i] == start_ms else to_datetime(reach[i])
+        range_end = end if gap_ends[i] >= end_ms else to_datetime(gap_ends[i])
+        missing.append((range_start, range_end))
+    return missing
+
+
+# --- 수집 이력 ---
+# 거래가 없던 봉은 거래소가 돌려주지 않아 DB에 구멍으로 남는다.
+# 거래소가 응답한 시간 창 [start, end)를 기록해 두고, 그 안의 구멍은 누락으로 보지 않는다.
+
+FETCHED_TABLE = 'ohlcv_fetched'
+
+
+def create_fetched_table(conn):
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {FETCHED_TABLE} (
+            table_name TEXT,
+            start_ts INTEGER,
+            end_ts INTEGER,
+            PRIMARY KEY (table_name, start_ts)
+        ) WITHOUT ROWID
+    ''')
+
+
+def mark_fetched(conn, table_name, start, end):
+    """거래소가 [start, end) 구간을 응답했음을 기록 (받은 봉을 저장한 뒤 호출)
+
+    아직 끝나지 않은 봉은 거래가 생길 수 있으므로, 현재 시각 기준 마감된 봉까지만 기록한다.
+    """
+    step_ms = int(interval_step(table_name).total_seconds() * 1000)
+    start_ms = to_epoch_ms(start)
+    end_ms = min(to_epoch_ms(end), to_epoch_ms(pd.Timestamp.now()) - step_ms)
+    if end_ms <= start_ms:
+        return
+    create_fetched_table(conn)
+    with conn:
+        conn.execute(f'''
+            INSERT INTO {FETCHED_TABLE} (table_name, start_ts, end_ts) VALUES (?, ?, ?)
+            ON CONFLICT (table_name, start_ts) DO UPDATE SET end_ts = MAX(end_ts, excluded.end_ts)
+        ''', (table_name, start_ms, end_ms))
+
+
+def fetched_spans(conn, table_name, start_ms, end_ms):
+    """[start_ms, end_ms)와 겹치는 수집 완료 구간을 (n, 2) int64 배열로 반환"""
+    if not table_exists(conn, FETCHED_TABLE):
+        return np.empty((0, 2), dtype=np.int64)
+    rows = conn.execute(f'''
+        SELECT start_ts, end_ts FROM {FETCHED_TABLE}
+        WHERE table_name = ? AND start_ts < ? AND end_ts > ?
+    ''', (table_name, end_ms, start_ms)).fetchall()
+    return np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+
+def load_ohlcv(conn, table_name, start, end):
+    """[start, end] 구간 OHLCV를 DataFrame으로 조회 (없으면 None)
+
+    기본키 범위 스캔 커서를 구조화 배열(ts int64, OHLCV float64)로 바로 읽는다 (행 목록을 만들지 않음).
+    """
+    if not ensure_current_schema(conn, table_name):
+        return None
+    cursor = conn.execute(f'''
+        SELECT ts, open, high, low, close, volume
+        FROM {table_name}
+        WHERE ts BETWEEN ? AND ?
+        ORDER BY ts
+    ''', (to_epoch_ms(start), to_epoch_ms(end)))
+    rows = np.fromiter(cursor, dtype=ROW_DTYPE)
+    if len(rows) == 0:
+        return None
+    return pd.DataFrame({col: rows[col] for col in OHLCV_COLUMNS}, index=from_epoch_ms(rows['ts']))
+
+if __name__ == '__main__':
+    # 이전 스키마(date TEXT) DB 변환: python ohlcv_store.py [db 경로]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    start = time.perf_counter()
+    results = migrate_database(db_path)
+    for table_name, rows in results.items():
+        print(f"{table_name}: {rows}건 변환")
+    print(f"변환 완료: 테이블 {len(results)}개, {time.perf_counter() - start:.1f}초")
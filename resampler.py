@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+import ohlcv_store
+
+
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+
+SOURCE_INTERVAL = 'minute1'
+
+# 1분봉에서 만드는 봉: (간격 ms, 구간 시작 오프셋 ms)
+# 시각은 KST naive 기준이라 업비트처럼 4시간봉은 01시(UTC 16시), 일봉은 09시(UTC 0시)부터 시작한다.
+# 주봉/월봉은 달력 기준이라 여기서 만들지 않는다.
+DERIVED_INTERVALS = {
+    'minute3': (3 * MINUTE_MS, 0),
+    'minute5': (5 * MINUTE_MS, 0),
+    'minute15': (15 * MINUTE_MS, 0),
+    'minute30': (30 * MINUTE_MS, 0),
+    'hour1': (HOUR_MS, 0),
+    'hour4': (4 * HOUR_MS, HOUR_MS),
+    'day': (DAY_MS, 9 * HOUR_MS),
+}
+
+
+def is_source_table(table_name):
+    return table_name.rsplit('_', 1)[1] == SOURCE_INTERVAL
+
+
+def is_derived_table(table_name):
+    return table_name.rsplit('_', 1)[1] in DERIVED_INTERVALS
+
+
+def source_table_name(table_name):
+    return f"{table_name.rsplit('_', 1)[0]}_{SOURCE_INTERVAL}"
+
+
+def derived_table_name(source_table, interval):
+    return f"{source_table.rsplit('_', 1)[0]}_{interval}"
+
+
+def bucket_start(ts_ms, interval):
+    """epoch ms(스칼라 또는 배열)가 속한 봉의 시작 시각"""
+    step, offset = DERIVED_INTERVALS[interval]
+    return (np.asarray(ts_ms, dtype=np.int64) - offset) // step * step + offset
+
+
+def aggregate(ts_ms, values, interval):
+    """정렬된 1분봉 (ts, OHLCV(n, 5))를 상위 봉으로 집계 (거래 없는 구간은 봉을 만들지 않음)
+
+    시가=첫 값, 고가=최대, 저가=최소, 종가=마지막 값, 거래량=합계
+    """
+    if len(ts_ms) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5))
+    buckets = bucket_start(ts_ms, interval)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    result = np.empty((len(starts), 5))
+    result[:, 0] = values[starts, 0]
+    result[:, 1] = np.maximum.reduceat(values[:, 1], starts)
+    result[:, 2] = np.minimum.reduceat(values[:, 2], starts)
+    result[:, 3] = values[ends, 3]
+    result[:, 4] = np.add.reduceat(values[:, 4], starts)
+    return buckets[starts], result
+
+
+def resample_ohlcv(df, interval):
+    """1분봉 DataFrame을 상위 봉 DataFrame으로 변환"""
+    df = df.sort_index()
+    ts, result = aggregate(ohlcv_store.to_epoch_ms(pd.DatetimeIndex(df.index)),
+                           df[ohlcv_store.OHLCV_COLUMNS].to_numpy(dtype=np.float64), interval)
+    return pd.DataFrame(result, index=ohlcv_store.from_epoch_ms(ts), columns=ohlcv_store.OHLCV_COLUMNS)
+
+
+def resample_incremental(conn, source_table, since=None, intervals=None):
+    """1분봉 테이블에서 상위 봉을 다시 계산해야 하는 뒷부분만 집계
+
+    봉마다 마지막 저장 봉(진행 중이던 봉일 수 있음)과 since(새로 저장된 1분봉의 첫 시각) 중
+    이른 쪽이 속한 봉부터 다시 계산한다. 상위 봉 테이블이 없으면 처음부터 만든다.
+
+    Returns:
+        {상위 봉 테이블명: 다시 계산한 DataFrame}
+    """
+    intervals = list(DERIVED_INTERVALS) if intervals is None else intervals
+    since_ms = None if since is None else ohlcv_store.to_epoch_ms(since)
+
+    # 봉 단위별 다시 계산할 시작 시각 (None이면 처음부터)
+    restart = {}
+    for interval in intervals:
+        coverage = ohlcv_store.get_coverage(conn, derived_table_name(source_table, interval))
+        if coverage is None:
+            restart[interval] = None
+            continue
+        candidates = [ohlcv_store.to_epoch_ms(coverage[2])]
+        if since_ms is not None:
+            candidates.append(since_ms)
+        restart[interval] = int(bucket_start(min(candidates), interval))
+
+    if not restart:
+        return {}
+    known = [ms for ms in restart.values() if ms is not None]
+    read_from = pd.Timestamp.min if len(known) < len(restart) else ohlcv_store.to_datetime(min(known))
+    minutes = ohlcv_store.load_ohlcv(conn, source_table, read_from, pd.Timestamp.max)
+    if minutes is None:
+        return {}
+    ts = ohlcv_store.to_epoch_ms(minutes.index)
+    values = minutes.to_numpy(dtype=np.float64)
+
+    results = {}
+    for interval, start_ms in restart.items():
+        lo = 0 if start_ms is None else np.searchsorted(ts, start_ms, side='left')
+        bucket_ts, result = aggregate(ts[lo:], values[lo:], interval)
+        if len(bucket_ts):
+            results[derived_table_name(source_table, interval)] = pd.DataFrame(
+                result, index=ohlcv_store.from_epoch_ms(bucket_ts), columns=ohlcv_store.OHLCV_COLUMNS)
+    return results
@@ -4,7 +4,14 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import pyupbit
 import traceback
+import os
+import tempfile
 from datetime import datetime
+from indicators import (rolling_min, rolling_max, RollingWindow, StreamingEMA, StreamingMACD, StreamingRSI,
+                        StreamingBollingerBands, StreamingATR, StreamingStochastic, StreamingVolumeProfile)
+import candle_cache
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
 
 class BaseStrategy:
     """기본 전략 클래스"""
@@ -32,6 +39,110 @@ class BaseStrategy:
         lower = ma - (std_dev * std)
         return upper, ma, lower
 
+    def generate_signals(self, df, **params):
+        """전체 구간 신호 배열 생성 (df.index 정렬, 'buy'/'sell'/None)
+
+        벡터화 구현이 없는 전략용 기본 구현으로, 봉마다 generate_signal을 호출한다.
+        """
+        signals = np.full(len(df), None, dtype=object)
+        for i in range(len(df)):
+            try:
+                signals[i] = self.generate_signal(df.iloc[:i+1], **params)
+            except Exception:
+                signals[i] = None  # 데이터가 짧아 계산 불가한 구간
+        return signals
+
+    def create_signal_stream(self, **params):
+        """봉 단위 증분 신호 계산 상태 (SignalStream) 생성, 지원하지 않는 전략은 None"""
+        return None
+
+    @staticmethod
+    def signals_from_conditions(buy, sell):
+        """매수/매도 조건 배열을 신호 배열로 변환 (매수 조건 우선)"""
+        signals = np.full(len(buy), None, dtype=object)
+        signals[np.asarray(sell, dtype=bool)] = 'sell'
+        signals[np.asarray(buy, dtype=bool)] = 'buy'
+        return signals
+
+    @staticmethod
+    def signal_from_conditions(buy, sell):
+        """봉 하나의 매수/매도 조건을 신호로 변환 (매수 조건 우선)"""
+        if buy:
+            return 'buy'
+        if sell:
+            return 'sell'
+        return None
+
+class SignalStream:
+    """봉을 하나씩 받아 신호를 내는 전략별 증분 상태 (라이브 루프에서 코인마다 하나씩 사용)
+
+    step(open, high, low, close, volume, replace_last, prev)는 전략이 만든 함수로 (이번 봉 지표 값, 신호)를 반환한다.
+    prev는 직전 확정 봉의 지표 값(첫 봉이면 None)이다. 진행 중인 마지막 봉이 바뀌면 replace_last=True로 다시 반영한다.
+    같은 봉들을 순서대로 넣으면 전체 구간에 대한 generate_signals(df)와 같은 신호를 낸다.
+    """
+    def __init__(self, step):
+        self.step = step
+        self.count = 0  # 반영한 봉 수
+        self.prev = None
+        self.current = None
+        self.signal = None
+        self.last_time = None
+
+    def update(self, open_, high, low, close, volume, replace_last=False):
+        replace_last = replace_last and self.count > 0
+        if not replace_last:
+            self.prev = self.current
+            self.count += 1
+        self.current, self.signal = self.step(open_, high, low, close, volume, replace_last, self.prev)
+        return self.signal
+
+    def feed(self, df):
+        """df(시각 오름차순 OHLCV)에서 아직 반영하지 않은 봉만 반영하고 마지막 봉의 신호 반환
+
+        마지막으로 반영한 봉이 df에 남아 있으면 진행 중인 봉이 갱신된 것으로 보고 다시 반영한다.
+        처음 호출하면 df 전체로 지표를 채우고, 이후에는 틱마다 한두 봉만 반영한다.
+        """
+        start = 0 if self.last_time is None else df.index.searchsorted(self.last_time)
+        rows = df.iloc[start:]
+        for t, bar in zip(rows.index, rows[OHLCV_COLUMNS].to_numpy(dtype=float).tolist()):
+            self.update(*bar, replace_last=(t == self.last_time))
+            self.last_time = t
+        return self.signal
+
+class StrategyFactory:
+    """전략 팩토리 클래스
+
+    전략 클래스는 @StrategyFactory.register(이름)으로 등록하고,
+    create_strategy는 전략별 인스턴스를 처음 요청될 때 한 번만 만들어 재사용한다.
+    """
+    _registry = {}
+    _instances = {}
+
+    @classmethod
+    def register(cls, strategy_name):
+        """전략 클래스 등록 데코레이터 (외부 모듈의 전략도 같은 방식으로 추가 가능)"""
+        def decorator(strategy_class):
+            cls._registry[strategy_name] = strategy_class
+            cls._instances.pop(strategy_name, None)  # 재등록 시 이전 인스턴스 폐기
+            return strategy_class
+        return decorator
+
+    @classmethod
+    def create_strategy(cls, strategy_name):
+        strategy = cls._instances.get(strategy_name)
+        if strategy is None:
+            strategy_class = cls._registry.get(strategy_name)
+            if strategy_class is None:
+                return None
+            strategy = cls._instances[strategy_name] = strategy_class()
+        return strategy
+
+    @classmethod
+    def strategy_names(cls):
+        """등록된 전략 이름 목록"""
+        return list(cls._registry)
+
+@StrategyFactory.register('RSI')
 class RSIStrategy(BaseStrategy):
     """RSI 전략"""
     def generate_signal(self, df, period=14, overbought=70, oversold=30):
@@ -48,6 +159,19 @@ class RSIStrategy(BaseStrategy):
         # print(f"[RSI] NO signal: rsi={rsi.iloc[-1]}, overbought={overbought}, oversold={oversold}")
         return None
 
+    def generate_signals(self, df, period=14, overbought=70, oversold=30):
+        rsi = self.calculate_rsi(df['close'], period)
+        return self.signals_from_conditions(rsi < oversold, rsi > overbought)
+
+    def create_signal_stream(self, period=14, overbought=70, oversold=30):
+        rsi = StreamingRSI(period)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            value = rsi.update(close, replace_last)
+            return value, self.signal_from_conditions(value < oversold, value > overbought)
+        return SignalStream(step)
+
+@StrategyFactory.register('볼린저밴드')
 class BollingerBandsStrategy(BaseStrategy):
     """볼린저 밴드 전략"""
     def generate_signal(self, df, period=20, std=2):
@@ -58,6 +182,19 @@ class BollingerBandsStrategy(BaseStrategy):
             return 'sell'
         return None
 
+    def generate_signals(self, df, period=20, std=2):
+        upper, middle, lower = self.calculate_bollinger_bands(df['close'], period, std)
+        return self.signals_from_conditions(df['close'] < lower, df['close'] > upper)
+
+    def create_signal_stream(self, period=20, std=2):
+        bands = StreamingBollingerBands(period, std)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            upper, middle, lower = bands.update(close, replace_last)
+            return None, self.signal_from_conditions(close < lower, close > upper)
+        return SignalStream(step)
+
+@StrategyFactory.register('MACD')
 class MACDStrategy(BaseStrategy):
     """MACD 전략"""
     def generate_signal(self, df, fast_period=12, slow_period=26, signal_period=9):
@@ -68,6 +205,27 @@ class MACDStrategy(BaseStrategy):
             return 'sell'
         return None
 
+    def generate_signals(self, df, fast_period=12, slow_period=26, signal_period=9):
+        macd, signal = self.calculate_macd(df['close'], fast_period, slow_period, signal_period)
+        prev_macd, prev_signal = macd.shift(1), signal.shift(1)
+        buy = (macd > signal) & (prev_macd <= prev_signal)
+        sell = (macd < signal) & (prev_macd >= prev_signal)
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, fast_period=12, slow_period=26, signal_period=9):
+        macd_state = StreamingMACD(fast_period, slow_period, signal_period)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            macd, signal = macd_state.update(close, replace_last)
+            if prev is None:
+                return (macd, signal), None
+            prev_macd, prev_signal = prev
+            buy = macd > signal and prev_macd <= prev_signal
+            sell = macd < signal and prev_macd >= prev_signal
+            return (macd, signal), self.signal_from_conditions(buy, sell)
+        return SignalStream(step)
+
+@StrategyFactory.register('거래량 프로파일')
 class VolumeProfileStrategy(BaseStrategy):
     """거래량 프로파일 전략"""
     def calculate_vwap(self, df):
@@ -75,20 +233,21 @@ class VolumeProfileStrategy(BaseStrategy):
         return vwap
         
     def calculate_volume_profile(self, df, num_bins=10):
-        price_range = df['high'].max() - df['low'].min()
+        low_min = df['low'].min()
+        high_max = df['high'].max()
+        price_range = high_max - low_min
         if price_range == 0:  # 가격 범위가 0인 경우 처리
             return None, None
             
         bin_size = price_range / num_bins
-        bins = np.arange(df['low'].min(), df['high'].max() + bin_size, bin_size)
-        volume_profile = np.zeros(num_bins)
+        bins = np.arange(low_min, high_max + bin_size, bin_size)
         
-        for i in range(len(df)):
-            price = df['close'].iloc[i]
-            volume = df['volume'].iloc[i]
-            bin_idx = int((price - df['low'].min()) / bin_size)
-            if 0 <= bin_idx < num_bins:
-                volume_profile[bin_idx] += volume
+        # 종가가 속한 구간별 거래량 합계 (bincount는 입력 순서대로 누적)
+        bin_idx = np.trunc((df['close'].to_numpy(dtype=float) - low_min) / bin_size)
+        in_range = (bin_idx >= 0) & (bin_idx < num_bins)
+        volume_profile = np.bincount(bin_idx[in_range].astype(np.int64),
+                                     weights=df['volume'].to_numpy(dtype=float)[in_range],
+                                     minlength=num_bins)
                 
         return bins, volume_profile
         
@@ -160,6 +319,101 @@ class VolumeProfileStrategy(BaseStrategy):
             traceback.print_exc()
             return None
 
+    def calculate_window_profile(self, df, num_bins=10, window_size=20, chunk_size=8192):
+        """봉마다 최근 window_size 구간의 (현재 구간 거래량, 구간 평균 거래량, 유효 여부) 계산
+
+        generate_signal의 calculate_volume_profile(df.tail(window_size))과 같은 구간 분할을
+        슬라이딩 윈도우로 한 번에 계산한다.
+        """
+        n = len(df)
+        current_bin_volume = np.zeros(n)
+        mean_volume = np.zeros(n)
+        valid = np.zeros(n, dtype=bool)
+        if n < window_size:
+            return current_bin_volume, mean_volume, valid
+
+        close = df['close'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        low_min = rolling_min(df['low'].to_numpy(dtype=float), window_size)
+        high_max = rolling_max(df['high'].to_numpy(dtype=float), window_size)
+        close_win = np.lib.stride_tricks.sliding_window_view(close, window_size)
+        volume_win = np.lib.stride_tricks.sliding_window_view(volume, window_size)
+
+        # 윈도우 끝 인덱스 window_size-1 부터 청크 단위로 계산 (메모리 제한)
+        for start in range(0, n - window_size + 1, chunk_size):
+            stop = min(start + chunk_size, n - window_size + 1)
+            end_idx = np.arange(start, stop) + window_size - 1
+            lo = low_min[end_idx]
+            price_range = high_max[end_idx] - lo
+            ok = price_range != 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                bin_size = price_range / num_bins
+                bin_idx = np.trunc((close_win[start:stop] - lo[:, None]) / bin_size[:, None])
+                current_bin = np.trunc((close[end_idx] - lo) / bin_size)
+            in_range = (bin_idx >= 0) & (bin_idx < num_bins)
+            ok &= (current_bin >= 0) & (current_bin < num_bins)
+            vol = volume_win[start:stop]
+            mean_volume[end_idx] = np.where(in_range, vol, 0.0).sum(axis=1) / num_bins
+            current_bin_volume[end_idx] = np.where(bin_idx == current_bin[:, None], vol, 0.0).sum(axis=1)
+            valid[end_idx] = ok
+        return current_bin_volume, mean_volume, valid
+
+    def generate_signals(self, df, num_bins=10, volume_threshold=1000, volume_zscore_threshold=2.0, window_size=20):
+        n = len(df)
+        if n < window_size + 1:
+            return np.full(n, None, dtype=object)
+
+        close = df['close'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        vwap = self.calculate_vwap(df).to_numpy(dtype=float)
+        volume_ma = df['volume'].rolling(window=window_size).mean().to_numpy(dtype=float)
+        price_momentum = df['close'].pct_change().rolling(window=5).mean().to_numpy(dtype=float)
+
+        current_bin_volume, mean_volume, valid = self.calculate_window_profile(df, num_bins, window_size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(mean_volume > 0, current_bin_volume / mean_volume, 0)
+            vwap_distance = np.abs(close - vwap) / vwap
+
+        volume_condition = volume > volume_ma * 0.8
+        profile_condition = volume_ratio > 0.8
+        active = valid & volume_condition & profile_condition & (vwap_distance > 0.001)
+        active[:window_size] = False  # generate_signal은 window_size + 1개 미만이면 신호 없음
+        buy = active & (close < vwap) & (price_momentum < 0)
+        sell = active & (close > vwap) & (price_momentum > 0)
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, num_bins=10, volume_threshold=1000, volume_zscore_threshold=2.0, window_size=20):
+        """거래량 프로파일 신호 증분 계산 (VWAP 누적합, 거래량/수익률 이동평균, 롤링 가격대별 거래량)"""
+        profile = StreamingVolumeProfile(num_bins, window_size)
+        volume_window = RollingWindow(window_size)
+        returns_window = RollingWindow(5)
+        stream = None
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            # prev: 직전 확정 봉의 (종가, 종가×거래량 누적합, 거래량 누적합)
+            prev_close, pv_sum, volume_sum = prev if prev is not None else (np.nan, 0.0, 0.0)
+            values = (close, pv_sum + close * volume, volume_sum + volume)
+            for window, value in ((volume_window, volume), (returns_window, close / prev_close - 1)):
+                if replace_last:
+                    window.replace_last(value)
+                else:
+                    window.append(value)
+            bins, volume_profile = profile.update(high, low, close, volume, replace_last)
+            current_bin = profile.bin_index(close)
+            if stream.count <= window_size or volume_profile is None or current_bin < 0:
+                return values, None
+            mean_volume = np.mean(volume_profile)
+            volume_ratio = volume_profile[current_bin] / mean_volume if mean_volume > 0 else 0
+            vwap = values[1] / values[2]
+            price_momentum = returns_window.mean()
+            active = (volume > volume_window.mean() * 0.8 and volume_ratio > 0.8
+                      and abs(close - vwap) / vwap > 0.001)
+            return values, self.signal_from_conditions(active and close < vwap and price_momentum < 0,
+                                                       active and close > vwap and price_momentum > 0)
+        stream = SignalStream(step)
+        return stream
+
+@StrategyFactory.register('머신러닝')
 class MLStrategy(BaseStrategy):
     """머신러닝 전략"""
     def generate_signal(self, df, prediction_period=5, training_period=100):
@@ -198,6 +452,7 @@ class MLStrategy(BaseStrategy):
             print(f"머신러닝 신호 생성 오류: {str(e)}")
             return None
 
+@StrategyFactory.register('이동평균선 교차')
 class MovingAverageStrategy(BaseStrategy):
     """이동평균선 교차 전략"""
     def generate_signal(self, df, short_period=5, long_period=20):
@@ -209,19 +464,69 @@ class MovingAverageStrategy(BaseStrategy):
             return 'sell'
         return None
 
+    def generate_signals(self, df, short_period=5, long_period=20):
+        short_ma = df['close'].rolling(window=short_period).mean()
+        long_ma = df['close'].rolling(window=long_period).mean()
+        prev_short, prev_long = short_ma.shift(1), long_ma.shift(1)
+        buy = (short_ma > long_ma) & (prev_short <= prev_long)
+        sell = (short_ma < long_ma) & (prev_short >= prev_long)
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, short_period=5, long_period=20):
+        short_window, long_window = RollingWindow(short_period), RollingWindow(long_period)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            for window in (short_window, long_window):
+                if replace_last:
+                    window.replace_last(close)
+                else:
+                    window.append(close)
+            short_ma, long_ma = short_window.mean(), long_window.mean()
+            if prev is None:
+                return (short_ma, long_ma), None
+            prev_short, prev_long = prev
+            buy = short_ma > long_ma and prev_short <= prev_long
+            sell = short_ma < long_ma and prev_short >= prev_long
+            return (short_ma, long_ma), self.signal_from_conditions(buy, sell)
+        return SignalStream(step)
+
+@StrategyFactory.register('스토캐스틱')
 class StochasticStrategy(BaseStrategy):
     """스토캐스틱 전략"""
-    def generate_signal(self, df, period=14, k_period=3, d_period=3, overbought=80, oversold=20):
-        low_min = df['low'].rolling(window=period).min()
-        high_max = df['high'].rolling(window=period).max()
-        k = 100 * ((df['close'] - low_min) / (high_max - low_min))
+    def calculate_stochastic(self, df, period=14, d_period=3):
+        """%K/%D 계산 (단조 덱과 같은 O(n) 이동 최소/최대 사용)"""
+        low_min = rolling_min(df['low'].to_numpy(dtype=float), period)
+        high_max = rolling_max(df['high'].to_numpy(dtype=float), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = 100 * ((df['close'].to_numpy(dtype=float) - low_min) / (high_max - low_min))
+        k = pd.Series(k, index=df.index)
         d = k.rolling(window=d_period).mean()
+        return k, d
+
+    def generate_signal(self, df, period=14, k_period=3, d_period=3, overbought=80, oversold=20):
+        # 마지막 %D에 필요한 봉만 사용 (전체 구간 재계산 방지)
+        k, d = self.calculate_stochastic(df.tail(period + d_period - 1), period, d_period)
         if k.iloc[-1] < oversold and d.iloc[-1] < oversold:
             return 'buy'
         elif k.iloc[-1] > overbought and d.iloc[-1] > overbought:
             return 'sell'
         return None
 
+    def generate_signals(self, df, period=14, k_period=3, d_period=3, overbought=80, oversold=20):
+        k, d = self.calculate_stochastic(df, period, d_period)
+        buy = (k < oversold) & (d < oversold)
+        sell = (k > overbought) & (d > overbought)
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, period=14, k_period=3, d_period=3, overbought=80, oversold=20):
+        stochastic = StreamingStochastic(period, d_period)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            k, d = stochastic.update(high, low, close, replace_last)
+            return None, self.signal_from_conditions(k < oversold and d < oversold, k > overbought and d > overbought)
+        return SignalStream(step)
+
+@StrategyFactory.register('BB+RSI')
 class BBRSIStrategy(BaseStrategy):
     """볼린저 밴드와 RSI 복합 전략"""
     def generate_signal(self, df, bb_period=20, bb_std=2, rsi_period=14, rsi_high=70, rsi_low=30):
@@ -248,6 +553,26 @@ class BBRSIStrategy(BaseStrategy):
             traceback.print_exc()
             return None
 
+    def generate_signals(self, df, bb_period=20, bb_std=2, rsi_period=14, rsi_high=70, rsi_low=30):
+        close = df['close']
+        upper, middle, lower = self.calculate_bollinger_bands(close, bb_period, bb_std)
+        rsi = self.calculate_rsi(close, rsi_period)
+        buy = (close < lower) & (rsi < rsi_low)
+        sell = (close > upper) & (rsi > rsi_high)
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, bb_period=20, bb_std=2, rsi_period=14, rsi_high=70, rsi_low=30):
+        bands = StreamingBollingerBands(bb_period, bb_std)
+        rsi = StreamingRSI(rsi_period)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            upper, middle, lower = bands.update(close, replace_last)
+            value = rsi.update(close, replace_last)
+            return None, self.signal_from_conditions(close < lower and value < rsi_low,
+                                                     close > upper and value > rsi_high)
+        return SignalStream(step)
+
+@StrategyFactory.register('MACD+EMA')
 class MACDEMAStrategy(BaseStrategy):
     """MACD와 EMA 복합 전략"""
     def calculate_ema(self, prices, period):
@@ -283,23 +608,39 @@ class MACDEMAStrategy(BaseStrategy):
             traceback.print_exc()
             return None
 
-class StrategyFactory:
-    """전략 팩토리 클래스"""
-    @staticmethod
-    def create_strategy(strategy_name):
-        strategies = {
-            'RSI': RSIStrategy(),
-            '볼린저밴드': BollingerBandsStrategy(),
-            'MACD': MACDStrategy(),
-            '이동평균선 교차': MovingAverageStrategy(),
-            '스토캐스틱': StochasticStrategy(),
-            'ATR 기반 변동성 돌파': ATRStrategy(),
-            '거래량 프로파일': VolumeProfileStrategy(),
-            '머신러닝': MLStrategy(),
-            'BB+RSI': BBRSIStrategy(),
-            'MACD+EMA': MACDEMAStrategy()
-        }
-        return strategies.get(strategy_name)
+    def generate_signals(self, df, macd_fast=12, macd_slow=26, macd_signal=9, ema_period=20):
+        close = df['close']
+        macd_line, signal_line = self.calculate_macd(close, macd_fast, macd_slow, macd_signal)
+        ema = self.calculate_ema(close, ema_period)
+        prev_macd, prev_signal = macd_line.shift(1), signal_line.shift(1)
+        macd_cross_up = (prev_macd <= prev_signal) & (macd_line > signal_line)
+        macd_cross_down = (prev_macd >= prev_signal) & (macd_line < signal_line)
+        buy = macd_cross_up & (close > ema)
+        sell = macd_cross_down & (close < ema)
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, macd_fast=12, macd_slow=26, macd_signal=9, ema_period=20):
+        macd_state = StreamingMACD(macd_fast, macd_slow, macd_signal)
+        ema_state = StreamingEMA(ema_period)
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            macd, signal = macd_state.update(close, replace_last)
+            ema = ema_state.update(close, replace_last)
+            if prev is None:
+                return (macd, signal), None
+            prev_macd, prev_signal = prev
+            buy = prev_macd <= prev_signal and macd > signal and close > ema
+            sell = prev_macd >= prev_signal and macd < signal and close < ema
+            return (macd, signal), self.signal_from_conditions(buy, sell)
+        return SignalStream(step)
+
+class BacktestStopped(Exception):
+    """중간 보고 콜백이 백테스트 중단을 요청할 때 발생 (Optuna 가지치기 등)"""
+    def __init__(self, step, value):
+        super().__init__(f"step {step}: {value}")
+        self.step = step
+        self.value = value
+
 
 class BacktestEngine:
     """백테스팅 엔진 클래스"""
@@ -341,11 +682,13 @@ class BacktestEngine:
         capital = initial_capital
         position = 0
         last_trade_idx = 0
+        dates = list(df.index)
+        closes = df['close'].to_numpy()
         for i in range(len(df)):
             # position/capital 업데이트 (간단화: 마지막 매수/매도 이후로 position 유지)
             if last_trade_idx < len(trades):
                 trade = trades[last_trade_idx]
-                if 'date' in trade and df.index[i] >= trade['date']:
+                if 'date' in trade and dates[i] >= trade['date']:
                     if trade['type'] == 'buy':
                         position = initial_capital / trade['price']
                         capital = 0
@@ -353,8 +696,8 @@ class BacktestEngine:
                         capital = position * trade['price']
                         position = 0
                     last_trade_idx += 1
-            balance = capital + position * df['close'].iloc[i]
-            daily_balance.append({'date': df.index[i], 'balance': balance})
+            balance = capital + position * closes[i]
+            daily_balance.append({'date': dates[i], 'balance': balance})
         
         # 수익 거래와 손실 거래 분석
         winning_trades_list = [t for t in trades if t['profit'] > 0]
@@ -397,8 +740,64 @@ class BacktestEngine:
             'max_consecutive_losses': max_consecutive_losses
         }
         
-    def backtest_strategy(self, strategy_name, params, df, interval, initial_capital):
-        """전략별 백테스팅 실행"""
+    def close_trade(self, entry_time, entry_price, exit_time, exit_price, initial_capital):
+        """진입/청산 정보로 거래 기록 생성 (매수/매도 수수료 차감)"""
+        profit = (exit_price - entry_price) * (initial_capital / entry_price)
+        profit -= self.calculate_fee(initial_capital / entry_price, entry_price)  # 매수 수수료
+        profit -= self.calculate_fee(initial_capital / entry_price, exit_price)   # 매도 수수료
+        return {
+            'date': entry_time,  # 진입 시간
+            'type': 'buy',       # 거래 유형
+            'price': entry_price,  # 진입 가격
+            'exit_date': exit_time,  # 퇴출 시간
+            'exit_price': exit_price,  # 퇴출 가격
+            'profit': profit,    # 수익금
+            'profit_rate': (profit / (initial_capital / entry_price * entry_price)) * 100  # 수익률
+        }
+
+    def simulate_trades(self, df, signals, initial_capital, start=30, progress_callback=None, checkpoints=10):
+        """신호 배열을 따라가며 거래 목록 생성 (start 봉부터)
+
+        progress_callback(step, trades)를 주면 구간을 checkpoints개로 나눈 지점마다 호출한다.
+        이때 trades에는 보유 중인 포지션을 해당 봉 종가로 청산했다고 가정한 거래가 포함된다.
+        """
+        trades = []
+        position = None
+        entry_price = 0
+        entry_time = None
+        close = df['close'].to_numpy()
+        index = df.index
+        total = len(df) - start
+        step_size = max(1, -(-total // checkpoints)) if progress_callback else 0
+        for i in range(start, len(df)):
+            signal = signals[i]
+            if signal == 'buy' and position is None:
+                position = 'long'
+                entry_price = close[i]
+                entry_time = index[i]
+            elif signal == 'sell' and position == 'long':
+                trades.append(self.close_trade(entry_time, entry_price, index[i], close[i], initial_capital))
+                position = None
+            if step_size and (i - start + 1) % step_size == 0 and i < len(df) - 1:
+                provisional = trades
+                if position == 'long':
+                    provisional = trades + [self.close_trade(entry_time, entry_price, index[i], close[i], initial_capital)]
+                progress_callback((i - start + 1) // step_size, provisional)
+        # 루프 끝난 뒤 포지션이 남아있으면 강제 청산
+        if position == 'long':
+            trade = self.close_trade(entry_time, entry_price, index[-1], close[-1], initial_capital)
+            trades.append(trade)
+            print(f"[Backtest] 강제 청산: entry={entry_price}, exit={trade['exit_price']}, profit={trade['profit']}")
+        return trades
+
+    def backtest_strategy(self, strategy_name, params, df, interval, initial_capital, vectorized=True,
+                          progress_callback=None):
+        """전략별 백테스팅 실행
+
+        vectorized=True 이면 generate_signals로 전체 신호를 한 번에 계산하고,
+        False 이면 기존처럼 봉마다 generate_signal을 호출한다. 두 방식의 거래 결과는 동일하다.
+        progress_callback은 simulate_trades에 전달되며, BacktestStopped를 던지면 백테스트를 중단한다.
+        """
         try:
             if df is None or len(df) < 30:
                 print("[Backtest] 데이터 없음 또는 30개 미만")
@@ -408,58 +807,26 @@ class BacktestEngine:
             if strategy is None:
                 print("[Backtest] 전략 생성 실패")
                 return None
+            # 신호 계산
+            if vectorized:
+                signals = strategy.generate_signals(df, **params)
+            else:
+                signals = [None] * len(df)
+                for i in range(30, len(df)):
+                    current_data = df.iloc[:i+1]
+                    signals[i] = strategy.generate_signal(current_data, **params)
             # 백테스팅 실행
-            trades = []
-            position = None
-            entry_price = 0
-            entry_time = None
-            for i in range(30, len(df)):
-                current_data = df.iloc[:i+1]
-                # print(f"[Backtest] {strategy_name} {i}/{len(df)} current_data index: {current_data.index[-2:]}")
-                signal = strategy.generate_signal(current_data, **params)
-                # print(f"[Backtest] {strategy_name} {i} signal: {signal}")
-                if signal == 'buy' and position is None:
-                    position = 'long'
-                    entry_price = df['close'].iloc[i]
-                    entry_time = df.index[i]
-                elif signal == 'sell' and position == 'long':
-                    exit_price = df['close'].iloc[i]
-                    profit = (exit_price - entry_price) * (initial_capital / entry_price)
-                    profit -= self.calculate_fee(initial_capital / entry_price, entry_price)  # 매수 수수료
-                    profit -= self.calculate_fee(initial_capital / entry_price, exit_price)   # 매도 수수료
-                    trades.append({
-                        'date': entry_time,  # 진입 시간
-                        'type': 'buy',       # 거래 유형
-                        'price': entry_price,  # 진입 가격
-                        'exit_date': df.index[i],  # 퇴출 시간
-                        'exit_price': exit_price,  # 퇴출 가격
-                        'profit': profit,    # 수익금
-                        'profit_rate': (profit / (initial_capital / entry_price * entry_price)) * 100  # 수익률
-                    })
-                    position = None
-            # 루프 끝난 뒤 포지션이 남아있으면 강제 청산
-            if position == 'long':
-                exit_price = df['close'].iloc[-1]
-                profit = (exit_price - entry_price) * (initial_capital / entry_price)
-                profit -= self.calculate_fee(initial_capital / entry_price, entry_price)
-                profit -= self.calculate_fee(initial_capital / entry_price, exit_price)
-                trades.append({
-                    'date': entry_time,
-                    'type': 'buy',
-                    'price': entry_price,
-                    'exit_date': df.index[-1],
-                    'exit_price': exit_price,
-                    'profit': profit,
-                    'profit_rate': (profit / (initial_capital / entry_price * entry_price)) * 100
-                })
-                print(f"[Backtest] 강제 청산: entry={entry_price}, exit={exit_price}, profit={profit}")
+            trades = self.simulate_trades(df, signals, initial_capital, progress_callback=progress_callback)
             print(f"[Backtest] 총 거래 수: {len(trades)}")
             return self.calculate_backtest_results(df, trades, initial_capital)
+        except BacktestStopped:
+            raise
         except Exception as e:
             print(f"백테스팅 오류: {str(e)}")
             traceback.print_exc()
             return None
      
+@StrategyFactory.register('ATR 기반 변동성 돌파')
 class ATRStrategy(BaseStrategy):
     def __init__(self):
         super().__init__()
@@ -537,116 +904,456 @@ class ATRStrategy(BaseStrategy):
             print(f"ATR 신호 생성 오류: {str(e)}")
             return None
 
+    def generate_signals(self, data, period=14, multiplier=2.0, trend_period=20, stop_loss_multiplier=1.5, position_size_multiplier=1.0):
+        """전체 구간 ATR 돌파 신호 배열 생성 (스탑로스/포지션 사이즈는 generate_signal에서만 갱신)"""
+        high = data['high']
+        low = data['low']
+        close = data['close']
+        prev_close = close.shift(1)
+
+        tr1 = high - low
+        tr2 = abs(high - prev_close)
+        tr3 = abs(low - prev_close)
+        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        atr = tr.rolling(window=period).mean()
+        ma = close.rolling(window=trend_period).mean()
+
+        # 직전 봉 기준 상단/하단 밴드
+        upper_band = prev_close + (atr.shift(1) * multiplier)
+        lower_band = prev_close - (atr.shift(1) * multiplier)
+
+        warmup = np.arange(len(data)) < max(period, trend_period) - 1
+        buy = ((close > ma) & (high > upper_band)).to_numpy() & ~warmup
+        sell = ((close < ma) & (low < lower_band)).to_numpy() & ~warmup
+        return self.signals_from_conditions(buy, sell)
+
+    def create_signal_stream(self, period=14, multiplier=2.0, trend_period=20, stop_loss_multiplier=1.5,
+                             position_size_multiplier=1.0):
+        """ATR 돌파 신호 증분 계산 (스탑로스/포지션 사이즈는 generate_signals처럼 갱신하지 않음)"""
+        atr_state = StreamingATR(period)
+        ma_window = RollingWindow(trend_period)
+        stream = None
+
+        def step(open_, high, low, close, volume, replace_last, prev):
+            atr = atr_state.update(high, low, close, replace_last)
+            if replace_last:
+                ma_window.replace_last(close)
+            else:
+                ma_window.append(close)
+            ma = ma_window.mean()
+            if prev is None or stream.count < max(period, trend_period):
+                return (close, atr), None
+            prev_close, prev_atr = prev
+            buy = close > ma and high > prev_close + prev_atr * multiplier
+            sell = close < ma and low < prev_close - prev_atr * multiplier
+            return (close, atr), self.signal_from_conditions(buy, sell)
+        stream = SignalStream(step)
+        return stream
+
+def score_trades(trades, initial_capital=1000000):
+    """거래 목록으로 중간 목적함수 값 계산 (수익률 × 승률, 최종 값과 같은 식)"""
+    if not trades:
+        return 0.0
+    profit_rate = sum(t['profit'] for t in trades) / initial_capital * 100
+    win_rate = len([t for t in trades if t['profit'] > 0]) / len(trades) * 100
+    return profit_rate * (win_rate / 100)
+
+
+def evaluate_params(strategy_name, params, df, fee_rate, report=None):
+    """파라미터 한 조합을 백테스트해 Optuna 목적함수 값 반환 (워커 프로세스에서도 사용)
+
+    report(step, value)를 주면 백테스트 구간의 10% 지점마다 중간 값을 전달하고,
+    True를 반환하면 BacktestStopped로 백테스트를 중단한다.
+    """
+    initial_capital = 1000000  # 초기 자본금 100만원
+    progress_callback = None
+    if report is not None:
+        def progress_callback(step, trades):
+            value = score_trades(trades, initial_capital)
+            if report(step, value):
+                raise BacktestStopped(step, value)
+    backtest_engine = BacktestEngine(fee_rate=fee_rate)
+    result = backtest_engine.backtest_strategy(
+        strategy_name,
+        params,
+        df,
+        '1분봉',
+        initial_capital,
+        progress_callback=progress_callback
+    )
+    if result is None:
+        print(f"[Optuna][{strategy_name}] result is None for params: {params}")
+        return 0.0
+    if result.get('total_trades', 0) == 0:
+        print(f"[Optuna][{strategy_name}] 거래 없음. params: {params}")
+        return 0.0
+    print(f"[Optuna][{strategy_name}] params: {params}, profit_rate: {result['profit_rate']}, win_rate: {result['win_rate']}, total_trades: {result['total_trades']}")
+    return result['profit_rate'] * (result['win_rate'] / 100)
+
+
+# --- 병렬 최적화 워커 프로세스 상태 ---
+# OHLCV는 캔들 캐시(.npy) 형식으로 공유하고, 워커는 초기화 시 메모리 맵으로 열어 재사용한다.
+_worker_df = None
+SHARED_FRAME_NAME = 'optuna_frame'
+
+
+def _share_frame(df, directory):
+    """DataFrame을 워커들이 메모리 맵으로 열 수 있도록 캔들 캐시 형식으로 저장, 워커 초기화 인자 반환"""
+    candle_cache.write_cache(SHARED_FRAME_NAME, df, directory)
+    return directory, SHARED_FRAME_NAME, None, None
+
+
+def _init_optuna_worker(root, table_name, start=None, end=None):
+    """워커 프로세스 초기화: 캔들 캐시의 [start, end] 구간을 메모리 맵으로 열기 (복사 없음)"""
+    global _worker_df
+    _worker_df = candle_cache.load_frame(table_name, start, end, root)
+
+
+def threshold_report(prune_thresholds, prune_on_best, intermediates):
+    """단계별 기준으로 가지치기를 판단하는 report(step, value) 함수 생성 (보고한 값은 intermediates에 기록)
+
+    prune_on_best=True면 지금까지의 최고 중간 값을 기준과 비교한다 (MedianPruner 방식),
+    False면 이번 단계의 값을 비교한다 (SuccessiveHalvingPruner 방식).
+    """
+    def report(step, value):
+        intermediates.append((step, value))
+        threshold = prune_thresholds.get(step) if prune_thresholds else None
+        if prune_on_best:
+            value = max(v for _, v in intermediates)
+        return threshold is not None and value < threshold
+    return report
+
+
+def _run_optuna_trial(strategy_name, params, fee_rate, prune_thresholds=None, prune_on_best=False):
+    """워커에서 시도 하나 평가. 중간 값이 단계별 기준(OptunaOptimizer.prune_thresholds)보다 낮으면 조기 중단
+
+    반환: (최종 값, [(step, 중간 값)], 중단 여부)
+    """
+    intermediates = []
+    report = threshold_report(prune_thresholds, prune_on_best, intermediates)
+    try:
+        return evaluate_params(strategy_name, params, _worker_df, fee_rate, report), intermediates, False
+    except BacktestStopped as e:
+        print(f"[Optuna][{strategy_name}] 가지치기 (step {e.step}): params: {params}")
+        return e.value, intermediates, True
+
+
+OPTUNA_STORAGE = 'sqlite:///optuna_studies.db'
+
+
+def make_study_name(strategy_name, coin, interval, start_date, end_date):
+    """전략/코인/봉단위/기간으로 스터디 이름 생성 (같은 조건이면 같은 스터디를 이어서 사용)"""
+    return f"{strategy_name}|{coin}|{interval}|{start_date}~{end_date}"
+
+
+def find_warm_start_params(storage, study_name, top_k=5):
+    """같은 전략/코인/봉단위의 다른 기간 스터디에서 상위 top_k개 파라미터 수집"""
+    import optuna
+    prefix = study_name.rsplit('|', 1)[0] + '|'
+    candidates = []
+    for name in optuna.study.get_all_study_names(storage=storage):
+        if name == study_name or not name.startswith(prefix):
+            continue
+        prior = optuna.load_study(study_name=name, storage=storage)
+        candidates.extend(t for t in prior.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+                          if t.value is not None)
+    candidates.sort(key=lambda t: t.value, reverse=True)
+    params_list = []
+    for trial in candidates:
+        if trial.params not in params_list:
+            params_list.append(trial.params)
+        if len(params_list) >= top_k:
+            break
+    return params_list
+
+
 class OptunaOptimizer:
-    """Optuna를 사용한 전략 최적화 클래스"""
-    def __init__(self, strategy, strategy_name, df, n_trials=100, fee_rate=0.0005):
+    """Optuna를 사용한 전략 최적화 클래스
+
+    storage와 study_name을 주면 스터디를 저장하고, 같은 이름의 스터디가 있으면 이어서 최적화한다.
+    처음 만드는 스터디는 같은 전략/코인/봉단위의 다른 기간 스터디의 상위 파라미터로 먼저 시도한다.
+    pruner('median', 'halving', None)를 사용하면 백테스트 10% 지점마다 중간 값을 보고해 가망 없는 시도를 조기 중단한다.
+    중간 값은 전체 구간 신호를 계산한 뒤 거래 시뮬레이션 도중에 보고하므로, 가지치기로 아끼는 것은 남은 시뮬레이션
+    루프와 결과 집계다. 대부분의 전략은 시도 시간의 80~95%가 시뮬레이션이라 효과가 크지만, 신호 계산이 무거운
+    거래량 프로파일 전략은 30% 정도만 줄어든다.
+    trial_callback/stop_event로 GUI 스레드 밖에서 진행 상황을 받고 최적화를 취소할 수 있다.
+    abort_event까지 설정하면 병렬 모드에서 실행 중인 시도도 기다리지 않고 바로 돌아온다 (창 닫기용).
+    cache_key=(테이블명, 시작, 종료)를 주면 병렬 워커가 디스크 캔들 캐시를 메모리 맵으로 직접 연다.
+    """
+    HALVING_MIN_RESOURCE = 1  # SuccessiveHalvingPruner 첫 rung 단계
+    HALVING_REDUCTION_FACTOR = 4  # rung마다 상위 1/4만 통과
+    POLL_SECONDS = 0.5  # 병렬 모드에서 취소 여부를 확인하는 간격
+
+    def __init__(self, strategy, strategy_name, df, n_trials=100, fee_rate=0.0005, n_jobs=1,
+                 storage=None, study_name=None, warm_start_top_k=5, pruner='median',
+                 n_startup_trials=5, n_warmup_steps=2, trial_callback=None, stop_event=None, abort_event=None,
+                 cache_key=None):
         self.strategy = strategy
         self.strategy_name = strategy_name
+        self.cache_key = cache_key  # (테이블명, 시작, 종료): 캔들 캐시에서 데이터를 여는 경우
+        if df is None and cache_key is not None:
+            df = candle_cache.load_frame(*cache_key)
         self.df = df
         self.n_trials = n_trials
         self.fee_rate = fee_rate
+        self.n_jobs = max(1, int(n_jobs or 1))
+        self.storage = storage
+        self.study_name = study_name
+        self.warm_start_top_k = warm_start_top_k
+        self.pruner = pruner
+        self.n_startup_trials = n_startup_trials
+        self.n_warmup_steps = n_warmup_steps
+        self.trial_callback = trial_callback  # trial_callback(study, frozen_trial): 시도 종료마다 호출
+        self.stop_event = stop_event  # threading.Event, 설정되면 새 시도를 시작하지 않음
+        self.abort_event = abort_event  # threading.Event, 설정되면 실행 중인 병렬 시도도 기다리지 않음
+        self.prior_trials = 0
+        self.warm_started = 0
         self.best_params = None
         self.best_value = None
         
+    def suggest_params(self, trial):
+        """전략별 탐색 공간에서 파라미터 추천 (지원하지 않는 전략이면 None)"""
+        # 전략별 파라미터 정의
+        if isinstance(self.strategy, RSIStrategy):
+            params = {
+                'period': trial.suggest_int('period', 5, 30),
+                'overbought': trial.suggest_int('overbought', 60, 90),
+                'oversold': trial.suggest_int('oversold', 10, 40)
+            }
+        elif isinstance(self.strategy, BollingerBandsStrategy):
+            params = {
+                'period': trial.suggest_int('period', 10, 50),
+                'std': trial.suggest_float('std', 1.0, 3.0)
+            }
+        elif isinstance(self.strategy, MACDStrategy):
+            fast_period = trial.suggest_int('fast_period', 8, 20)
+            slow_period = trial.suggest_int('slow_period', fast_period + 4, 50)
+            params = {
+                'fast_period': fast_period,
+                'slow_period': slow_period,
+                'signal_period': trial.suggest_int('signal_period', 9, 20)
+            }
+        elif isinstance(self.strategy, MovingAverageStrategy):
+            params = {
+                'short_period': trial.suggest_int('short_period', 5, 20),
+                'long_period': trial.suggest_int('long_period', 20, 50)
+            }
+        elif isinstance(self.strategy, StochasticStrategy):
+            params = {
+                'period': trial.suggest_int('period', 5, 30),
+                'k_period': trial.suggest_int('k_period', 1, 5),
+                'd_period': trial.suggest_int('d_period', 1, 5),
+                'overbought': trial.suggest_int('overbought', 70, 90),
+                'oversold': trial.suggest_int('oversold', 10, 30)
+            }
+        elif isinstance(self.strategy, ATRStrategy):
+            params = {
+                'period': trial.suggest_int('period', 5, 30),
+                'multiplier': trial.suggest_float('multiplier', 1.0, 3.0),
+                'trend_period': trial.suggest_int('trend_period', 10, 50),
+                'stop_loss_multiplier': trial.suggest_float('stop_loss_multiplier', 1.0, 3.0),
+                'position_size_multiplier': trial.suggest_float('position_size_multiplier', 0.5, 2.0)
+            }
+        elif isinstance(self.strategy, VolumeProfileStrategy):
+            params = {
+                'num_bins': trial.suggest_int('num_bins', 5, 30),
+                'volume_threshold': trial.suggest_int('volume_threshold', 100, 5000),
+                'volume_zscore_threshold': trial.suggest_float('volume_zscore_threshold', 1.5, 3.0),
+                'window_size': trial.suggest_int('window_size', 10, 50)
+            }
+        elif isinstance(self.strategy, BBRSIStrategy):
+            params = {
+                'bb_period': trial.suggest_int('bb_period', 10, 50),
+                'bb_std': trial.suggest_float('bb_std', 1.0, 3.0),
+                'rsi_period': trial.suggest_int('rsi_period', 5, 30),
+                'rsi_high': trial.suggest_int('rsi_high', 60, 90),
+                'rsi_low': trial.suggest_int('rsi_low', 10, 40)
+            }
+        elif isinstance(self.strategy, MACDEMAStrategy):
+            fast_period = trial.suggest_int('macd_fast', 8, 20)
+            slow_period = trial.suggest_int('macd_slow', fast_period + 4, 50)
+            params = {
+                'macd_fast': fast_period,
+                'macd_slow': slow_period,
+                'macd_signal': trial.suggest_int('macd_signal', 5, 20),
+                'ema_period': trial.suggest_int('ema_period', 10, 50)
+            }
+        else:
+            return None
+        return params
+
     def objective(self, trial):
         """Optuna 최적화 목적 함수"""
         try:
-            # 전략별 파라미터 정의
-            if isinstance(self.strategy, RSIStrategy):
-                params = {
-                    'period': trial.suggest_int('period', 5, 30),
-                    'overbought': trial.suggest_int('overbought', 60, 90),
-                    'oversold': trial.suggest_int('oversold', 10, 40)
-                }
-            elif isinstance(self.strategy, BollingerBandsStrategy):
-                params = {
-                    'period': trial.suggest_int('period', 10, 50),
-                    'std': trial.suggest_float('std', 1.0, 3.0)
-                }
-            elif isinstance(self.strategy, MACDStrategy):
-                fast_period = trial.suggest_int('fast_period', 8, 20)
-                slow_period = trial.suggest_int('slow_period', fast_period + 4, 50)
-                params = {
-                    'fast_period': fast_period,
-                    'slow_period': slow_period,
-                    'signal_period': trial.suggest_int('signal_period', 9, 20)
-                }
-            elif isinstance(self.strategy, MovingAverageStrategy):
-                params = {
-                    'short_period': trial.suggest_int('short_period', 5, 20),
-                    'long_period': trial.suggest_int('long_period', 20, 50)
-                }
-            elif isinstance(self.strategy, StochasticStrategy):
-                params = {
-                    'period': trial.suggest_int('period', 5, 30),
-                    'k_period': trial.suggest_int('k_period', 1, 5),
-                    'd_period': trial.suggest_int('d_period', 1, 5),
-                    'overbought': trial.suggest_int('overbought', 70, 90),
-                    'oversold': trial.suggest_int('oversold', 10, 30)
-                }
-            elif isinstance(self.strategy, ATRStrategy):
-                params = {
-                    'period': trial.suggest_int('period', 5, 30),
-                    'multiplier': trial.suggest_float('multiplier', 1.0, 3.0),
-                    'trend_period': trial.suggest_int('trend_period', 10, 50),
-                    'stop_loss_multiplier': trial.suggest_float('stop_loss_multiplier', 1.0, 3.0),
-                    'position_size_multiplier': trial.suggest_float('position_size_multiplier', 0.5, 2.0)
-                }
-            elif isinstance(self.strategy, VolumeProfileStrategy):
-                params = {
-                    'num_bins': trial.suggest_int('num_bins', 5, 30),
-                    'volume_threshold': trial.suggest_int('volume_threshold', 100, 5000),
-                    'volume_zscore_threshold': trial.suggest_float('volume_zscore_threshold', 1.5, 3.0),
-                    'window_size': trial.suggest_int('window_size', 10, 50)
-                }
-            elif isinstance(self.strategy, BBRSIStrategy):
-                params = {
-                    'bb_period': trial.suggest_int('bb_period', 10, 50),
-                    'bb_std': trial.suggest_float('bb_std', 1.0, 3.0),
-                    'rsi_period': trial.suggest_int('rsi_period', 5, 30),
-                    'rsi_high': trial.suggest_int('rsi_high', 60, 90),
-                    'rsi_low': trial.suggest_int('rsi_low', 10, 40)
-                }
-            elif isinstance(self.strategy, MACDEMAStrategy):
-                fast_period = trial.suggest_int('macd_fast', 8, 20)
-                slow_period = trial.suggest_int('macd_slow', fast_period + 4, 50)
-                params = {
-                    'macd_fast': fast_period,
-                    'macd_slow': slow_period,
-                    'macd_signal': trial.suggest_int('macd_signal', 5, 20),
-                    'ema_period': trial.suggest_int('ema_period', 10, 50)
-                }
-            else:
+            params = self.suggest_params(trial)
+            if params is None:
                 print('지원하지 않는 전략입니다.')
                 return 0.0
-            # 백테스팅 실행
-            backtest_engine = BacktestEngine(fee_rate=self.fee_rate)
-            result = backtest_engine.backtest_strategy(
-                self.strategy_name,
-                params,
-                self.df,
-                '1분봉',
-                1000000  # 초기 자본금 100만원
-            )
-            if result is None:
-                print(f"[Optuna][{self.strategy_name}] result is None for params: {params}")
-                return 0.0
-            if result.get('total_trades', 0) == 0:
-                print(f"[Optuna][{self.strategy_name}] 거래 없음. params: {params}")
-                return 0.0
-            print(f"[Optuna][{self.strategy_name}] params: {params}, profit_rate: {result['profit_rate']}, win_rate: {result['win_rate']}, total_trades: {result['total_trades']}")
-            return result['profit_rate'] * (result['win_rate'] / 100)
+            # 백테스팅 실행 (중간 값 보고 및 가지치기)
+            def report(step, value):
+                trial.report(value, step)
+                return trial.should_prune()
+            return evaluate_params(self.strategy_name, params, self.df, self.fee_rate,
+                                   report if self.pruner else None)
+        except BacktestStopped as e:
+            import optuna
+            print(f"[Optuna][{self.strategy_name}] 가지치기 (step {e.step}): params: {params}")
+            raise optuna.TrialPruned()
         except Exception as e:
             print(f"최적화 오류: {str(e)}")
             return 0.0
+
+    def cancelled(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def aborted(self):
+        return self.abort_event is not None and self.abort_event.is_set()
+
+    def on_trial_finished(self, study, trial):
+        """시도 종료 콜백 (study.optimize의 callbacks 형식, 병렬 모드에서는 tell 직후 직접 호출)"""
+        if self.trial_callback is not None:
+            self.trial_callback(study, trial)
+
+    def stop_if_cancelled(self, study, trial):
+        """취소되면 study.optimize 중단 (study.stop()은 optimize 안의 콜백에서만 호출할 수 있다)"""
+        if self.cancelled():
+            study.stop()
+
+    def create_pruner(self):
+        import optuna
+        
+        if self.pruner == 'median':
+            return optuna.pruners.MedianPruner(n_startup_trials=self.n_startup_trials,
+                                               n_warmup_steps=self.n_warmup_steps)
+        if self.pruner == 'halving':
+            return optuna.pruners.SuccessiveHalvingPruner(min_resource=self.HALVING_MIN_RESOURCE,
+                                                          reduction_factor=self.HALVING_REDUCTION_FACTOR)
+        return optuna.pruners.NopPruner()
+
+    def prune_thresholds(self, study):
+        """병렬 워커용 가지치기 기준 {단계: 중간 값이 이보다 낮으면 중단}
+
+        워커는 Trial 객체에 접근할 수 없으므로, 시도를 보낼 때의 스냅샷으로 선택한 pruner와 같은 판단을 한다.
+        - 'median': warmup 이후 단계마다 완료된 시도들의 중간 값 중앙값, 이번 시도의 최고 중간 값과 비교 (MedianPruner)
+        - 'halving': rung 단계(1, 4, 16, ...)마다 그 단계까지 간 시도들 중 상위 1/4 경계 값 (SuccessiveHalvingPruner)
+        """
+        import optuna
+        
+        if not self.pruner:
+            return None
+        if self.pruner == 'halving':
+            trials = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,
+                                                              optuna.trial.TrialState.PRUNED))
+            thresholds = {}
+            step = self.HALVING_MIN_RESOURCE
+            while True:
+                values = sorted((t.intermediate_values[step] for t in trials if step in t.intermediate_values),
+                                reverse=True)
+                if not values:
+                    break
+                # 이번 시도를 포함한 (n+1)개 중 상위 (n+1)//4개(최소 1개) 안에 들어야 다음 rung으로 진행
+                thresholds[step] = values[max((len(values) + 1) // self.HALVING_REDUCTION_FACTOR - 1, 0)]
+                step *= self.HALVING_REDUCTION_FACTOR
+            return thresholds or None
+        completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+        if len(completed) < self.n_startup_trials:
+            return None
+        values_by_step = {}
+        for t in completed:
+            for step, value in t.intermediate_values.items():
+                if step >= self.n_warmup_steps:
+                    values_by_step.setdefault(step, []).append(value)
+        return {step: float(np.median(values)) for step, values in values_by_step.items()}
+
+    def optimize_parallel(self, study):
+        """워커 프로세스 풀에서 시도를 동시에 평가하고 결과를 하나의 study에 기록 (ask/tell)"""
+        import optuna
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+        
+        with tempfile.TemporaryDirectory(prefix='optuna_ohlcv_', ignore_cleanup_errors=True) as tmp_dir:
+            if self.cache_key is not None and candle_cache.has_cache(self.cache_key[0]):
+                # 디스크 캔들 캐시를 워커들이 직접 연다 (임시 파일 복사 없음)
+                initargs = (candle_cache.CACHE_ROOT,) + tuple(self.cache_key)
+            else:
+                initargs = _share_frame(self.df, tmp_dir)
+            executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_optuna_worker,
+                                           initargs=initargs)
+            try:
+                pending = {}
+                asked = 0
+                while asked < self.n_trials or pending:
+                    if self.cancelled():
+                        # 아직 시작하지 않은 시도는 취소하고, 실행 중인 시도만 끝날 때까지 기다린다
+                        # 중단(abort)이면 실행 중인 시도도 실패로 기록하고 바로 빠져나간다
+                        for future in [future for future in pending if future.cancel() or self.aborted()]:
+                            study.tell(pending.pop(future), state=optuna.trial.TrialState.FAIL)
+                        if not pending:
+                            break
+                    # 워커 수만큼 시도를 띄워 둔다
+                    while asked < self.n_trials and len(pending) < self.n_jobs and not self.cancelled():
+                        trial = study.ask()
+                        asked += 1
+                        try:
+                            params = self.suggest_params(trial)
+                        except Exception as e:
+                            print(f"최적화 오류: {str(e)}")
+                            params = None
+                        if params is None:
+                            self.on_trial_finished(study, study.tell(trial, 0.0))
+                            continue
+                        future = executor.submit(_run_optuna_trial, self.strategy_name, params, self.fee_rate,
+                                                 self.prune_thresholds(study), self.pruner == 'median')
+                        pending[future] = trial
+                    if not pending:
+                        continue
+                    # 취소/중단 요청을 확인할 수 있도록 일정 간격으로 깨어난다
+                    done, _ = wait(pending, timeout=self.POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        trial = pending.pop(future)
+                        try:
+                            value, intermediates, pruned = future.result()
+                        except Exception as e:
+                            print(f"최적화 오류: {str(e)}")
+                            value, intermediates, pruned = 0.0, [], False
+                        for step, intermediate in intermediates:
+                            trial.report(intermediate, step)
+                        if pruned:
+                            frozen = study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+                        else:
+                            frozen = study.tell(trial, value)
+                        self.on_trial_finished(study, frozen)
+            finally:
+                # 중단이면 실행 중인 워커를 기다리지 않는다 (남은 시도는 백그라운드에서 끝나고 버려짐)
+                executor.shutdown(wait=not self.aborted(), cancel_futures=True)
+        return study
             
+    def create_study(self):
+        """스터디 생성 또는 저장된 스터디 불러오기 (이어하기/웜스타트)"""
+        import optuna
+        
+        if self.storage is None or self.study_name is None:
+            return optuna.create_study(direction='maximize', pruner=self.create_pruner())
+        study = optuna.create_study(direction='maximize', storage=self.storage, pruner=self.create_pruner(),
+                                    study_name=self.study_name, load_if_exists=True)
+        self.prior_trials = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)))
+        if self.prior_trials == 0 and self.warm_start_top_k > 0:
+            for params in find_warm_start_params(self.storage, self.study_name, self.warm_start_top_k):
+                study.enqueue_trial(params, skip_if_exists=True)
+                self.warm_started += 1
+        print(f"[Optuna] 스터디: {self.study_name}, 이전 시도: {self.prior_trials}회, 웜스타트: {self.warm_started}개")
+        return study
+
     def optimize(self):
         """최적화 실행"""
         try:
             import optuna
             
-            study = optuna.create_study(direction='maximize')
-            study.optimize(self.objective, n_trials=self.n_trials)
+            study = self.create_study()
+            if self.n_jobs > 1:
+                self.optimize_parallel(study)
+            else:
+                study.optimize(self.objective, n_trials=self.n_trials,
+                               callbacks=[self.on_trial_finished, self.stop_if_cancelled])
             
             self.best_params = study.best_params
             self.best_value = study.best_value
@@ -654,9 +1361,10 @@ class OptunaOptimizer:
             return {
                 'best_params': self.best_params,
                 'best_value': self.best_value,
-                'study': study
+                'study': study,
+                'cancelled': self.cancelled()
             }
             
         except Exception as e:
             print(f"최적화 실행 오류: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 루트의 모듈(strategies, indicators, ...)을 그대로 import 한다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_ohlcv():
+    """임의의 1분봉 OHLCV DataFrame 생성 함수 (n봉, 시드 고정)"""
+    def make(n=800, seed=1):
+        rng = np.random.default_rng(seed)
+        close = 50000000 + np.cumsum(rng.normal(0, 30000, n))
+        open_ = close + rng.normal(0, 10000, n)
+        volume = rng.uniform(0.1, 5, n)
+        volume[rng.integers(0, n, n // 20)] *= 10  # 가끔 거래량 급증
+        return pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) + rng.uniform(0, 40000, n),
+            'low': np.minimum(open_, close) - rng.uniform(0, 40000, n),
+            'close': close,
+            'volume': volume
+        }, index=pd.date_range('2024-01-01', periods=n, freq='min'))
+    return make
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import arrow_store
+import ohlcv_store
+
+pytest.importorskip('pyarrow')
+
+TABLE = 'BTC_ohlcv_minute1'
+
+
+@pytest.fixture
+def month_end_candles(make_ohlcv):
+    """1월 말 ~ 2월 초에 걸친 1분봉"""
+    df = make_ohlcv(3000)
+    df.index = pd.date_range('2024-01-30 00:00', periods=len(df), freq='min')
+    return df
+
+
+def test_write_splits_month_partitions(tmp_path, month_end_candles):
+    root = str(tmp_path)
+    assert arrow_store.write_candles(TABLE, month_end_candles, root) == len(month_end_candles)
+    assert arrow_store.list_partitions(TABLE, root) == ['2024-01', '2024-02']
+    jan_ts, jan_values = arrow_store.read_partition(str(tmp_path / TABLE / '2024-01.arrow'))
+    assert len(jan_ts) == 2 * 24 * 60  # 1/30, 1/31
+    assert np.all(np.diff(jan_ts) > 0)
+    assert np.array_equal(jan_values, month_end_candles.iloc[:len(jan_ts)].to_numpy())
+
+
+def test_rewrite_overlapping_rows_replaces_values(tmp_path, month_end_candles):
+    """겹치는 시각을 다시 쓰면 중복 없이 새 값으로 교체되는지"""
+    root = str(tmp_path)
+    arrow_store.write_candles(TABLE, month_end_candles.iloc[:2500], root)
+    update = month_end_candles.iloc[2000:].copy()
+    update['close'] += 1.0
+    arrow_store.write_candles(TABLE, update.iloc[::-1], root)  # 정렬되지 않은 입력도 정렬해서 저장
+
+    loaded = arrow_store.load_candles(TABLE, month_end_candles.index[0], month_end_candles.index[-1], root)
+    expected = month_end_candles.copy()
+    expected.loc[update.index, 'close'] = update['close']
+    assert (loaded.index == expected.index).all()
+    assert np.array_equal(loaded.to_numpy(), expected.to_numpy())
+
+
+def test_load_filters_date_range_across_months(tmp_path, month_end_candles):
+    root = str(tmp_path)
+    arrow_store.write_candles(TABLE, month_end_candles, root)
+    start, end = pd.Timestamp('2024-01-31 23:30'), pd.Timestamp('2024-02-01 00:29')
+    loaded = arrow_store.load_candles(TABLE, start, end, root)
+    expected = month_end_candles.loc[start:end]
+    assert len(loaded) == 60
+    assert (loaded.index == expected.index).all()
+    assert np.array_equal(loaded.to_numpy(), expected.to_numpy())
+    # 한 달 안의 구간과 데이터가 없는 구간
+    assert len(arrow_store.load_candles(TABLE, '2024-02-01 01:00', '2024-02-01 01:09', root)) == 10
+    assert arrow_store.load_candles(TABLE, '2023-12-01', '2023-12-31', root) is None
+
+
+def test_export_from_sqlite_matches_store(tmp_path, month_end_candles):
+    db_path = str(tmp_path / 'ohlcv.db')
+    root = str(tmp_path / 'candles')
+    conn = ohlcv_store.connect(db_path)
+    ohlcv_store.bulk_insert_ohlcv(conn, TABLE, month_end_candles)
+    conn.close()
+
+    assert arrow_store.export_from_sqlite(db_path, root) == {TABLE: len(month_end_candles)}
+    # 다시 내보내도 행이 중복되지 않는다
+    arrow_store.export_from_sqlite(db_path, root)
+    loaded = arrow_store.load_candles(TABLE, month_end_candles.index[0], month_end_candles.index[-1], root)
+    assert (loaded.index == month_end_candles.index).all()
+    assert np.array_equal(loaded.to_numpy(), month_end_candles.to_numpy())
@@ -0,0 +1,66 @@
+import shutil
+
+import pytest
+
+import arrow_store
+import candle_cache
+
+
+def test_rewrite_keeps_live_frames_and_retries_locked_versions(tmp_path, make_ohlcv, monkeypatch):
+    """살아 있는 메모리 맵 DataFrame이 있어도 캐시를 교체하고, 지우지 못한 이전 버전은 다음에 정리하는지"""
+    root = str(tmp_path)
+    old, new = make_ohlcv(50, seed=1), make_ohlcv(60, seed=2)
+    candle_cache.write_cache('t', old, root)
+    live = candle_cache.load_frame('t', root=root)
+
+    def locked(path, *args, **kwargs):  # Windows: 매핑된 파일은 지울 수 없음
+        raise PermissionError(32, 'in use', path)
+    monkeypatch.setattr(shutil, 'rmtree', locked)
+    candle_cache.write_cache('t', new, root)
+    assert (live.to_numpy() == old.to_numpy()).all()
+    assert (candle_cache.load_frame('t', root=root).to_numpy() == new.to_numpy()).all()
+
+    candle_cache.invalidate('t', root)
+    assert not candle_cache.has_cache('t', root)
+    assert candle_cache.load_frame('t', root=root) is None
+
+    monkeypatch.undo()
+    del live
+    candle_cache.write_cache('t', old, root)
+    assert len(list((tmp_path / 't').iterdir())) == 2  # current + 현재 버전만 남음
+
+
+def test_build_started_before_invalidate_is_not_published(tmp_path, make_ohlcv):
+    """무효화 전에 읽기 시작한 캐시 생성 결과는 current로 올리지 않는지"""
+    root = str(tmp_path)
+    candle_cache.write_cache('t', make_ohlcv(50), root)
+    expected = candle_cache.current_version('t', root)
+    candle_cache.invalidate('t', root)
+    assert candle_cache.write_cache('t', make_ohlcv(50), root, expected) is None
+    assert not candle_cache.has_cache('t', root)
+
+
+@pytest.mark.skipif(not arrow_store.available(), reason='pyarrow 없음')
+def test_build_cache_reads_arrow_store_before_sqlite(tmp_path, make_ohlcv, monkeypatch):
+    """Arrow 캔들 저장소가 있으면 SQLite를 열지 않고 캐시를 만드는지"""
+    df = make_ohlcv(3000)  # 2024-01-01 ~ 01-03
+    df.index = df.index + (df.index - df.index[0]) * 20  # 여러 달에 걸치게 (20분 간격)
+    arrow_root, root = str(tmp_path / 'arrow'), str(tmp_path / 'cache')
+    arrow_store.write_candles('t', df, arrow_root)
+    monkeypatch.setattr(candle_cache.ohlcv_store, 'connect', None)  # SQLite를 열면 실패
+    assert candle_cache.build_cache('t', root=root, arrow_root=arrow_root) == len(df)
+    cached = candle_cache.load_frame('t', root=root)
+    assert (cached.index == df.index).all()
+    assert (cached.to_numpy() == df.to_numpy()).all()
+
+
+def test_frame_cache_drops_frames_loaded_before_invalidate(make_ohlcv):
+    """조회 도중 무효화된 테이블의 DataFrame은 put해도 캐시에 들어가지 않는지"""
+    cache = candle_cache.FrameCache()
+    key = ('t', None, None)
+    generation = cache.generation('t')
+    cache.invalidate('t')  # 조회 도중 다른 스레드가 새 데이터를 저장
+    cache.put(key, make_ohlcv(10), generation)
+    assert cache.get(key) is None
+    cache.put(key, make_ohlcv(10), cache.generation('t'))
+    assert cache.get(key) is not None
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import downloader
+import ohlcv_store
+
+TABLE = 'BTC_ohlcv_minute1'
+
+
+def make_store(make_ohlcv, drop=()):
+    conn = ohlcv_store.connect(':memory:')
+    df = make_ohlcv(10)
+    ohlcv_store.bulk_insert_ohlcv(conn, TABLE, df.drop(df.index[list(drop)]))
+    return conn
+
+
+def test_missing_ranges_finds_edges_and_holes(make_ohlcv):
+    conn = make_store(make_ohlcv, drop=[3, 4, 7])
+    missing = ohlcv_store.find_missing_ranges(conn, TABLE, datetime(2023, 12, 31, 23, 58), datetime(2024, 1, 1, 0, 12))
+    assert missing == [
+        (datetime(2023, 12, 31, 23, 58), datetime(2024, 1, 1, 0, 0)),
+        (datetime(2024, 1, 1, 0, 3), datetime(2024, 1, 1, 0, 5)),
+        (datetime(2024, 1, 1, 0, 7), datetime(2024, 1, 1, 0, 8)),
+        (datetime(2024, 1, 1, 0, 10), datetime(2024, 1, 1, 0, 12)),
+    ]
+    # 끝점이 저장된 봉과 딱 맞으면 앞/뒤 빈 구간 없음
+    assert len(ohlcv_store.find_missing_ranges(conn, TABLE, datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 9))) == 2
+
+
+def test_fetched_span_hides_no_trade_holes(make_ohlcv):
+    """거래소가 이미 응답한 구간 안의 구멍은 다시 요청하지 않는지"""
+    conn = make_store(make_ohlcv, drop=[3, 4, 7])
+    start, end = datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 12)
+    ohlcv_store.mark_fetched(conn, TABLE, datetime(2024, 1, 1, 0, 3), datetime(2024, 1, 1, 0, 5))
+    assert ohlcv_store.find_missing_ranges(conn, TABLE, start, end) == [
+        (datetime(2024, 1, 1, 0, 7), datetime(2024, 1, 1, 0, 8)),
+        (datetime(2024, 1, 1, 0, 10), datetime(2024, 1, 1, 0, 12)),
+    ]
+    ohlcv_store.mark_fetched(conn, TABLE, start, datetime(2024, 1, 1, 0, 13))
+    assert ohlcv_store.find_missing_ranges(conn, TABLE, start, end) == []
+
+
+def test_fetched_span_excludes_forming_candle():
+    conn = ohlcv_store.connect(':memory:')
+    ohlcv_store.create_table(conn, TABLE)
+    now = pd.Timestamp.now().floor('min').to_pydatetime()
+    start = now - pd.Timedelta(minutes=10)
+    ohlcv_store.mark_fetched(conn, TABLE, start, now + pd.Timedelta(minutes=1))
+    missing = ohlcv_store.find_missing_ranges(conn, TABLE, start, now)
+    assert len(missing) == 1 and missing[0][0] >= now - pd.Timedelta(minutes=1)
+
+
+def test_batch_sync_does_not_refetch_no_trade_holes(make_ohlcv, monkeypatch):
+    """거래 없는 분이 있어도 두 번째 일괄 수집은 요청하지 않는지"""
+    exchange = make_ohlcv(600)
+    exchange = exchange.drop(exchange.index[::7])  # 거래 없는 분
+    calls = []
+
+    def fake_ohlcv(ticker, interval, count, to):
+        calls.append(to)
+        to = pd.Timestamp(to) + downloader.KST_OFFSET
+        return exchange[exchange.index < to].iloc[-count:]
+    monkeypatch.setattr(downloader, 'get_upbit_ohlcv', fake_ohlcv)
+
+    conn = ohlcv_store.connect(':memory:')
+
+    def run():
+        batch = downloader.BatchDownloader('업비트', ['BTC'], ['1분봉'], lambda coin, interval: TABLE,
+                                           datetime(2024, 1, 1), datetime(2024, 1, 1, 9, 59), log=lambda msg: None)
+        batch.bucket.rate = 1000
+        return batch.run(conn, ohlcv_store.bulk_insert_ohlcv)
+
+    result = run()
+    assert result['failed'] == 0 and result['tables'][TABLE] == len(exchange)
+    first_calls = len(calls)
+    assert first_calls > 0
+    result = run()
+    assert len(calls) == first_calls and result['tables'] == {}
+
+
+def test_request_count_is_exact_across_threads():
+    batch = downloader.BatchDownloader('업비트', [], [], lambda coin, interval: TABLE, log=lambda msg: None)
+    batch.bucket.rate, batch.bucket.capacity = 1e9, 1e9
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: batch.request(lambda: pd.DataFrame()), range(4000)))
+    assert batch.requests == 4000
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import (StreamingATR, StreamingBollingerBands, StreamingEMA, StreamingMACD, StreamingMinMax,
+                        StreamingRSI, StreamingStochastic, StreamingVolumeProfile, rolling_max, rolling_min)
+from strategies import BaseStrategy, StochasticStrategy, VolumeProfileStrategy
+
+
+def stream(update, bars, provisional=True):
+    """봉마다 update를 호출해 결과 목록 반환
+
+    provisional=True면 먼저 값이 조금 다른 진행 중인 봉을 넣은 뒤 replace_last=True로 확정 봉으로 바꾼다.
+    """
+    results = []
+    for bar in bars:
+        if provisional:
+            update(*[value * 1.003 for value in bar], replace_last=False)
+            results.append(update(*bar, replace_last=True))
+        else:
+            results.append(update(*bar, replace_last=False))
+    return results
+
+
+def assert_series_close(actual, expected):
+    """NaN 위치까지 같은지 비교 (가격 크기 기준 상대 오차)"""
+    np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                               rtol=1e-7, atol=1e-6)
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+@pytest.mark.parametrize('period', [2, 14, 30])
+def test_streaming_rsi_matches_calculate_rsi(make_ohlcv, period, provisional):
+    df = make_ohlcv(500)
+    expected = BaseStrategy().calculate_rsi(df['close'], period)
+    rsi = StreamingRSI(period)
+    actual = stream(lambda close, replace_last: rsi.update(close, replace_last),
+                    [(c,) for c in df['close']], provisional)
+    assert_series_close(actual, expected)
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+def test_streaming_macd_matches_calculate_macd(make_ohlcv, provisional):
+    df = make_ohlcv(500)
+    macd, signal = BaseStrategy().calculate_macd(df['close'], 8, 21, 5)
+    state = StreamingMACD(8, 21, 5)
+    actual = np.array(stream(lambda close, replace_last: state.update(close, replace_last),
+                             [(c,) for c in df['close']], provisional))
+    assert_series_close(actual[:, 0], macd)
+    assert_series_close(actual[:, 1], signal)
+    ema = StreamingEMA(20)
+    assert_series_close(stream(lambda close, replace_last: ema.update(close, replace_last),
+                               [(c,) for c in df['close']], provisional),
+                        df['close'].ewm(span=20, adjust=False).mean())
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+@pytest.mark.parametrize('period,num_std', [(20, 2), (5, 1.5)])
+def test_streaming_bollinger_matches_calculate_bollinger_bands(make_ohlcv, period, num_std, provisional):
+    df = make_ohlcv(3000)  # RollingWindow 재동기화(1000회)를 지나도록
+    upper, middle, lower = BaseStrategy().calculate_bollinger_bands(df['close'], period, num_std)
+    bands = StreamingBollingerBands(period, num_std)
+    actual = np.array(stream(lambda close, replace_last: bands.update(close, replace_last),
+                             [(c,) for c in df['close']], provisional))
+    assert_series_close(actual[:, 0], upper)
+    assert_series_close(actual[:, 1], middle)
+    assert_series_close(actual[:, 2], lower)
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+def test_streaming_atr_matches_rolling_true_range(make_ohlcv, provisional):
+    df = make_ohlcv(500)
+    prev_close = df['close'].shift(1)
+    tr = pd.concat([df['high'] - df['low'], (df['high'] - prev_close).abs(), (df['low'] - prev_close).abs()],
+                   axis=1).max(axis=1)
+    atr = StreamingATR(14)
+    actual = stream(lambda high, low, close, replace_last: atr.update(high, low, close, replace_last),
+                    df[['high', 'low', 'close']].to_numpy().tolist(), provisional)
+    assert_series_close(actual, tr.rolling(14).mean())
+
+
+@pytest.mark.parametrize('window', [1, 2, 7, 14, 64, 99, 100, 101, 500])
+def test_rolling_min_max_match_pandas(window):
+    """블록 누적 이동 최소/최대가 pandas rolling(window).min()/max()와 같은지 (창이 데이터보다 긴 경우 포함)"""
+    rng = np.random.default_rng(window)
+    values = rng.normal(0, 1, 100).cumsum()
+    values[[5, 50]] = np.nan  # NaN이 포함된 창은 NaN
+    series = pd.Series(values)
+    assert_series_close(rolling_min(values, window), series.rolling(window).min())
+    assert_series_close(rolling_max(values, window), series.rolling(window).max())
+    assert len(rolling_min(values[:0], window)) == 0
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+@pytest.mark.parametrize('period', [1, 5, 14])
+def test_streaming_min_max_matches_pandas(make_ohlcv, period, provisional):
+    df = make_ohlcv(300)
+    channel = StreamingMinMax(period)
+    actual = np.array(stream(lambda low, high, replace_last: channel.update(low, high, replace_last),
+                             df[['low', 'high']].to_numpy().tolist(), provisional))
+    assert_series_close(actual[:, 0], df['low'].rolling(period).min())
+    assert_series_close(actual[:, 1], df['high'].rolling(period).max())
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+@pytest.mark.parametrize('period,d_period', [(14, 3), (5, 1)])
+def test_streaming_stochastic_matches_calculate_stochastic(make_ohlcv, period, d_period, provisional):
+    df = make_ohlcv(300)
+    k, d = StochasticStrategy().calculate_stochastic(df, period, d_period)
+    stochastic = StreamingStochastic(period, d_period)
+    actual = np.array(stream(lambda high, low, close, replace_last: stochastic.update(high, low, close, replace_last),
+                             df[['high', 'low', 'close']].to_numpy().tolist(), provisional))
+    assert_series_close(actual[:, 0], k)
+    assert_series_close(actual[:, 1], d)
+
+
+@pytest.mark.parametrize('provisional', [False, True])
+@pytest.mark.parametrize('num_bins,window_size', [(10, 20), (5, 35), (30, 10)])
+def test_streaming_volume_profile_matches_bincount_profile(make_ohlcv, num_bins, window_size, provisional):
+    """롤링 프로파일이 봉마다 최근 window_size 봉으로 다시 계산한 calculate_volume_profile과 같은지"""
+    df = make_ohlcv(1500, seed=3)  # 재동기화(1000회)를 지나도록
+    strategy = VolumeProfileStrategy()
+    profile = StreamingVolumeProfile(num_bins, window_size)
+    bars = df[['high', 'low', 'close', 'volume']].to_numpy().tolist()
+
+    def update(high, low, close, volume, replace_last):
+        bins, volume_profile = profile.update(high, low, close, volume, replace_last)
+        return bins, None if volume_profile is None else volume_profile.copy()  # 다음 갱신 때 제자리에서 바뀜
+    results = stream(update, bars, provisional)
+    for i, (bins, volume_profile) in enumerate(results):
+        if i < window_size - 1:
+            assert bins is None and volume_profile is None
+            continue
+        expected_bins, expected_profile = strategy.calculate_volume_profile(df.iloc[i - window_size + 1:i + 1],
+                                                                            num_bins)
+        assert_series_close(bins, expected_bins)
+        assert_series_close(volume_profile, expected_profile)
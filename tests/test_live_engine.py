@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from live_engine import HistoryBuffer
+
+AGGREGATES = {'last': lambda v: v[-1], 'mean': np.mean, 'sum': np.sum}
+
+
+def reference_snapshot(times, values, capacity, levels, factor, how):
+    """전체 기록을 단계별로 직접 묶어 만든 기대 snapshot (오래된 순)"""
+    agg = AGGREGATES[how]
+    points = list(zip(times, values))
+    segments = []
+    for level in range(levels):
+        kept, overflow = points[-capacity:], points[:-capacity] if len(points) > capacity else []
+        segments.append(kept)
+        if level == levels - 1:
+            break  # 마지막 단계에서 밀려난 값은 버림
+        full = len(overflow) // factor * factor
+        chunks = [overflow[i:i + factor] for i in range(0, full, factor)]
+        points = [(chunk[-1][0], agg([v for _, v in chunk])) for chunk in chunks]
+        rest = overflow[full:]
+        segments.append([(rest[-1][0], agg([v for _, v in rest]))] if rest else [])
+    # [0단계, 1단계 묶는 중, 1단계, 2단계 묶는 중, 2단계, ...]를 오래된 순으로 뒤집는다
+    ordered = [point for segment in reversed(segments) for point in segment]
+    return np.array([t for t, _ in ordered]), np.array([v for _, v in ordered])
+
+
+@pytest.mark.parametrize('how', ['last', 'mean', 'sum'])
+@pytest.mark.parametrize('n', [7, 10, 11, 64, 263, 2000])
+def test_snapshot_folds_levels_in_time_order(how, n):
+    capacity, levels, factor = 10, 3, 5
+    history = HistoryBuffer(capacity, levels, factor, how)
+    times = np.arange(n, dtype=float)
+    values = np.random.default_rng(n).normal(100, 5, n)
+    for t, value in zip(times, values):
+        history.append(t, value)
+
+    snap_times, snap_values = history.snapshot()
+    expected_times, expected_values = reference_snapshot(times, values, capacity, levels, factor, how)
+    assert len(snap_times) <= levels * (capacity + 1)
+    assert np.all(np.diff(snap_times) > 0)
+    assert np.array_equal(snap_times, expected_times)
+    assert np.allclose(snap_values, expected_values)
+    # 가장 최근 capacity개는 원래 해상도 그대로
+    assert np.array_equal(snap_values[-min(n, capacity):], values[-capacity:])
+
+
+def test_snapshot_length_is_bounded_and_clear_resets():
+    history = HistoryBuffer(capacity=20, levels=2, factor=4, how='mean')
+    for t in range(10000):
+        history.append(float(t), 1.0)
+    snap_times, snap_values = history.snapshot()
+    assert len(snap_times) <= 2 * 21
+    assert snap_times[-1] == 9999 and np.all(snap_values == 1.0)
+    history.clear()
+    assert len(history) == 0 and len(history.snapshot()[0]) == 0
@@ -0,0 +1,32 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip('PyQt5')
+
+import autotrade
+import market_feed
+
+
+def test_failed_seed_is_retried_before_ticker_updates(make_ohlcv, monkeypatch):
+    """분봉 초기화에 실패한 코인은 현재가로 봉을 만들지 않고, 다음 틱에 다시 초기화하는지"""
+    seed = make_ohlcv(300)
+    seeds = {'ETH': [None, RuntimeError('timeout'), seed], 'BTC': [seed]}
+    monkeypatch.setattr(market_feed, 'fetch_tickers',
+                        lambda codes: {code: (100.0, 1.0, 0) for code in codes})
+    worker = autotrade.AutoTradeWorker(None)
+    monkeypatch.setattr(worker, 'fetch_seed_candles', lambda code: seeds[code[4:]].pop(0) if seeds[code[4:]] else None)
+    worker.coins = ['BTC', 'ETH']
+    worker.buffers = {coin: market_feed.CandleBuffer(200) for coin in worker.coins}
+
+    for _ in range(2):
+        data = asyncio.run(worker.fetch_market_data())
+        assert data['ETH'] == (100.0, None)
+        assert len(worker.buffers['ETH']) == 0
+    assert data['BTC'][1] is not None and 'BTC' in worker.seeded
+
+    data = asyncio.run(worker.fetch_market_data())
+    assert worker.seeded == {'BTC', 'ETH'}
+    assert data['ETH'][1] is not None and len(worker.buffers['ETH']) >= 200
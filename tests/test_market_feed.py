@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+import market_feed
+
+websockets = pytest.importorskip('websockets')
+
+
+def test_replay_rebuilds_minute_candles(make_ohlcv):
+    """ReplayServer로 1분봉을 체결 메시지로 흘려보내면 MarketFeed가 같은 1분봉을 다시 만드는지"""
+    df = make_ohlcv(120, seed=5)
+    seed, live = df.iloc[:40], df.iloc[40:]
+    # 구독하지 않은 코드의 메시지는 서버가 걸러야 한다
+    messages = market_feed.messages_from_ohlcv(live, 'KRW-BTC') + market_feed.messages_from_ohlcv(live, 'KRW-ETH')
+    replay = market_feed.ReplayServer(messages)
+
+    async def run():
+        async with websockets.serve(replay.handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            feed = market_feed.MarketFeed(['KRW-BTC'], lambda code: seed, url=f'ws://127.0.0.1:{port}',
+                                          max_candles=len(df), log=lambda message: None)
+            stop_event = threading.Event()
+            task = asyncio.ensure_future(feed.run(stop_event))
+            for _ in range(500):
+                if feed.messages == len(live) * 4:
+                    break
+                await asyncio.sleep(0.01)
+            stop_event.set()
+            await asyncio.wait_for(task, timeout=5)
+            return feed
+
+    feed = asyncio.run(run())
+    frame = feed.frame('KRW-BTC', len(df))
+    assert feed.messages == len(live) * 4
+    assert feed.price('KRW-BTC') == df['close'].iloc[-1]
+    assert (frame.index == df.index).all()
+    np.testing.assert_allclose(frame.to_numpy(), df[frame.columns].to_numpy())
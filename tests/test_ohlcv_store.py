@@ -0,0 +1,83 @@
+import sqlite3
+
+import numpy as np
+
+import ohlcv_store
+
+TABLE = 'BTC_ohlcv_minute1'
+
+
+def test_load_keeps_exact_timestamps(make_ohlcv):
+    conn = ohlcv_store.connect(':memory:')
+    df = make_ohlcv(500)
+    df.index = df.index + np.timedelta64(123, 'ms')  # float64을 거치면 어긋날 수 있는 밀리초 값
+    ohlcv_store.bulk_insert_ohlcv(conn, TABLE, df)
+    loaded = ohlcv_store.load_ohlcv(conn, TABLE, df.index[10], df.index[-10])
+    assert (loaded.index == df.index[10:-9]).all()
+    assert np.array_equal(loaded.to_numpy(), df.iloc[10:-9][ohlcv_store.OHLCV_COLUMNS].to_numpy())
+    assert [dtype.name for dtype in loaded.dtypes] == ['float64'] * 5
+    assert ohlcv_store.load_ohlcv(conn, TABLE, df.index[-1] + np.timedelta64(1, 'D'),
+                                  df.index[-1] + np.timedelta64(2, 'D')) is None
+
+
+def test_migrate_legacy_text_table(tmp_path, make_ohlcv):
+    """이전 스키마(date TEXT) 테이블을 변환해도 행 수, 시각, 값이 그대로인지"""
+    db_path = str(tmp_path / 'legacy.db')
+    df = make_ohlcv(300)
+    conn = sqlite3.connect(db_path)
+    conn.execute(f'''
+        CREATE TABLE {TABLE} (
+            date TEXT PRIMARY KEY,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL
+        )
+    ''')
+    conn.executemany(f'INSERT INTO {TABLE} VALUES (?, ?, ?, ?, ?, ?)',
+                     [(index.strftime('%Y-%m-%d %H:%M:%S'), *row) for index, row in
+                      zip(df.index, df[ohlcv_store.OHLCV_COLUMNS].itertuples(index=False))])
+    conn.commit()
+    conn.close()
+
+    assert ohlcv_store.migrate_database(db_path) == {TABLE: len(df)}
+    assert ohlcv_store.migrate_database(db_path) == {}  # 이미 변환된 테이블은 건너뜀
+
+    conn = ohlcv_store.connect(db_path)
+    assert not ohlcv_store.is_legacy_table(conn, TABLE)
+    assert ohlcv_store.get_coverage(conn, TABLE) == (len(df), df.index[0].to_pydatetime(),
+                                                     df.index[-1].to_pydatetime())
+    loaded = ohlcv_store.load_ohlcv(conn, TABLE, df.index[0], df.index[-1])
+    assert (loaded.index == df.index).all()
+    assert np.array_equal(loaded.to_numpy(), df[ohlcv_store.OHLCV_COLUMNS].to_numpy())
+    conn.close()
+
+
+def test_bulk_insert_counts_replaces_and_round_trips(make_ohlcv):
+    conn = ohlcv_store.connect(':memory:')
+    df = make_ohlcv(1000)
+    saved, elapsed = ohlcv_store.bulk_insert_ohlcv(conn, TABLE, df.iloc[:600])
+    assert saved == 600 and elapsed >= 0
+
+    # 겹치는 구간은 INSERT OR REPLACE로 새 값이 남는다
+    update = df.iloc[500:].copy()
+    update.loc[update.index[:100], 'close'] += 1.0
+    assert ohlcv_store.bulk_insert_ohlcv(conn, TABLE, update)[0] == 500
+    assert conn.execute(f'SELECT COUNT(*) FROM {TABLE}').fetchone()[0] == 1000
+    assert conn.execute(f'SELECT typeof(ts) FROM {TABLE} LIMIT 1').fetchone()[0] == 'integer'
+
+    expected = df.copy()
+    expected.loc[update.index, 'close'] = update['close']
+    loaded = ohlcv_store.load_ohlcv(conn, TABLE, df.index[0], df.index[-1])
+    assert (loaded.index == expected.index).all()
+    assert np.array_equal(loaded.to_numpy(), expected[ohlcv_store.OHLCV_COLUMNS].to_numpy())
+
+
+def test_bulk_insert_accepts_integer_columns(make_ohlcv):
+    conn = ohlcv_store.connect(':memory:')
+    df = make_ohlcv(10)
+    df['volume'] = np.arange(10)  # 정수 컬럼도 REAL로 저장
+    ohlcv_store.bulk_insert_ohlcv(conn, TABLE, df)
+    assert conn.execute(f'SELECT typeof(volume) FROM {TABLE} LIMIT 1').fetchone()[0] == 'real'
+    assert (ohlcv_store.load_ohlcv(conn, TABLE, df.index[0], df.index[-1])['volume'] == np.arange(10)).all()
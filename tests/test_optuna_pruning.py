@@ -0,0 +1,68 @@
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import strategies
+from strategies import OptunaOptimizer, StrategyFactory, threshold_report
+
+optuna = pytest.importorskip('optuna')
+
+
+def run_trial(study, values, report):
+    """중간 값을 단계별로 보고하며 시도 하나 실행
+
+    반환: (Optuna pruner가 멈춘 단계, 병렬 워커 기준 report가 멈춘 단계), 끝까지 가면 None
+    """
+    trial = study.ask()
+    pruned_at = expected_at = None
+    for step, value in enumerate(values, 1):
+        if expected_at is None and report(step, value):
+            expected_at = step
+        trial.report(value, step)
+        if trial.should_prune():
+            pruned_at = step
+            study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+            return pruned_at, expected_at
+    study.tell(trial, values[-1])
+    return pruned_at, expected_at
+
+
+@pytest.mark.parametrize('pruner', ['median', 'halving'])
+def test_parallel_thresholds_match_serial_pruner(pruner):
+    """병렬 워커용 기준(prune_thresholds)이 같은 스터디에서 Optuna pruner와 같은 단계에서 멈추는지"""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    optimizer = OptunaOptimizer(StrategyFactory.create_strategy('RSI'), 'RSI', None, pruner=pruner)
+    study = optuna.create_study(direction='maximize', pruner=optimizer.create_pruner())
+    rng = np.random.default_rng(0)
+    pruned = 0
+    for _ in range(60):
+        values = np.cumsum(rng.normal(0, 1, 9)).tolist()
+        report = threshold_report(optimizer.prune_thresholds(study), pruner == 'median', [])
+        serial, parallel = run_trial(study, values, report)
+        assert serial == parallel
+        pruned += serial is not None
+    assert 0 < pruned < 60
+
+
+def slow_trial(*args):
+    time.sleep(3)
+    return 0.0, [], False
+
+
+def test_abort_does_not_wait_for_running_parallel_trials(make_ohlcv, monkeypatch):
+    """중단하면 실행 중인 병렬 시도를 기다리지 않고 돌아오고, 남은 시도는 실패로 기록되는지"""
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip('워커에 느린 시도 함수를 넘기려면 fork 방식이 필요')
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    monkeypatch.setattr(strategies, '_run_optuna_trial', slow_trial)  # fork로 워커에 그대로 전달
+    stop_event, abort_event = threading.Event(), threading.Event()
+    optimizer = OptunaOptimizer(StrategyFactory.create_strategy('RSI'), 'RSI', make_ohlcv(300), n_trials=10,
+                                n_jobs=2, stop_event=stop_event, abort_event=abort_event)
+    threading.Timer(0.5, lambda: (abort_event.set(), stop_event.set())).start()
+    started = time.perf_counter()
+    study = optimizer.optimize_parallel(optimizer.create_study())
+    assert time.perf_counter() - started < 2
+    assert [trial.state.name for trial in study.trials] == ['FAIL', 'FAIL']
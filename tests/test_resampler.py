@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ohlcv_store
+import resampler
+
+SOURCE = 'BTC_ohlcv_minute1'
+
+# 봉 단위별 pandas resample 규칙 (KST 기준 4시간봉 01시, 일봉 09시 시작)
+PANDAS_RULES = {
+    'minute3': ('3min', '0h'),
+    'minute5': ('5min', '0h'),
+    'minute15': ('15min', '0h'),
+    'minute30': ('30min', '0h'),
+    'hour1': ('1h', '0h'),
+    'hour4': ('4h', '1h'),
+    'day': ('24h', '9h'),
+}
+
+
+@pytest.fixture
+def minutes(make_ohlcv):
+    """며칠에 걸친 1분봉 (정각이 아닌 시각에서 시작, 거래 없는 분 포함)"""
+    df = make_ohlcv(3 * 24 * 60 + 137)
+    df.index = df.index + pd.Timedelta('5h17min')
+    return df.drop(df.index[np.random.default_rng(3).choice(len(df), 400, replace=False)])
+
+
+def pandas_resample(df, interval):
+    rule, offset = PANDAS_RULES[interval]
+    resampled = df.resample(rule, offset=offset, label='left', closed='left').agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    return resampled[df['close'].resample(rule, offset=offset).count() > 0]
+
+
+@pytest.mark.parametrize('interval', list(resampler.DERIVED_INTERVALS))
+def test_resample_matches_pandas(minutes, interval):
+    result = resampler.resample_ohlcv(minutes, interval)
+    expected = pandas_resample(minutes, interval)
+    assert (result.index == expected.index).all()
+    assert np.allclose(result.to_numpy(), expected[ohlcv_store.OHLCV_COLUMNS].to_numpy(), rtol=0, atol=1e-6)
+
+
+def test_kst_buckets_start_at_upbit_hours(minutes):
+    assert set(resampler.resample_ohlcv(minutes, 'hour4').index.hour) <= {1, 5, 9, 13, 17, 21}
+    assert set(resampler.resample_ohlcv(minutes, 'day').index.hour) == {9}
+
+
+def test_incremental_recomputes_from_last_stored_bucket(minutes):
+    """새 1분봉이 들어오면 마지막 저장 봉(진행 중이던 봉)부터만 다시 집계하는지"""
+    conn = ohlcv_store.connect(':memory:')
+    cut = minutes.index[len(minutes) // 2] + pd.Timedelta('7min')
+    old, new = minutes[minutes.index < cut], minutes[minutes.index >= cut]
+
+    ohlcv_store.bulk_insert_ohlcv(conn, SOURCE, old)
+    for table_name, df in resampler.resample_incremental(conn, SOURCE).items():
+        ohlcv_store.bulk_insert_ohlcv(conn, table_name, df)
+
+    ohlcv_store.bulk_insert_ohlcv(conn, SOURCE, new)
+    derived = resampler.resample_incremental(conn, SOURCE, since=new.index[0])
+    assert set(derived) == {resampler.derived_table_name(SOURCE, interval) for interval in resampler.DERIVED_INTERVALS}
+    for interval in resampler.DERIVED_INTERVALS:
+        table_name = resampler.derived_table_name(SOURCE, interval)
+        last_stored = ohlcv_store.get_coverage(conn, table_name)[2]
+        df = derived[table_name]
+        assert df.index[0] == last_stored  # 진행 중이던 마지막 봉부터 (그 앞은 다시 계산하지 않음)
+        ohlcv_store.bulk_insert_ohlcv(conn, table_name, df)
+
+        stored = ohlcv_store.load_ohlcv(conn, table_name, pd.Timestamp.min, pd.Timestamp.max)
+        expected = pandas_resample(minutes, interval)
+        assert (stored.index == expected.index).all()
+        assert np.allclose(stored.to_numpy(), expected[ohlcv_store.OHLCV_COLUMNS].to_numpy(), rtol=0, atol=1e-6)
+
+
+def test_incremental_since_before_last_bucket(minutes):
+    """과거 구간을 다시 저장하면 since가 속한 봉부터 다시 계산하는지"""
+    conn = ohlcv_store.connect(':memory:')
+    ohlcv_store.bulk_insert_ohlcv(conn, SOURCE, minutes)
+    for table_name, df in resampler.resample_incremental(conn, SOURCE, intervals=['hour1']).items():
+        ohlcv_store.bulk_insert_ohlcv(conn, table_name, df)
+    since = minutes.index[100]
+    derived = resampler.resample_incremental(conn, SOURCE, since=since, intervals=['hour1'])
+    assert derived[resampler.derived_table_name(SOURCE, 'hour1')].index[0] == since.floor('h')
@@ -0,0 +1,102 @@
+import contextlib
+import io
+
+import pytest
+
+from strategies import BacktestEngine, BaseStrategy, StrategyFactory
+
+# 전략별 검사 파라미터 (기본값 + 신호가 자주 나오도록 기준을 완화한 조합)
+PARAMS = {
+    'RSI': [{}, {'period': 7, 'overbought': 60, 'oversold': 40}],
+    '볼린저밴드': [{}, {'period': 10, 'std': 1.0}],
+    'MACD': [{}, {'fast_period': 8, 'slow_period': 30, 'signal_period': 5}],
+    '거래량 프로파일': [{}, {'num_bins': 5, 'window_size': 35}, {'num_bins': 30, 'window_size': 10}],
+    '이동평균선 교차': [{}, {'short_period': 3, 'long_period': 8}],
+    '스토캐스틱': [{}, {'period': 5, 'd_period': 1, 'overbought': 70, 'oversold': 30}],
+    'BB+RSI': [{}, {'bb_std': 1.0, 'rsi_high': 60, 'rsi_low': 40}],
+    'MACD+EMA': [{}, {'macd_fast': 8, 'macd_slow': 20, 'macd_signal': 5, 'ema_period': 10}],
+    'ATR 기반 변동성 돌파': [{}, {'period': 30, 'multiplier': 0.5, 'trend_period': 10}],
+}
+
+
+@pytest.mark.parametrize('strategy_name', StrategyFactory.strategy_names())
+def test_vectorized_signals_match_per_bar(strategy_name, make_ohlcv):
+    """generate_signals(df)가 봉마다 generate_signal을 호출하는 기본 구현과 같은 신호를 내는지"""
+    strategy = StrategyFactory.create_strategy(strategy_name)
+    if type(strategy).generate_signals is BaseStrategy.generate_signals:
+        pytest.skip('벡터화 구현 없음 (기본 구현을 그대로 사용)')
+    assert strategy_name in PARAMS, '새 전략은 PARAMS에 검사 파라미터를 추가해야 한다'
+    emitted = 0
+    for seed in (1, 2):
+        df = make_ohlcv(400, seed)
+        for params in PARAMS[strategy_name]:
+            vectorized = strategy.generate_signals(df, **params)
+            with contextlib.redirect_stdout(io.StringIO()):  # 전략 디버그 출력 숨김
+                per_bar = BaseStrategy.generate_signals(strategy, df, **params)
+            assert len(vectorized) == len(df)
+            assert list(vectorized) == list(per_bar), (seed, params)
+            emitted += sum(signal is not None for signal in vectorized)
+    assert emitted > 0, '신호가 하나도 나오지 않아 비교 의미가 없음'
+
+
+@pytest.mark.parametrize('strategy_name', StrategyFactory.strategy_names())
+def test_vectorized_backtest_matches_per_bar(strategy_name, make_ohlcv):
+    """backtest_strategy의 벡터화/봉 단위 모드가 같은 거래 목록과 최종 잔고를 내는지"""
+    engine = BacktestEngine(fee_rate=0.0005)
+    strategy = StrategyFactory.create_strategy(strategy_name)
+    # 벡터화 구현이 없는 전략은 봉마다 다시 계산하므로(머신러닝은 봉마다 학습) 짧은 구간 하나만 비교
+    native = type(strategy).generate_signals is not BaseStrategy.generate_signals
+    cases = [make_ohlcv(400, seed) for seed in (1, 2)] if native else [make_ohlcv(80, 1)]
+    traded = 0
+    for df in cases:
+        for params in PARAMS.get(strategy_name, [{}]):
+            with contextlib.redirect_stdout(io.StringIO()):
+                vectorized = engine.backtest_strategy(strategy_name, params, df, '1분봉', 1_000_000, vectorized=True)
+                per_bar = engine.backtest_strategy(strategy_name, params, df, '1분봉', 1_000_000, vectorized=False)
+            if per_bar is None:
+                assert vectorized is None, params
+                continue
+            assert vectorized['trades'] == per_bar['trades'], params
+            assert vectorized['final_capital'] == per_bar['final_capital']
+            assert vectorized['daily_balance'] == per_bar['daily_balance']
+            traded += len(per_bar['trades'])
+    assert traded > 0, '거래가 하나도 없어 비교 의미가 없음'
+
+
+@pytest.mark.parametrize('strategy_name', StrategyFactory.strategy_names())
+def test_signal_stream_matches_vectorized(strategy_name, make_ohlcv):
+    """create_signal_stream으로 봉을 하나씩 (진행 중인 봉 갱신 포함) 넣은 신호가 generate_signals와 같은지"""
+    strategy = StrategyFactory.create_strategy(strategy_name)
+    if strategy.create_signal_stream() is None:
+        pytest.skip('증분 신호 계산 없음 (라이브 루프는 generate_signal 사용)')
+    emitted = 0
+    for seed in (1, 2):
+        df = make_ohlcv(400, seed)
+        bars = df[['open', 'high', 'low', 'close', 'volume']].to_numpy().tolist()
+        for params in PARAMS[strategy_name]:
+            expected = strategy.generate_signals(df, **params)
+            stream = strategy.create_signal_stream(**params)
+            actual = []
+            for open_, high, low, close, volume in bars:
+                # 진행 중인 봉: 시가에서 시작해 거래량 일부만 반영된 상태
+                stream.update(open_, max(open_, close), min(open_, close), close * 0.999, volume / 3)
+                actual.append(stream.update(open_, high, low, close, volume, replace_last=True))
+            assert actual == list(expected), (seed, params)
+            emitted += sum(signal is not None for signal in actual)
+    assert emitted > 0
+
+
+def test_signal_stream_feed_only_applies_new_bars(make_ohlcv):
+    """feed가 라이브 프레임(최근 봉 창)에서 새 봉과 진행 중인 봉만 반영하는지"""
+    strategy = StrategyFactory.create_strategy('RSI')
+    params = PARAMS['RSI'][1]
+    df = make_ohlcv(300, seed=4)
+    expected = strategy.generate_signals(df, **params)
+    stream = strategy.create_signal_stream(**params)
+    assert stream.feed(df.iloc[:200]) == expected[199]
+    for end in range(201, 301):
+        forming = df.iloc[end - 100:end].copy()
+        forming.iloc[-1, forming.columns.get_loc('close')] *= 1.01  # 진행 중인 봉 (종가가 아직 바뀜)
+        stream.feed(forming)
+        assert stream.feed(df.iloc[end - 100:end]) == expected[end - 1]
+    assert stream.count == 300